@@ -0,0 +1,228 @@
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from numpy.polynomial import chebyshev
+from skyfield.api import load, wgs84
+
+import meeus_moon
+from mrotorctl import MRotController, BACKEND_SKYFIELD, BACKEND_MEEUS, EPHEMERIS_FULL
+
+# backend_compare.py is a harness to compare all sources of the Moon's position (az, el) by accuracy and speed.
+# For a random set of QTHs and tracking sessions (random start time, random times within the session) every source
+# calculates the Moon's position. The error is measured against Skyfield (de421.bsp, no rounding) and reported as
+# max and RMS of
+#   az      azimuth error [deg]
+#   az_cos  azimuth error * cos(elevation) [deg], i.e. the pointing error in azimuth direction
+#   el      elevation error [deg]
+#   sep     angular separation between the source's position and the reference [deg] = pointing error
+# Compare "sep" with the half beamwidth of your dish.
+# Additionally the throughput (positions per second, including the preparation of tables and fits) and the peak
+# memory allocated by Python while a session is calculated are reported.
+#
+# Sources:
+#   skyfield     MRotController.calculate_azimuth_elevation() with the Skyfield backend (one call per position)
+#   skyfield_vec Skyfield with an array of times (one call per session)
+#   meeus        MRotController.calculate_azimuth_elevation() with the Meeus backend (meeus_moon.py)
+#   meeus_direct meeus_moon.moon_azimuth_elevation() without rounding
+#   table        Skyfield positions every TABLE_STEP_MIN minutes, linear interpolation of the direction vector
+#   chebyshev    Chebyshev polynomials (degree CHEBYSHEV_DEGREE) fitted to the direction vector of a session
+#
+# Usage: python backend_compare.py [--sessions 20] [--samples 200] [--hours 12] [--min-el 0] [--sources meeus table]
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+TABLE_STEP_MIN = 10  # step of the interpolated table [min]
+CHEBYSHEV_DEGREE = 12  # degree of the Chebyshev fit per session
+CHEBYSHEV_NODES = 49  # number of Skyfield positions used for the fit
+
+
+# a tracking session: QTH and sorted list of times (UTC, whole seconds)
+class Session:
+    def __init__(self, latitude, longitude, elevation_m, times):
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation_m = elevation_m
+        self.times = times
+
+
+def random_sessions(count, samples, hours, seed=1):
+    rnd = random.Random(seed)
+    sessions = []
+    for i in range(count):
+        start = datetime(2000, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=rnd.randint(0, 40 * 365 * 86400))
+        times = sorted(start + timedelta(seconds=rnd.randint(0, int(hours * 3600))) for j in range(samples))
+        sessions.append(Session(rnd.uniform(-70, 70), rnd.uniform(-180, 180), rnd.uniform(0, 3000), times))
+    return sessions
+
+
+# az, el [deg] from topocentric direction vectors (x: North, y: East, z: Up)
+def vector_to_azel(north, east, up):
+    norm = np.sqrt(north * north + east * east + up * up)
+    return np.degrees(np.arctan2(east, north)) % 360.0, np.degrees(np.arcsin(up / norm))
+
+
+def azel_to_vector(az, el):
+    az, el = np.radians(az), np.radians(el)
+    return np.cos(el) * np.cos(az), np.cos(el) * np.sin(az), np.sin(el)
+
+
+class BackendCompare:
+    def __init__(self):
+        self.eph = load('de421.bsp')
+        self.ts = load.timescale()
+        self.earth, self.moon = self.eph['earth'], self.eph['moon']
+        # the sessions are drawn from 2000..2040, outside the compact ephemeris; no position cache, the timing and the
+        # memory rerun of the first session must calculate every position
+        self.rotctl_skyfield = MRotController('127.0.0.1', 4533, backend=BACKEND_SKYFIELD, ephemeris=EPHEMERIS_FULL,
+                                              cache=None)
+        self.rotctl_meeus = MRotController('127.0.0.1', 4533, backend=BACKEND_MEEUS, cache=None)
+        self.sources = {
+            'skyfield': self.source_skyfield,
+            'skyfield_vec': self.source_skyfield_vec,
+            'meeus': self.source_meeus,
+            'meeus_direct': self.source_meeus_direct,
+            'table': self.source_table,
+            'chebyshev': self.source_chebyshev,
+        }
+
+    # full Skyfield calculation for an array of datetimes (reference, no rounding)
+    def skyfield_azel(self, session, times):
+        t = self.ts.from_datetimes(times)
+        topos = wgs84.latlon(session.latitude, session.longitude, session.elevation_m)
+        alt, az, d = (self.earth + topos).at(t).observe(self.moon).apparent().altaz()
+        return az.degrees, alt.degrees
+
+    def source_skyfield(self, session):
+        return self.controller_azel(self.rotctl_skyfield, session)
+
+    def source_meeus(self, session):
+        return self.controller_azel(self.rotctl_meeus, session)
+
+    def controller_azel(self, rotctl, session):
+        rotctl.set_observer_location(session.latitude, session.longitude, elevation_m=session.elevation_m)
+        result = [rotctl.calculate_azimuth_elevation(t.year, t.month, t.day, t.hour, t.minute, t.second)
+                  for t in session.times]
+        return np.array([r[0] for r in result]), np.array([r[1] for r in result])
+
+    def source_skyfield_vec(self, session):
+        return self.skyfield_azel(session, session.times)
+
+    def source_meeus_direct(self, session):
+        result = [meeus_moon.moon_azimuth_elevation(t, session.latitude, session.longitude, session.elevation_m)
+                  for t in session.times]
+        return np.array([r[0] for r in result]), np.array([r[1] for r in result])
+
+    # seconds since the start of the session
+    def session_seconds(self, session):
+        return np.array([(t - session.times[0]).total_seconds() for t in session.times])
+
+    def source_table(self, session):
+        step = TABLE_STEP_MIN * 60
+        seconds = self.session_seconds(session)
+        grid = np.arange(0, seconds[-1] + step, step)
+        az, el = self.skyfield_azel(session, [session.times[0] + timedelta(seconds=float(s)) for s in grid])
+        vectors = [np.interp(seconds, grid, v) for v in azel_to_vector(az, el)]
+        return vector_to_azel(*vectors)
+
+    def source_chebyshev(self, session):
+        seconds = self.session_seconds(session)
+        span = max(seconds[-1], 1.0)
+        # Chebyshev nodes give the smallest maximum error of the fit
+        nodes = (1 - np.cos(np.linspace(0, np.pi, CHEBYSHEV_NODES))) / 2 * span
+        az, el = self.skyfield_azel(session, [session.times[0] + timedelta(seconds=float(s)) for s in nodes])
+        x_nodes = nodes / span * 2 - 1
+        x = seconds / span * 2 - 1
+        vectors = [chebyshev.chebval(x, chebyshev.chebfit(x_nodes, v, CHEBYSHEV_DEGREE))
+                   for v in azel_to_vector(az, el)]
+        return vector_to_azel(*vectors)
+
+    # compare the sources for all sessions, returns a dict with the results per source
+    def run(self, sessions, source_names, min_el=0.0):
+        references = [self.skyfield_azel(session, session.times) for session in sessions]
+        results = {}
+        for name in source_names:
+            source = self.sources[name]
+            errors = []
+            count = 0
+            start = time.perf_counter()
+            for session, (ref_az, ref_el) in zip(sessions, references):
+                az, el = source(session)
+                count += len(az)
+                visible = ref_el >= min_el
+                errors.append(self.errors(az[visible], el[visible], ref_az[visible], ref_el[visible]))
+            duration = time.perf_counter() - start
+
+            # the memory is measured separately, because tracemalloc slows down the calculation
+            tracemalloc.start()
+            source(sessions[0])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            errors = np.concatenate(errors, axis=1)
+            results[name] = {
+                'positions_per_s': count / duration,
+                'peak_memory_kb': peak / 1024.0,
+                'count': errors.shape[1],
+                'max': np.max(errors, axis=1) if errors.shape[1] else np.full(4, np.nan),
+                'rms': np.sqrt(np.mean(errors * errors, axis=1)) if errors.shape[1] else np.full(4, np.nan),
+            }
+        return results
+
+    # absolute errors az, az*cos(el), el, separation [deg] as 4 x n array
+    @staticmethod
+    def errors(az, el, ref_az, ref_el):
+        d_az = np.abs((az - ref_az + 180.0) % 360.0 - 180.0)
+        d_az_cos = d_az * np.cos(np.radians(ref_el))
+        d_el = np.abs(el - ref_el)
+        v = np.array(azel_to_vector(az, el))
+        ref_v = np.array(azel_to_vector(ref_az, ref_el))
+        sep = np.degrees(np.arccos(np.clip(np.sum(v * ref_v, axis=0), -1.0, 1.0)))
+        return np.array([d_az, d_az_cos, d_el, sep])
+
+
+def print_results(results):
+    print("%-13s %10s %9s %7s | %-31s | %-31s" % ("source", "pos/s", "mem[kB]", "n", "max az/az_cos/el/sep [deg]",
+                                                   "rms az/az_cos/el/sep [deg]"))
+    for name, r in results.items():
+        print("%-13s %10.0f %9.1f %7d | %7.4f %7.4f %7.4f %7.4f | %7.4f %7.4f %7.4f %7.4f"
+              % ((name, r['positions_per_s'], r['peak_memory_kb'], r['count']) + tuple(r['max']) + tuple(r['rms'])))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the accuracy and speed of the Moon position sources")
+    parser.add_argument('--sessions', type=int, default=20, help="number of random QTHs/sessions")
+    parser.add_argument('--samples', type=int, default=200, help="number of random times per session")
+    parser.add_argument('--hours', type=float, default=12, help="length of a session [h]")
+    parser.add_argument('--min-el', type=float, default=0, help="ignore positions below this elevation [deg]")
+    parser.add_argument('--seed', type=int, default=1, help="seed of the random generator")
+    parser.add_argument('--sources', nargs='+', help="sources to compare (default: all)")
+    args = parser.parse_args()
+
+    harness = BackendCompare()
+    names = args.sources or list(harness.sources.keys())
+    print("%d sessions x %d samples, %.1f h per session, el >= %.1f deg"
+          % (args.sessions, args.samples, args.hours, args.min_el))
+    print_results(harness.run(random_sessions(args.sessions, args.samples, args.hours, args.seed), names,
+                              args.min_el))
@@ -0,0 +1,323 @@
+import argparse
+import time
+
+import numpy as np
+
+# camerasources.py contains the camera sources of the live view (picamera_live_wx.py). A camera source delivers
+# frames as numpy arrays (height, width, channels, uint8) with capture_array(), like Picamera2:
+#   PicameraSource          Raspberry Pi camera with picamera2 (imported only when used)
+#   VideoFileSource         frames of a video file, e.g. a recorded Moon video (needs opencv-python, cv2)
+#   SyntheticMoonSource     generated Moon frames (limb darkening, maria, drift, changing seeing and noise), no
+#                           hardware needed, e.g. to test and benchmark the display and processing pipeline
+# Resolution and frame rate are configurable for all sources. capture_array() waits for the next frame like a camera,
+# with realtime=False the video file and synthetic sources deliver frames as fast as possible (benchmarks).
+# create_camera_source(config) creates the source from config.yaml (camera_source, camera_width, camera_height,
+# camera_fps, camera_video_file, camera_still_width, camera_still_height).
+#
+# Dual resolution: capture_array() delivers the small preview frames of the live view, capture_still() a frame with
+# the still resolution (default: the full sensor of the Pi camera), used only to save images and for the time-lapse.
+# The Pi camera runs a preview configuration and switches to a still configuration for one frame; the other sources
+# downscale in software with strided numpy views (every n-th pixel, no copy, see downscale and preview_rgb). One step
+# for both axes keeps the aspect, so the preview is at most width x height (e.g. 580x435 of a 4056x3040 video for
+# 640x480), the display is sized from the preview frames.
+#
+# Usage: python camerasources.py [--source synthetic] [--width 640] [--height 480] [--frames 300] [--convert]
+# measures the frames/s of the capture (and of the conversion to the preview of the live view with --convert).
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+SOURCE_PICAMERA = 'picamera2'
+SOURCE_VIDEO = 'video'
+SOURCE_SYNTHETIC = 'synthetic'
+WIDTH = 640  # default resolution [px]
+HEIGHT = 480
+FPS = 12  # default frame rate [frames/s]
+
+
+# view of a frame with every n-th pixel, so that it is at most width x height (no copy, keeps the aspect, so one side
+# may be smaller than requested)
+def downscale(frame, width, height):
+    step = max(1, -(-frame.shape[1] // width), -(-frame.shape[0] // height))
+    return frame[::step, ::step]
+
+
+# RGB preview (height, width, 3, contiguous uint8) of a frame for the display: downscaled to at most width x height
+# and rotated by a multiple of 90 deg (counterclockwise) with views, then copied once
+def preview_rgb(frame, width=None, height=None, rotate_angle=0):
+    if rotate_angle % 90:
+        raise ValueError("only multiples of 90 deg are rotated as views")
+    if width is not None:
+        frame = downscale(frame, width, height)
+    if frame.ndim == 2:
+        frame = frame[:, :, np.newaxis][:, :, [0, 0, 0]]
+    return np.ascontiguousarray(np.rot90(frame[:, :, :3], (rotate_angle // 90) % 4))
+
+
+class CameraSource:
+    # width, height: preview resolution, still_width, still_height: resolution of capture_still (None: preview size)
+    def __init__(self, width=WIDTH, height=HEIGHT, fps=FPS, still_width=None, still_height=None):
+        self.name = 'camera'
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.still_width = still_width or width
+        self.still_height = still_height or height
+        self.next_frame_time = None
+
+    def start(self):
+        self.next_frame_time = time.monotonic()
+
+    # next preview frame, numpy array (height, width, channels) uint8
+    def capture_array(self):
+        raise NotImplementedError
+
+    # a frame with the still resolution (still_height, still_width, channels) uint8
+    def capture_still(self):
+        return self.capture_array()
+
+    def stop(self):
+        pass
+
+    # wait for the time of the next frame (frame rate of the sources without hardware timing)
+    def wait_for_frame(self):
+        if self.next_frame_time is None:
+            self.next_frame_time = time.monotonic()
+        delay = self.next_frame_time - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self.next_frame_time = max(self.next_frame_time, time.monotonic() - 1.0 / self.fps) + 1.0 / self.fps
+
+
+class PicameraSource(CameraSource):
+    # still_width, still_height: None: full sensor resolution
+    def __init__(self, width=WIDTH, height=HEIGHT, fps=FPS, still_width=None, still_height=None):
+        from picamera2 import Picamera2  # Raspberry Pi only
+        camera = Picamera2()
+        if not still_width or not still_height:
+            still_width, still_height = camera.sensor_resolution
+        CameraSource.__init__(self, width, height, fps, still_width, still_height)
+        self.name = SOURCE_PICAMERA
+        self.camera = camera
+        # small preview stream for the live view, the still configuration is only used for single frames
+        self.camera.configure(self.camera.create_preview_configuration(main={"size": (width, height)},
+                                                                       controls={"FrameRate": fps}))
+        self.still_configuration = self.camera.create_still_configuration(
+            main={"size": (self.still_width, self.still_height)})
+
+    def start(self):
+        self.camera.start()
+
+    def capture_array(self):
+        return self.camera.capture_array()
+
+    # switch to the still configuration for one frame, the preview continues afterwards
+    def capture_still(self):
+        return self.camera.switch_mode_and_capture_array(self.still_configuration, "main")
+
+    def stop(self):
+        self.camera.stop()
+
+
+class VideoFileSource(CameraSource):
+    # path: video file, loop: start again at the end, realtime: deliver the frames at fps
+    # the still resolution is the resolution of the video, the preview is a strided view of the video frames
+    def __init__(self, path, width=WIDTH, height=HEIGHT, fps=FPS, loop=True, realtime=True):
+        import cv2  # opencv-python, only needed for video files
+        self.cv2 = cv2
+        self.capture = cv2.VideoCapture(path)
+        if not self.capture.isOpened():
+            raise IOError("cannot open video file " + path)
+        CameraSource.__init__(self, width, height, fps, int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                              int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.name = SOURCE_VIDEO
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime
+        self.frame = None  # last full resolution frame (RGB)
+
+    # next frame of the video with the full resolution
+    def read_frame(self):
+        ok, frame = self.capture.read()
+        if not ok and self.loop:
+            self.capture.set(self.cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.capture.read()
+        if not ok:
+            raise EOFError("end of video file " + self.path)
+        self.frame = frame[:, :, ::-1]  # BGR -> RGB (view)
+        return self.frame
+
+    def capture_array(self):
+        if self.realtime:
+            self.wait_for_frame()
+        return downscale(self.read_frame(), self.width, self.height)
+
+    def capture_still(self):
+        return np.ascontiguousarray(self.frame if self.frame is not None else self.read_frame())
+
+    def stop(self):
+        self.capture.release()
+
+
+class SyntheticMoonSource(CameraSource):
+    # Moon frames: a limb darkened disk with maria and the terminator of the phase, drifting through the image (tracking
+    # error), with changing seeing (blur), shifts and sensor noise
+    # phase: illuminated fraction 0..1, drift_px_s: drift speed [px/s] (preview), realtime: deliver the frames at fps
+    # the preview and the still images are rendered separately (same Moon), the still image only at the first still
+    def __init__(self, width=WIDTH, height=HEIGHT, fps=FPS, phase=0.8, drift_px_s=2.0, noise=6.0, seed=1,
+                 realtime=True, still_width=None, still_height=None):
+        CameraSource.__init__(self, width, height, fps, still_width, still_height)
+        self.name = SOURCE_SYNTHETIC
+        self.phase = phase
+        self.drift_px_s = drift_px_s
+        self.noise = noise
+        self.seed = seed
+        self.realtime = realtime
+        self.random = np.random.default_rng(seed)
+        self.frame_index = 0
+        self.sharp, self.blurred = self.render_moon(width, height, phase)
+        self.still_sharp = None
+        # precomputed noise, a random part of it is added per frame
+        self.noise_pattern = self.random.normal(0.0, noise, (2 * height, width)).astype(np.float32)
+
+    # sharp and blurred Moon images (float32, 0..255), rendered once
+    def render_moon(self, width, height, phase):
+        craters = np.random.default_rng(self.seed).uniform([-0.8, -0.8, 0.02], [0.8, 0.8, 0.08], (40, 3))
+        radius = 0.35 * min(width, height)
+        y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+        x = (x - width / 2) / radius
+        y = (y - height / 2) / radius
+        r2 = x * x + y * y
+        disk = r2 <= 1.0
+        mu = np.sqrt(np.clip(1.0 - r2, 0.0, 1.0))
+        brightness = 0.6 + 0.4 * mu  # limb darkening
+        # maria: a few dark elliptic spots, craters: small bright rings
+        for cx, cy, rx, ry in ((-0.3, -0.3, 0.35, 0.25), (0.2, -0.45, 0.2, 0.15), (0.35, 0.1, 0.25, 0.3),
+                               (-0.1, 0.35, 0.3, 0.2)):
+            brightness -= 0.25 * np.exp(-(((x - cx) / rx) ** 2 + ((y - cy) / ry) ** 2) * 2.0)
+        for cx, cy, cr in craters:
+            d = np.sqrt((x - cx) ** 2 + (y - cy) ** 2)
+            brightness += 0.15 * np.exp(-((d - cr) / 0.01) ** 2) - 0.1 * (d < cr)
+        # terminator: x position of the shadow boundary on the disk for the phase
+        terminator = (1.0 - 2.0 * phase) * np.sqrt(np.clip(1.0 - y * y, 0.0, 1.0))
+        lit = 1.0 / (1.0 + np.exp(-(x - terminator) * 40.0))
+        sharp = np.where(disk, np.clip(brightness, 0.0, 1.0) * lit * 230.0, 0.0).astype(np.float32)
+        # blurred copy: box filter of 9x9 px with cumulative sums
+        padded = np.pad(sharp, 4, mode='edge')
+        summed = np.cumsum(np.cumsum(padded, axis=0), axis=1)
+        summed = np.pad(summed, ((1, 0), (1, 0)))
+        blurred = (summed[9:, 9:] - summed[:-9, 9:] - summed[9:, :-9] + summed[:-9, :-9]) / 81.0
+        return sharp, blurred.astype(np.float32)
+
+    def capture_array(self):
+        if self.realtime:
+            self.wait_for_frame()
+        self.frame_index += 1
+        # seeing: random blend of the sharp and the blurred image, shift by drift and jitter
+        seeing = self.random.beta(2.0, 2.0)
+        image = self.sharp * seeing + self.blurred * (1.0 - seeing)
+        drift = self.drift_px_s * self.frame_index / self.fps
+        dx = int(round(drift + self.random.normal(0.0, 1.5))) % self.width
+        dy = int(round(0.5 * drift + self.random.normal(0.0, 1.5))) % self.height
+        image = np.roll(image, (dy, dx), axis=(0, 1))
+        offset = self.random.integers(0, self.height)
+        image += self.noise_pattern[offset:offset + self.height]
+        gray = np.clip(image, 0, 255).astype(np.uint8)
+        return np.repeat(gray[:, :, np.newaxis], 3, axis=2)
+
+    # the sharp Moon with the still resolution at the current drift position
+    def capture_still(self):
+        if self.still_sharp is None:
+            self.still_sharp = self.render_moon(self.still_width, self.still_height, self.phase)[0]
+        scale = self.still_width / self.width
+        drift = self.drift_px_s * scale * self.frame_index / self.fps
+        image = np.roll(self.still_sharp, (int(round(0.5 * drift)), int(round(drift))), axis=(0, 1))
+        gray = np.clip(image + self.random.normal(0.0, self.noise, image.shape), 0, 255).astype(np.uint8)
+        return np.repeat(gray[:, :, np.newaxis], 3, axis=2)
+
+
+# create the camera source from a config.yaml entry (see CONFIG_DATA_DEFAULT in moonrunner_gui.py)
+def create_camera_source(config):
+    source = config.get('camera_source', SOURCE_PICAMERA)
+    width = config.get('camera_width', WIDTH)
+    height = config.get('camera_height', HEIGHT)
+    fps = config.get('camera_fps', FPS)
+    still_width = config.get('camera_still_width', 0)  # 0: full sensor (Pi camera) or the preview size
+    still_height = config.get('camera_still_height', 0)
+    if source == SOURCE_PICAMERA:
+        return PicameraSource(width, height, fps, still_width, still_height)
+    if source == SOURCE_VIDEO:
+        return VideoFileSource(config['camera_video_file'], width, height, fps)
+    if source == SOURCE_SYNTHETIC:
+        return SyntheticMoonSource(width, height, fps, still_width=still_width, still_height=still_height)
+    raise ValueError("unknown camera_source: " + str(source))
+
+
+# frames/s of capture_array (and the conversion to the preview of the live view with convert=True)
+def benchmark(source, frames=300, convert=False, rotate_angle=180):
+    source.start()
+    capture_s = convert_s = 0.0
+    try:
+        for i in range(frames):
+            start = time.perf_counter()
+            frame = source.capture_array()
+            capture_s += time.perf_counter() - start
+            if convert:
+                start = time.perf_counter()
+                preview_rgb(frame, source.width, source.height, rotate_angle).tobytes()
+                convert_s += time.perf_counter() - start
+    finally:
+        source.stop()
+    return frames / capture_s, frames / convert_s if convert else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the frame rate of a camera source")
+    parser.add_argument('--source', default=SOURCE_SYNTHETIC, choices=[SOURCE_PICAMERA, SOURCE_VIDEO, SOURCE_SYNTHETIC])
+    parser.add_argument('--video', default=None, help="video file of the video source")
+    parser.add_argument('--width', type=int, default=WIDTH)
+    parser.add_argument('--height', type=int, default=HEIGHT)
+    parser.add_argument('--fps', type=float, default=FPS, help="frame rate (the benchmark runs without waiting)")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--convert', action='store_true', help="also measure the conversion of the live view")
+    parser.add_argument('--still-width', type=int, default=0, help="still width (default: full sensor)")
+    parser.add_argument('--still-height', type=int, default=0, help="still height (default: full sensor)")
+    parser.add_argument('--still', action='store_true', help="also measure the capture of a still")
+    args = parser.parse_args()
+
+    if args.source == SOURCE_PICAMERA:
+        camera = PicameraSource(args.width, args.height, args.fps, args.still_width, args.still_height)
+    elif args.source == SOURCE_VIDEO:
+        camera = VideoFileSource(args.video, args.width, args.height, args.fps, realtime=False)
+    else:
+        camera = SyntheticMoonSource(args.width, args.height, args.fps, realtime=False, still_width=args.still_width,
+                                     still_height=args.still_height)
+    capture_fps, convert_fps = benchmark(camera, args.frames, args.convert)
+    print("%s %dx%d: capture %.1f frames/s" % (camera.name, args.width, args.height, capture_fps)
+          + (", conversion %.1f frames/s" % convert_fps if convert_fps else ""))
+    if args.still:
+        camera.start()
+        try:
+            camera.capture_still()  # the first still may set up the still mode
+            start = time.perf_counter()
+            still = camera.capture_still()
+            print("still %dx%d: %.0f ms" % (still.shape[1], still.shape[0], (time.perf_counter() - start) * 1000.0))
+        finally:
+            camera.stop()
@@ -0,0 +1,208 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from skyfield.api import load, wgs84
+
+from mrotorctl import load_ephemeris, EPHEMERIS_FULL
+
+# eme_planner.py finds the EME mutual-visibility windows of two or more stations (QTHs), i.e. all time windows where
+# the Moon is above a minimum elevation at all stations, over weeks, months or years.
+# The Moon's elevation is calculated for all stations on a time grid with one vectorized Skyfield call per station
+# (instead of stepping MRotController.calculate_azimuth_elevation minute by minute). The start and end of the windows
+# are then refined by a vectorized bisection of all grid intervals with a sign change at once.
+# Long time ranges (e.g. a year-long schedule) are split into chunks, which are calculated in a process pool.
+# Note: windows shorter than the grid step (default 10 min) may be missed.
+#
+# Usage: python eme_planner.py --station OE9BKJ,47.468,9.732,500 --station W1XYZ,42.36,-71.06,20
+#                              [--start 2026-10-19] [--days 30] [--min-el 10] [--processes 4] [--sky-mhz 144]
+# --sky-mhz ranks the windows by the sky temperature behind the Moon (skytemp.py).
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+STEP_MIN = 10  # time grid step [min]
+PRECISION_S = 1.0  # precision of the window start/end [s]
+CHUNK_DAYS = 30  # length of the time range per process [days]
+
+
+# an EME station, latitude/longitude in degrees (North/East positive)
+class Station:
+    def __init__(self, name, latitude, longitude, elevation_m=0.0):
+        self.name = name
+        self.latitude = latitude
+        self.longitude = longitude
+        self.elevation_m = elevation_m
+
+    def __repr__(self):
+        return "Station(%r, %.4f, %.4f, %.0f)" % (self.name, self.latitude, self.longitude, self.elevation_m)
+
+
+# a mutual-visibility window: start, end (datetime UTC) and the highest "lowest elevation of all stations" [deg]
+class Window:
+    def __init__(self, start, end, peak_min_el):
+        self.start = start
+        self.end = end
+        self.peak_min_el = peak_min_el
+
+    def duration(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return "%s - %s  %s  peak min el %.1f" % (self.start.strftime("%Y-%m-%d %H:%M:%S"),
+                                                 self.end.strftime("%Y-%m-%d %H:%M:%S"),
+                                                 str(self.duration()).split('.')[0], self.peak_min_el)
+
+
+class MutualWindowPlanner:
+    # ephemeris: the full ephemeris by default, the time range is not known here (the compact file covers a few years)
+    def __init__(self, stations, min_el=10.0, step_min=STEP_MIN, ephemeris=EPHEMERIS_FULL):
+        self.stations = stations
+        self.min_el = min_el
+        self.step_s = step_min * 60.0
+        self.eph = load_ephemeris(ephemeris)
+        self.ts = load.timescale()
+        self.earth, self.moon = self.eph['earth'], self.eph['moon']
+        self.observers = [self.earth + wgs84.latlon(s.latitude, s.longitude, s.elevation_m) for s in stations]
+
+    # Skyfield Time for an array of seconds after the datetime start
+    def times(self, start, seconds):
+        return self.ts.utc(start.year, start.month, start.day, start.hour, start.minute, start.second + seconds)
+
+    # lowest Moon elevation of all stations [deg] for an array of seconds after start
+    def min_elevation(self, start, seconds):
+        t = self.times(start, seconds)
+        el = [observer.at(t).observe(self.moon).apparent().altaz()[0].degrees for observer in self.observers]
+        return np.min(el, axis=0)
+
+    # all windows between the datetimes start and end (UTC)
+    def find_windows(self, start, end):
+        total_s = (end - start).total_seconds()
+        seconds = np.append(np.arange(0.0, total_s, self.step_s), total_s)
+        above = self.min_elevation(start, seconds) - self.min_el
+        visible = above >= 0
+
+        # refine all sign changes at once by bisection
+        i = np.nonzero(visible[:-1] != visible[1:])[0]
+        low, high = seconds[i], seconds[i + 1]
+        low_visible = visible[i]
+        while len(low) and np.max(high - low) > PRECISION_S:
+            mid = (low + high) / 2
+            mid_visible = self.min_elevation(start, mid) >= self.min_el
+            same = mid_visible == low_visible
+            low = np.where(same, mid, low)
+            high = np.where(same, high, mid)
+        crossings = (low + high) / 2
+
+        # pair rising and setting crossings, windows may start before or end after the time range
+        starts = list(crossings[~low_visible])
+        ends = list(crossings[low_visible])
+        if visible[0]:
+            starts.insert(0, 0.0)
+        if visible[-1]:
+            ends.append(total_s)
+        windows = []
+        for window_start, window_end in zip(starts, ends):
+            inside = (seconds >= window_start) & (seconds <= window_end)
+            peak = np.max(above[inside]) + self.min_el if np.any(inside) else self.min_el
+            windows.append(Window(start + timedelta(seconds=float(window_start)),
+                                  start + timedelta(seconds=float(window_end)), float(peak)))
+        return windows
+
+
+# process pool worker: one planner (and ephemeris) per process
+_worker_planner = None
+
+
+def _init_worker(stations, min_el, step_min, ephemeris):
+    global _worker_planner
+    _worker_planner = MutualWindowPlanner(stations, min_el, step_min, ephemeris)
+
+
+def _find_windows_chunk(chunk):
+    return _worker_planner.find_windows(chunk[0], chunk[1])
+
+
+# all windows between start and end, the time range is split in chunks of chunk_days calculated in a process pool
+# processes: number of processes (None: number of CPUs)
+def find_windows_parallel(stations, start, end, min_el=10.0, step_min=STEP_MIN, ephemeris=EPHEMERIS_FULL,
+                          chunk_days=CHUNK_DAYS, processes=None):
+    chunks = []
+    chunk_start = start
+    while chunk_start < end:
+        chunk_end = min(chunk_start + timedelta(days=chunk_days), end)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                             initargs=(stations, min_el, step_min, ephemeris)) as executor:
+        results = list(executor.map(_find_windows_chunk, chunks))
+
+    # merge the windows split at the chunk borders
+    windows = []
+    for chunk_windows in results:
+        for window in chunk_windows:
+            if windows and window.start == windows[-1].end:
+                windows[-1].end = window.end
+                windows[-1].peak_min_el = max(windows[-1].peak_min_el, window.peak_min_el)
+            else:
+                windows.append(window)
+    return windows
+
+
+def parse_station(text):
+    name, latitude, longitude, elevation_m = (text.split(',') + ['0'])[:4]
+    return Station(name, float(latitude), float(longitude), float(elevation_m))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the EME mutual-visibility windows of two or more stations")
+    parser.add_argument('--station', type=parse_station, action='append', required=True,
+                        help="NAME,LAT,LON[,ELEVATION_M] in degrees North/East, e.g. OE9BKJ,47.468,9.732,500")
+    parser.add_argument('--start', default=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                        help="start date yyyy-mm-dd (UTC, default: today)")
+    parser.add_argument('--days', type=float, default=30, help="length of the time range [days]")
+    parser.add_argument('--min-el', type=float, default=10, help="minimum elevation at all stations [deg]")
+    parser.add_argument('--step', type=float, default=STEP_MIN, help="time grid step [min]")
+    parser.add_argument('--processes', type=int, default=None,
+                        help="number of processes (default: number of CPUs, 1: no process pool)")
+    parser.add_argument('--sky-mhz', type=float, default=None,
+                        help="also rank the windows by the sky temperature behind the Moon at this frequency [MHz]")
+    args = parser.parse_args()
+
+    start = datetime.strptime(args.start, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    end = start + timedelta(days=args.days)
+    print("Stations: " + ", ".join(str(s) for s in args.station))
+    calc_start = time.perf_counter()
+    if args.processes == 1:
+        windows = MutualWindowPlanner(args.station, args.min_el, args.step).find_windows(start, end)
+    else:
+        windows = find_windows_parallel(args.station, start, end, args.min_el, args.step,
+                                        processes=args.processes)
+    for window in windows:
+        print(window)
+    print("%d windows with el >= %.1f deg found in %.1f s" % (len(windows), args.min_el,
+                                                             time.perf_counter() - calc_start))
+    if args.sky_mhz:
+        from skytemp import SkyTemperatureMap, rank_windows
+        print("Windows ranked by the sky temperature behind the Moon at %.0f MHz:" % args.sky_mhz)
+        for window, mean_tsky, max_tsky in rank_windows(windows, SkyTemperatureMap(frequency_mhz=args.sky_mhz)):
+            print("%s  Tsky mean %5.0f K, max %5.0f K" % (window, mean_tsky, max_tsky))
@@ -0,0 +1,145 @@
+import argparse
+import math
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from skyfield.api import wgs84
+
+from mrotorctl import TARGET_MOON
+
+# emelink.py contains the class "EMELink" to calculate the EME (Earth-Moon-Earth) link parameters of a QTH, alone
+# (self echo) or with a DX station, for whole time arrays in one vectorized calculation:
+#   range_km           distance QTH - Moon [km] (and DX - Moon)
+#   range_rate_km_s    range rate [km/s], positive: the Moon recedes from the QTH
+#   delay_s            round trip delay QTH - Moon - QTH (or QTH - Moon - DX) [s]
+#   doppler_echo_hz    Doppler shift of the own echo [Hz]
+#   doppler_dx_hz      Doppler shift of the DX station's signal received at the QTH [Hz]
+#   path_loss_db       EME path loss (bistatic radar equation) [dB]
+# The Moon positions, distances and range rates of both stations are calculated with
+# MRotController.calculate_targets (relative velocity along the line of sight, including the Earth's rotation).
+# The path loss uses the radar cross section of the Moon sigma = 0.065 * pi * R^2 (R = 1737.4 km), i.e. a
+# reflection coefficient of 0.065, e.g. about 252 dB at 144 MHz (self echo, mean distance).
+# The GUI shows the values of the current time (config.yaml eme_frequency_mhz, eme_dx_station) and writes them into
+# the session log.
+#
+# Usage: python emelink.py --mhz 144.1 [--dx W1XYZ,42.36,-71.06,20] [--hours 6] [--step 30]   (uses config.yaml)
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+C_KM_S = 299792.458  # speed of light [km/s]
+MOON_RADIUS_KM = 1737.4
+MOON_REFLECTIVITY = 0.065  # radar cross section of the Moon = 0.065 * pi * R^2
+MOON_RCS_M2 = MOON_REFLECTIVITY * math.pi * (MOON_RADIUS_KM * 1000.0) ** 2
+
+# fields of the session log (see sessionlog.py), recorded after the tracking fields
+LOG_FIELDS = ('range_km', 'range_rate_km_s', 'doppler_echo_hz', 'doppler_dx_hz', 'path_loss_db')
+
+
+# round trip delay [s] QTH - Moon - DX (range_dx_km None: self echo)
+def round_trip_delay_s(range_km, range_dx_km=None):
+    range_km = np.asarray(range_km, dtype=float)
+    return (range_km + (range_km if range_dx_km is None else np.asarray(range_dx_km, dtype=float))) / C_KM_S
+
+
+# Doppler shift [Hz] of a signal at frequency_hz sent by the DX station and received at the QTH via the Moon
+# (range_rate_dx_km_s None: self echo), range rates positive when receding
+def doppler_hz(frequency_hz, range_rate_km_s, range_rate_dx_km_s=None):
+    range_rate_km_s = np.asarray(range_rate_km_s, dtype=float)
+    if range_rate_dx_km_s is None:
+        range_rate_dx_km_s = range_rate_km_s
+    return -frequency_hz * (range_rate_km_s + np.asarray(range_rate_dx_km_s, dtype=float)) / C_KM_S
+
+
+# EME path loss [dB] at frequency_hz: (4 pi)^3 r1^2 r2^2 / (sigma lambda^2) (range_dx_km None: self echo)
+def path_loss_db(frequency_hz, range_km, range_dx_km=None):
+    r1 = np.asarray(range_km, dtype=float) * 1000.0
+    r2 = r1 if range_dx_km is None else np.asarray(range_dx_km, dtype=float) * 1000.0
+    wavelength_m = C_KM_S * 1000.0 / frequency_hz
+    return (10.0 * np.log10((4.0 * math.pi) ** 3 / (MOON_RCS_M2 * wavelength_m ** 2))
+            + 20.0 * np.log10(r1) + 20.0 * np.log10(r2))
+
+
+class EMELink:
+    # rotctl: MRotController (Skyfield backend) with the observer location, frequency_mhz: band [MHz]
+    # dx_station: Station (eme_planner.py) of the DX station, None: self echo only
+    def __init__(self, rotctl, frequency_mhz, dx_station=None):
+        self.rotctl = rotctl
+        self.frequency_hz = frequency_mhz * 1e6
+        self.dx_station = dx_station
+        self.dx_location = None
+        if dx_station is not None:
+            self.dx_location = wgs84.latlon(dx_station.latitude, dx_station.longitude, dx_station.elevation_m)
+
+    # link parameters for a datetime (UTC) or a list of datetimes, default: now
+    # returns a dict name -> array (see the header), the DX values are NaN without a DX station
+    def calculate(self, times=None):
+        moon = self.rotctl.calculate_targets((TARGET_MOON,), times)
+        range_km = moon.distance_km[TARGET_MOON]
+        range_rate_km_s = moon.range_rate_km_s[TARGET_MOON]
+        values = {'times': moon.times, 'range_km': range_km, 'range_rate_km_s': range_rate_km_s,
+                  'delay_s': round_trip_delay_s(range_km),
+                  'doppler_echo_hz': doppler_hz(self.frequency_hz, range_rate_km_s),
+                  'path_loss_db': path_loss_db(self.frequency_hz, range_km)}
+        nan = np.full(len(moon.times), np.nan)
+        values.update(dx_range_km=nan, dx_el=nan, doppler_dx_hz=nan, dx_delay_s=nan, dx_path_loss_db=nan)
+        if self.dx_location is not None:
+            dx = self.rotctl.calculate_targets((TARGET_MOON,), moon.times, location=self.dx_location)
+            dx_range_km = dx.distance_km[TARGET_MOON]
+            values.update(dx_range_km=dx_range_km, dx_el=dx.el[TARGET_MOON],
+                          doppler_dx_hz=doppler_hz(self.frequency_hz, range_rate_km_s,
+                                                   dx.range_rate_km_s[TARGET_MOON]),
+                          dx_delay_s=round_trip_delay_s(range_km, dx_range_km),
+                          dx_path_loss_db=path_loss_db(self.frequency_hz, range_km, dx_range_km))
+        return values
+
+    # values for the session log, in the order of LOG_FIELDS
+    # values: result of calculate() to reuse (its first time is logged), default: calculate the current time
+    def log_values(self, values=None):
+        if values is None:
+            values = self.calculate()
+        return tuple(float(values[name][0]) for name in LOG_FIELDS)
+
+
+if __name__ == "__main__":
+    import yaml
+    from eme_planner import parse_station
+    from scheduler import create_controller
+
+    parser = argparse.ArgumentParser(description="EME range, Doppler, delay and path loss for the QTH in config.yaml")
+    parser.add_argument('--config', default='config.yaml', help="config file (default: %(default)s)")
+    parser.add_argument('--mhz', type=float, default=144.1, help="frequency [MHz]")
+    parser.add_argument('--dx', default=None, help="DX station NAME,LAT,LON[,ELEVATION_M]")
+    parser.add_argument('--hours', type=float, default=6, help="time range from now [h]")
+    parser.add_argument('--step', type=float, default=30, help="step [min]")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as yamlfile:
+        config = yaml.load(yamlfile, Loader=yaml.FullLoader)[0]
+    link = EMELink(create_controller(config), args.mhz, parse_station(args.dx) if args.dx else None)
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    values = link.calculate([start + timedelta(minutes=m) for m in np.arange(0, args.hours * 60 + 1, args.step)])
+    print("time (UTC)        range [km]  rate [m/s]  delay [s]  echo [Hz]  DX [Hz]  loss [dB]")
+    for i, t in enumerate(values['times']):
+        print("%s %10.0f %11.1f %10.3f %10.0f %8.0f %10.1f"
+              % (t.strftime("%Y-%m-%d %H:%M"), values['range_km'][i], values['range_rate_km_s'][i] * 1000.0,
+                 values['delay_s'][i] if link.dx_station is None else values['dx_delay_s'][i],
+                 values['doppler_echo_hz'][i], values['doppler_dx_hz'][i],
+                 values['path_loss_db'][i] if link.dx_station is None else values['dx_path_loss_db'][i]))
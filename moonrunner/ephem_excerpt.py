@@ -0,0 +1,90 @@
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+from jplephem.daf import DAF
+from jplephem.excerpter import RemoteFile, write_excerpt
+from jplephem.spk import SPK
+
+from meeus_moon import julian_date
+from mrotorctl import EPHEMERIS_FULL, EPHEMERIS_COMPACT, EPHEMERIS_FULL_URL
+
+# ephem_excerpt.py writes a compact ephemeris file with only the SPK segments needed by MRotController (Earth and
+# Moon, plus Sun, Jupiter and Saturn for the light deflection) for a chosen date range. The full "de421.bsp" is 17 MB
+# and covers 1900..2050 for all planets, the compact file for 10 years has 770 kB. This saves disk space, download
+# time and memory on small trackers.
+# MRotController prefers the compact file "de421_moon.bsp", if it is present in the working directory and covers
+# the current date (a later calculation outside the file switches to the full ephemeris).
+#
+# If the full ephemeris is not present, the segments are read directly from the JPL server (HTTP range requests),
+# so only the needed parts are downloaded.
+#
+# Usage: python ephem_excerpt.py [--start 2026-01-01] [--end 2036-01-01] [--input de421.bsp]
+#                                [--output de421_moon.bsp]
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+# NAIF codes of the segments needed for the Moon seen from the Earth:
+# Solar System Barycenter -> Earth Barycenter (3), Earth Barycenter -> Moon (301), Earth Barycenter -> Earth (399)
+# Skyfield's apparent() needs the Sun (10), Jupiter (5) and Saturn (6) barycenter for the light deflection
+TARGETS_MOON = (3, 301, 399, 10, 5, 6)
+DEFAULT_YEARS = 10
+
+
+# write the excerpt of the SPK file input_path (local file or URL) to output_path
+# start, end: datetime (UTC), targets: NAIF codes of the segments to keep
+def write_ephemeris_excerpt(input_path, output_path, start, end, targets=TARGETS_MOON):
+    if input_path.startswith(('http://', 'https://')):
+        f = RemoteFile(input_path)
+    else:
+        f = open(input_path, 'rb')
+    with f:
+        spk = SPK(DAF(f))
+        summaries = [summary for summary, segment in zip(spk.daf.summaries(), spk.segments)
+                     if segment.target in targets]
+        with open(output_path, 'w+b') as output_file:
+            write_excerpt(spk, output_file, julian_date(start), julian_date(end), summaries)
+    with open(output_path, 'rb') as f:
+        return str(SPK(DAF(f)))
+
+
+def parse_date(text):
+    return datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+
+
+if __name__ == "__main__":
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    parser = argparse.ArgumentParser(description="Write a compact Earth/Moon ephemeris for MRotController")
+    parser.add_argument('--start', type=parse_date, default=today - timedelta(days=1),
+                        help="first date yyyy-mm-dd (default: yesterday)")
+    parser.add_argument('--end', type=parse_date, default=today + timedelta(days=DEFAULT_YEARS * 365),
+                        help="last date yyyy-mm-dd (default: in %d years)" % DEFAULT_YEARS)
+    parser.add_argument('--input', default=None,
+                        help="full ephemeris file or URL (default: %s or %s)" % (EPHEMERIS_FULL, EPHEMERIS_FULL_URL))
+    parser.add_argument('--output', default=EPHEMERIS_COMPACT, help="output file (default: %(default)s)")
+    args = parser.parse_args()
+
+    input_path = args.input
+    if input_path is None:
+        input_path = EPHEMERIS_FULL if os.path.exists(EPHEMERIS_FULL) else EPHEMERIS_FULL_URL
+    print("reading " + input_path)
+    print(write_ephemeris_excerpt(input_path, args.output, args.start, args.end))
+    print("%s written, %.1f kB" % (args.output, os.path.getsize(args.output) / 1024.0))
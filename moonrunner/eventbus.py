@@ -0,0 +1,67 @@
+import threading
+
+# eventbus.py contains the class "EventBus", a small in-process publish/subscribe bus. It connects the views of the
+# single-application mode (moonrunner_app.py): the tracking GUI, the joystick and the camera share one MRotController,
+# which publishes the Moon position and the rotor state, and the camera publishes its frames.
+#
+# Messages are dicts. The callbacks are called in the thread of the publisher (in the app: the wx main thread, a
+# publisher in another thread must be wrapped with wx.CallAfter by the subscriber). The last message of each topic is
+# kept, so a view created later can start with the current state.
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+# topics and their messages
+TOPIC_MOON_POSITION = 'moon_position'  # {'az', 'el', 'time'} calculated Moon position [deg], time: datetime UTC
+TOPIC_ROTOR_STATE = 'rotor_state'  # {'cmd_az', 'cmd_el', 'latency_s'} after a command, {'read_az', 'read_el'} read
+TOPIC_ROTOR_LINK = 'rotor_link'  # {'state', 'failures', 'retry_in_s', 'error'} when the rotor link state changes
+TOPIC_CAMERA_FRAME = 'camera_frame'  # {'frame', 'time'} numpy image array, time.time()
+
+
+class EventBus:
+    def __init__(self):
+        self.subscribers = {}  # topic -> list of callbacks
+        self.last_messages = {}
+        self.lock = threading.Lock()
+
+    # callback(message) is called for every message of the topic, replay_last: call it now with the last message
+    def subscribe(self, topic, callback, replay_last=False):
+        with self.lock:
+            self.subscribers.setdefault(topic, []).append(callback)
+            last = self.last_messages.get(topic)
+        if replay_last and last is not None:
+            callback(last)
+        return callback
+
+    def unsubscribe(self, topic, callback):
+        with self.lock:
+            if callback in self.subscribers.get(topic, []):
+                self.subscribers[topic].remove(callback)
+
+    def publish(self, topic, message):
+        with self.lock:
+            self.last_messages[topic] = message
+            callbacks = list(self.subscribers.get(topic, []))
+        for callback in callbacks:
+            callback(message)
+
+    def last_message(self, topic):
+        with self.lock:
+            return self.last_messages.get(topic)
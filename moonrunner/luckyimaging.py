@@ -0,0 +1,169 @@
+import argparse
+import queue
+import threading
+import time
+
+import numpy as np
+
+# luckyimaging.py contains the class "LuckyStacker", an optional processing stage of the camera live view
+# (picamera_live_wx.py) for "lucky imaging" of the Moon: through a turbulent atmosphere only a few frames are sharp.
+#   1. every frame of the live view is scored by its sharpness: the variance of the Laplacian of the luminance
+#      (vectorized with array slices, no per-pixel loops)
+#   2. the best N frames are kept in a preallocated buffer (no allocation per frame, the worst frame is overwritten)
+#   3. on request the best frames are aligned to the sharpest one by phase correlation (FFT) and averaged in float32,
+#      which reduces the noise by about sqrt(N)
+# Scoring and stacking run on a worker thread. The live view only puts the frame into a small queue; if the worker
+# falls behind, frames are skipped (counted in dropped) instead of slowing down the live view.
+#
+# Usage: python luckyimaging.py [--frames 300] [--best 20] [--width 640] [--height 480]
+# runs the stacker on synthetic Moon frames (camerasources.py) and prints the throughput and the stacking time.
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+BEST_N = 20  # number of frames stacked
+QUEUE_FRAMES = 2  # frames waiting for the worker, further frames are dropped
+
+
+# luminance (float32) of a frame (height, width[, channels])
+def luminance(frame):
+    if frame.ndim == 2:
+        return frame.astype(np.float32)
+    return frame[:, :, :3].mean(axis=2, dtype=np.float32)
+
+
+# sharpness: variance of the Laplacian (4-neighbour) of the luminance
+def sharpness(gray):
+    laplacian = (gray[:-2, 1:-1] + gray[2:, 1:-1] + gray[1:-1, :-2] + gray[1:-1, 2:]) - 4.0 * gray[1:-1, 1:-1]
+    return float(laplacian.var())
+
+
+# shift (dy, dx) [px] that moves the image with the spectrum image_fft onto the reference (phase correlation)
+def phase_correlation(reference_fft, image_fft):
+    cross_power = reference_fft * np.conj(image_fft)
+    cross_power /= np.abs(cross_power) + 1e-9
+    correlation = np.fft.irfft2(cross_power, s=(reference_fft.shape[0], 2 * (reference_fft.shape[1] - 1)))
+    dy, dx = np.unravel_index(np.argmax(correlation), correlation.shape)
+    height, width = correlation.shape
+    return (dy - height if dy > height // 2 else dy), (dx - width if dx > width // 2 else dx)
+
+
+class LuckyStacker:
+    # width, height, channels: frame size, best_n: number of frames kept and stacked
+    def __init__(self, width, height, channels=3, best_n=BEST_N):
+        self.best_n = best_n
+        self.frames = np.zeros((best_n, height, width, channels), dtype=np.uint8)  # preallocated buffer
+        self.scores = np.full(best_n, -np.inf)
+        self.frame_count = 0  # frames scored
+        self.dropped = 0  # frames skipped because the worker was busy
+        self.lock = threading.Lock()
+        self.queue = queue.Queue(maxsize=QUEUE_FRAMES)
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    # hand a frame over to the worker (called by the live view, never blocks)
+    def submit(self, frame):
+        try:
+            self.queue.put_nowait(('frame', frame))
+        except queue.Full:
+            self.dropped += 1
+
+    # stack the best frames on the worker, callback(image uint8) is called on the worker thread
+    def request_stack(self, callback):
+        self.queue.put(('stack', callback))
+
+    def reset(self):
+        with self.lock:
+            self.scores[:] = -np.inf
+            self.frame_count = 0
+            self.dropped = 0
+
+    def stop(self):
+        self.queue.put(('stop', None))
+        self.thread.join()
+
+    def work(self):
+        while True:
+            command, argument = self.queue.get()
+            if command == 'frame':
+                self.add(argument)
+            elif command == 'stack':
+                argument(self.stack())
+            else:
+                break
+
+    # score a frame and keep it, if it is better than the worst kept frame
+    def add(self, frame):
+        frame = frame.reshape(frame.shape[0], frame.shape[1], -1)[:, :, :self.frames.shape[3]]
+        score = sharpness(luminance(frame))
+        with self.lock:
+            self.frame_count += 1
+            worst = int(np.argmin(self.scores))
+            if score > self.scores[worst]:
+                np.copyto(self.frames[worst], frame)
+                self.scores[worst] = score
+
+    # aligned mean of the kept frames (uint8), None if no frame was scored yet
+    def stack(self):
+        with self.lock:
+            kept = np.nonzero(np.isfinite(self.scores))[0]
+            if not len(kept):
+                return None
+            frames = self.frames[kept].copy()
+            order = np.argsort(-self.scores[kept])
+        reference_fft = np.fft.rfft2(luminance(frames[order[0]]))
+        total = frames[order[0]].astype(np.float32)
+        for i in order[1:]:
+            dy, dx = phase_correlation(reference_fft, np.fft.rfft2(luminance(frames[i])))
+            total += np.roll(frames[i], (dy, dx), axis=(0, 1))
+        return np.clip(total / len(kept) + 0.5, 0, 255).astype(np.uint8)
+
+
+if __name__ == "__main__":
+    from camerasources import SyntheticMoonSource
+
+    parser = argparse.ArgumentParser(description="Lucky imaging of synthetic Moon frames: throughput and stack time")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--best', type=int, default=BEST_N, help="number of frames stacked")
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--fps', type=float, default=25, help="frame rate of the synthetic camera")
+    args = parser.parse_args()
+
+    source = SyntheticMoonSource(args.width, args.height, args.fps)
+    stacker = LuckyStacker(args.width, args.height, best_n=args.best)
+    source.start()
+    start = time.perf_counter()
+    for _ in range(args.frames):
+        stacker.submit(source.capture_array())
+    elapsed = time.perf_counter() - start
+    done = threading.Event()
+    stack_start = time.perf_counter()
+    result = []
+    stacker.request_stack(lambda image: (result.append(image), done.set()))
+    done.wait()
+    stack_s = time.perf_counter() - stack_start
+    stacker.stop()
+    print("%d frames at %.1f frames/s: %d scored, %d dropped, stack of %d frames in %.0f ms"
+          % (args.frames, args.frames / elapsed, stacker.frame_count, stacker.dropped, args.best, stack_s * 1000.0))
+    # noise: standard deviation of the dark sky in the corner
+    frame = source.capture_array()
+    print("noise: single frame %.2f, stack %.2f" % (luminance(frame)[:32, :32].std(),
+                                                    luminance(result[0])[:32, :32].std()))
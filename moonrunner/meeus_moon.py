@@ -0,0 +1,327 @@
+import math
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+# meeus_moon.py contains a fast, low-precision analytical model of the Moon's position, based on the truncated
+# ELP-2000/82 lunar theory from Jean Meeus, "Astronomical Algorithms" (2nd ed.), chapter 47 (incl. the low-accuracy
+# nutation of chapter 22, the sidereal time of chapter 12 and the topocentric parallax of chapter 40).
+# It needs no ephemeris file (e.g. "de421.bsp") and nothing but numpy, so the start-up cost is negligible. This is
+# helpful on small boards (e.g. Raspberry Pi Zero) and for quick command line queries, where loading the ephemeris
+# with Skyfield takes most of the runtime.
+#
+# The model is used by MRotController in mrotorctl.py with backend=BACKEND_MEEUS.
+#
+# Accuracy (worst case against the Skyfield/de421 path of MRotController, 20000 random times 1990..2050 and random
+# QTHs, Moon above -5 deg elevation, see "python meeus_moon.py"):
+#   azimuth * cos(elevation):  0.0074 deg  (the pure azimuth difference reaches 0.3 deg close to the zenith only)
+#   elevation:                 0.0077 deg
+#   distance:                  48 km
+# Most EME dish beamwidths are > 1 deg, so this is good enough for tracking. The rounding to 2 decimals in
+# MRotController alone gives an error of up to 0.005 deg.
+#
+# All functions are written with numpy ufuncs and accept numbers or numpy arrays, so the same code serves single
+# positions and many times and observers in one vectorized pass (moon_equatorial_positions and
+# topocentric_azimuth_elevation_array, used by MRotController for tracks and station lists).
+# Speed (desktop PC): ~0.2 ms per single position, ~11 us per position in a vectorized track, Skyfield: ~2.9 ms per
+# position plus the import and ephemeris load.
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+EARTH_RADIUS_KM = 6378.14  # equatorial radius of the Earth (Meeus)
+EARTH_FLATTENING_B_A = 0.99664719  # ratio of polar to equatorial radius of the Earth (Meeus)
+
+# Periodic terms for the longitude (sigma_l) and distance (sigma_r) of the Moon (Meeus table 47.A)
+# multiples of the arguments D, M, M', F and the coefficients of sine (longitude) and cosine (distance)
+TERMS_LR = np.array((
+    (0, 0, 1, 0, 6288774, -20905355), (2, 0, -1, 0, 1274027, -3699111), (2, 0, 0, 0, 658314, -2955968),
+    (0, 0, 2, 0, 213618, -569925), (0, 1, 0, 0, -185116, 48888), (0, 0, 0, 2, -114332, -3149),
+    (2, 0, -2, 0, 58793, 246158), (2, -1, -1, 0, 57066, -152138), (2, 0, 1, 0, 53322, -170733),
+    (2, -1, 0, 0, 45758, -204586), (0, 1, -1, 0, -40923, -129620), (1, 0, 0, 0, -34720, 108743),
+    (0, 1, 1, 0, -30383, 104755), (2, 0, 0, -2, 15327, 10321), (0, 0, 1, 2, -12528, 0),
+    (0, 0, 1, -2, 10980, 79661), (4, 0, -1, 0, 10675, -34782), (0, 0, 3, 0, 10034, -23210),
+    (4, 0, -2, 0, 8548, -21636), (2, 1, -1, 0, -7888, 24208), (2, 1, 0, 0, -6766, 30824),
+    (1, 0, -1, 0, -5163, -8379), (1, 1, 0, 0, 4987, -16675), (2, -1, 1, 0, 4036, -12831),
+    (2, 0, 2, 0, 3994, -10445), (4, 0, 0, 0, 3861, -11650), (2, 0, -3, 0, 3665, 14403),
+    (0, 1, -2, 0, -2689, -7003), (2, 0, -1, 2, -2602, 0), (2, -1, -2, 0, 2390, 10056),
+    (1, 0, 1, 0, -2348, 6322), (2, -2, 0, 0, 2236, -9884), (0, 1, 2, 0, -2120, 5751),
+    (0, 2, 0, 0, -2069, 0), (2, -2, -1, 0, 2048, -4950), (2, 0, 1, -2, -1773, 4130),
+    (2, 0, 0, 2, -1595, 0), (4, -1, -1, 0, 1215, -3958), (0, 0, 2, 2, -1110, 0),
+    (3, 0, -1, 0, -892, 3258), (2, 1, 1, 0, -810, 2616), (4, -1, -2, 0, 759, -1897),
+    (0, 2, -1, 0, -713, -2117), (2, 2, -1, 0, -700, 2354), (2, 1, -2, 0, 691, 0),
+    (2, -1, 0, -2, 596, 0), (4, 0, 1, 0, 549, -1423), (0, 0, 4, 0, 537, -1117),
+    (4, -1, 0, 0, 520, -1571), (1, 0, -2, 0, -487, -1739), (2, 1, 0, -2, -399, 0),
+    (0, 0, 2, -2, -381, -4421), (1, 1, 1, 0, 351, 0), (3, 0, -2, 0, -340, 0),
+    (4, 0, -3, 0, 330, 0), (2, -1, 2, 0, 327, 0), (0, 2, 1, 0, -323, 1165),
+    (1, 1, -1, 0, 299, 0), (2, 0, 3, 0, 294, 0), (2, 0, -1, -2, 0, 8752),
+), dtype=float)
+
+# Periodic terms for the latitude (sigma_b) of the Moon (Meeus table 47.B)
+TERMS_B = np.array((
+    (0, 0, 0, 1, 5128122), (0, 0, 1, 1, 280602), (0, 0, 1, -1, 277693), (2, 0, 0, -1, 173237),
+    (2, 0, -1, 1, 55413), (2, 0, -1, -1, 46271), (2, 0, 0, 1, 32573), (0, 0, 2, 1, 17198),
+    (2, 0, 1, -1, 9266), (0, 0, 2, -1, 8822), (2, -1, 0, -1, 8216), (2, 0, -2, -1, 4324),
+    (2, 0, 1, 1, 4200), (2, 1, 0, -1, -3359), (2, -1, -1, 1, 2463), (2, -1, 0, 1, 2211),
+    (2, -1, -1, -1, 2065), (0, 1, -1, -1, -1870), (4, 0, -1, -1, 1828), (0, 1, 0, 1, -1794),
+    (0, 0, 0, 3, -1749), (0, 1, -1, 1, -1565), (1, 0, 0, 1, -1491), (0, 1, 1, 1, -1475),
+    (0, 1, 1, -1, -1410), (0, 1, 0, -1, -1344), (1, 0, 0, -1, -1335), (0, 0, 3, 1, 1107),
+    (4, 0, 0, -1, 1021), (4, 0, -1, 1, 833), (0, 0, 1, -3, 777), (4, 0, -2, 1, 671),
+    (2, 0, 0, -3, 607), (2, 0, 2, -1, 596), (2, -1, 1, -1, 491), (2, 0, -2, 1, -451),
+    (0, 0, 3, -1, 439), (2, 0, 2, 1, 422), (2, 0, -3, -1, 421), (2, 1, -1, 1, -366),
+    (2, 1, 0, 1, -351), (4, 0, 0, 1, 331), (2, -1, 1, 1, 315), (2, -2, 0, -1, 302),
+    (0, 0, 1, 3, -283), (2, 1, 1, -1, -229), (1, 1, 0, -1, 223), (1, 1, 0, 1, 223),
+    (0, 1, -2, -1, -220), (2, 1, -1, -1, -220), (1, 0, 1, 1, -185), (2, -1, -2, -1, 181),
+    (0, 1, 2, 1, -177), (4, 0, -2, -1, 176), (4, -1, -1, -1, 166), (1, 0, 1, -1, -164),
+    (4, 0, 1, -1, 132), (1, 0, -1, -1, -119), (4, -1, 0, -1, 115), (2, -2, 0, 1, 107),
+), dtype=float)
+
+
+# Julian date (UT) of a datetime object (naive datetime objects are taken as UTC)
+def julian_date(dt):
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return 2440587.5 + (dt - datetime(1970, 1, 1)).total_seconds() / 86400.0
+
+
+# approximation of Delta T = TT - UT in seconds (polynomials from Espenak & Meeus, valid 1961..2150)
+def delta_t_seconds(year):
+    if year < 1986:
+        t = year - 1975
+        return 45.45 + 1.067 * t - t * t / 260 - t ** 3 / 718
+    if year < 2005:
+        t = year - 2000
+        return 63.86 + 0.3345 * t - 0.060374 * t ** 2 + 0.0017275 * t ** 3 + 0.000651814 * t ** 4 \
+            + 0.00002373599 * t ** 5
+    if year < 2017:
+        t = year - 2000
+        return 62.92 + 0.32217 * t + 0.005589 * t * t
+    # since the leap second 2017-01-01, TT - UTC = 69.184 s (UT1 - UTC < 0.9 s is neglected)
+    if year < 2050:
+        return 69.184
+    return -20 + 32 * ((year - 1820) / 100) ** 2 - 0.5628 * (2150 - year)
+
+
+# geocentric ecliptic longitude, latitude [deg] (mean equinox of date) and distance [km] of the Moon
+# jde: Julian Ephemeris Day (TT), a number or a numpy array (the results have the same shape)
+def moon_ecliptic_position(jde):
+    t = (np.asarray(jde, dtype=float) - 2451545.0) / 36525.0
+    t2, t3, t4 = t * t, t * t * t, t * t * t * t
+    lm = 218.3164477 + 481267.88123421 * t - 0.0015786 * t2 + t3 / 538841 - t4 / 65194000
+    d = np.radians(297.8501921 + 445267.1114034 * t - 0.0018819 * t2 + t3 / 545868 - t4 / 113065000)
+    m = np.radians(357.5291092 + 35999.0502909 * t - 0.0001536 * t2 + t3 / 24490000)
+    mm = np.radians(134.9633964 + 477198.8675055 * t + 0.0087414 * t2 + t3 / 69699 - t4 / 14712000)
+    f = np.radians(93.2720950 + 483202.0175233 * t - 0.0036539 * t2 - t3 / 3526000 + t4 / 863310000)
+    a1 = np.radians(119.75 + 131.849 * t)
+    a2 = np.radians(53.09 + 479264.290 * t)
+    a3 = np.radians(313.45 + 481266.484 * t)
+    e = 1 - 0.002516 * t - 0.0000074 * t2
+
+    # periodic terms along the last axis: arguments as a matrix product, factor E^|M| for the terms with M
+    arguments = np.stack((d, m, mm, f), axis=-1)
+    arg_lr = arguments @ TERMS_LR[:, :4].T
+    factor_lr = e[..., np.newaxis] ** np.abs(TERMS_LR[:, 1])
+    sigma_l = np.sum(TERMS_LR[:, 4] * factor_lr * np.sin(arg_lr), axis=-1)
+    sigma_r = np.sum(TERMS_LR[:, 5] * factor_lr * np.cos(arg_lr), axis=-1)
+    sigma_b = np.sum(TERMS_B[:, 4] * e[..., np.newaxis] ** np.abs(TERMS_B[:, 1])
+                     * np.sin(arguments @ TERMS_B[:, :4].T), axis=-1)
+
+    lm_rad = np.radians(lm)
+    sigma_l += 3958 * np.sin(a1) + 1962 * np.sin(lm_rad - f) + 318 * np.sin(a2)
+    sigma_b += -2235 * np.sin(lm_rad) + 382 * np.sin(a3) + 175 * np.sin(a1 - f) + 175 * np.sin(a1 + f) \
+        + 127 * np.sin(lm_rad - mm) - 115 * np.sin(lm_rad + mm)
+
+    longitude = (lm + sigma_l / 1000000.0) % 360.0
+    latitude = sigma_b / 1000000.0
+    distance_km = 385000.56 + sigma_r / 1000.0
+    return longitude, latitude, distance_km
+
+
+# nutation in longitude and obliquity [deg] and the mean obliquity of the ecliptic [deg] (Meeus chapter 22)
+def nutation_obliquity(jde):
+    t = (np.asarray(jde, dtype=float) - 2451545.0) / 36525.0
+    omega = np.radians(125.04452 - 1934.136261 * t)
+    l_sun = np.radians(280.4665 + 36000.7698 * t)
+    l_moon = np.radians(218.3165 + 481267.8813 * t)
+    delta_psi = (-17.20 * np.sin(omega) - 1.32 * np.sin(2 * l_sun) - 0.23 * np.sin(2 * l_moon)
+                 + 0.21 * np.sin(2 * omega)) / 3600.0
+    delta_eps = (9.20 * np.cos(omega) + 0.57 * np.cos(2 * l_sun) + 0.10 * np.cos(2 * l_moon)
+                 - 0.09 * np.cos(2 * omega)) / 3600.0
+    eps0 = 23.4392911111 + (-46.8150 * t - 0.00059 * t * t + 0.001813 * t * t * t) / 3600.0
+    return delta_psi, delta_eps, eps0
+
+
+# Greenwich mean sidereal time [deg] (Meeus chapter 12), jd: Julian date (UT)
+def greenwich_mean_sidereal_time(jd):
+    jd = np.asarray(jd, dtype=float)
+    t = (jd - 2451545.0) / 36525.0
+    return (280.46061837 + 360.98564736629 * (jd - 2451545.0) + 0.000387933 * t * t - t * t * t / 38710000) % 360.0
+
+
+# atmospheric refraction [deg] for a true (airless) altitude [deg] (Saemundsson/Bennett formula, Meeus chapter 16)
+def refraction_degrees(altitude_deg, temperature_c=10.0, pressure_mbar=1010.0):
+    altitude_deg = np.asarray(altitude_deg, dtype=float)
+    r = 1.02 / np.tan(np.radians(altitude_deg + 10.3 / (altitude_deg + 5.11)))
+    return np.where(altitude_deg < -1.0, 0.0,
+                    r / 60.0 * (pressure_mbar / 1010.0) * (283.0 / (273.0 + temperature_c)))[()]
+
+
+# apparent geocentric right ascension, declination [deg] (true equator and equinox of date) and distance [km]
+# plus the Greenwich apparent sidereal time [deg] from the Julian date (UT) and Julian Ephemeris Day (TT),
+# numbers or numpy arrays of the same shape
+def equatorial_position_jd(jd, jde):
+    lon, lat, distance_km = moon_ecliptic_position(jde)
+    delta_psi, delta_eps, eps0 = nutation_obliquity(jde)
+    eps = np.radians(eps0 + delta_eps)
+    lam = np.radians(lon + delta_psi)
+    beta = np.radians(lat)
+    ra = np.degrees(np.arctan2(np.sin(lam) * np.cos(eps) - np.tan(beta) * np.sin(eps), np.cos(lam)))
+    dec = np.degrees(np.arcsin(np.sin(beta) * np.cos(eps) + np.cos(beta) * np.sin(eps) * np.sin(lam)))
+    gast = greenwich_mean_sidereal_time(jd) + delta_psi * np.cos(eps)
+    return ra % 360.0, dec, distance_km, gast % 360.0
+
+
+# Julian Ephemeris Day (TT) of a UTC datetime with the Julian date jd (UT)
+def julian_ephemeris_day(dt_utc, jd):
+    return jd + delta_t_seconds(dt_utc.year + (dt_utc.month - 0.5) / 12.0) / 86400.0
+
+
+# moon_equatorial_position at the given UTC datetime
+def moon_equatorial_position(dt_utc):
+    jd = julian_date(dt_utc)
+    return equatorial_position_jd(jd, julian_ephemeris_day(dt_utc, jd))
+
+
+# moon_equatorial_position for a list of UTC datetimes in one vectorized pass: returns arrays ra, dec [deg],
+# distance [km] and the Greenwich apparent sidereal time [deg] with the shape (times,)
+def moon_equatorial_positions(times_utc):
+    jd = np.array([julian_date(dt) for dt in times_utc], dtype=float)
+    jde = np.array([julian_ephemeris_day(dt, value) for dt, value in zip(times_utc, jd)], dtype=float)
+    return equatorial_position_jd(jd, jde)
+
+
+# topocentric azimuth (from North over East), elevation [deg] and distance [km] of the Moon
+# dt_utc: datetime (UTC), latitude/longitude: degrees (North/East positive), elevation_m: height above sea level
+# refraction: add the atmospheric refraction (standard atmosphere) to the elevation
+def moon_azimuth_elevation(dt_utc, latitude, longitude, elevation_m=0.0, refraction=False):
+    return topocentric_azimuth_elevation(moon_equatorial_position(dt_utc), latitude, longitude, elevation_m,
+                                         refraction)
+
+
+# topocentric azimuth, elevation [deg] and distance [km] from the result of moon_equatorial_position()
+# (calculate the equatorial position once per time to get the position for many observers)
+# all arguments may be numpy arrays, which are broadcast against each other
+def topocentric_azimuth_elevation(equatorial_position, latitude, longitude, elevation_m=0.0, refraction=False):
+    ra, dec, distance_km, gast = equatorial_position
+
+    # topocentric parallax (Meeus chapter 11 and 40)
+    phi = np.radians(latitude)
+    u = np.arctan(EARTH_FLATTENING_B_A * np.tan(phi))
+    rho_sin_phi = EARTH_FLATTENING_B_A * np.sin(u) + elevation_m / 6378140.0 * np.sin(phi)
+    rho_cos_phi = np.cos(u) + elevation_m / 6378140.0 * np.cos(phi)
+    sin_pi = EARTH_RADIUS_KM / distance_km
+
+    h = np.radians(gast + longitude - ra)
+    delta = np.radians(dec)
+    a = np.cos(delta) - rho_cos_phi * sin_pi * np.cos(h)
+    delta_alpha = np.arctan2(-rho_cos_phi * sin_pi * np.sin(h), a)
+    delta_topo = np.arctan2((np.sin(delta) - rho_sin_phi * sin_pi) * np.cos(delta_alpha), a)
+    h_topo = h - delta_alpha
+
+    # horizontal coordinates (Meeus chapter 13), azimuth measured from North
+    az = np.degrees(np.arctan2(np.sin(h_topo),
+                               np.cos(h_topo) * np.sin(phi) - np.tan(delta_topo) * np.cos(phi))) + 180.0
+    el = np.degrees(np.arcsin(np.sin(phi) * np.sin(delta_topo)
+                              + np.cos(phi) * np.cos(delta_topo) * np.cos(h_topo)))
+    if refraction:
+        # standard atmosphere: 10 deg C, pressure from the elevation above sea level (like Skyfield)
+        el = el + refraction_degrees(el, 10.0, 1010.0 * np.exp(-elevation_m / 9100.0))
+    # distance from the observer: difference of the geocentric vectors of the Moon and the observer
+    lst = np.radians(gast + longitude)
+    alpha = np.radians(ra)
+    x = distance_km * np.cos(delta) * np.cos(alpha) - EARTH_RADIUS_KM * rho_cos_phi * np.cos(lst)
+    y = distance_km * np.cos(delta) * np.sin(alpha) - EARTH_RADIUS_KM * rho_cos_phi * np.sin(lst)
+    z = distance_km * np.sin(delta) - EARTH_RADIUS_KM * rho_sin_phi
+    distance_topo_km = np.sqrt(x * x + y * y + z * z)
+    return az % 360.0, el, distance_topo_km
+
+
+# topocentric_azimuth_elevation for arrays of observers (latitudes, longitudes, elevations_m, shape (stations,)) and
+# the result of moon_equatorial_positions (shape (times,)): returns arrays az, el [deg] and distance [km] with the
+# shape (stations, times)
+def topocentric_azimuth_elevation_array(equatorial_positions, latitudes, longitudes, elevations_m=0.0,
+                                        refraction=False):
+    equatorial_positions = [np.asarray(value, dtype=float)[np.newaxis, :] for value in equatorial_positions]
+    latitudes = np.asarray(latitudes, dtype=float)
+    elevations_m = np.broadcast_to(np.asarray(elevations_m, dtype=float), latitudes.shape)[:, np.newaxis]
+    longitudes = np.asarray(longitudes, dtype=float)[:, np.newaxis]
+    return topocentric_azimuth_elevation(equatorial_positions, latitudes[:, np.newaxis], longitudes, elevations_m,
+                                         refraction)
+
+
+if __name__ == "__main__":
+    #######################################################
+    # The main method is used for test purpose only.
+    # It shows the speed of the model and the error against Skyfield (de421.bsp needed)
+    #######################################################
+    import random
+
+    dt_utc = datetime(2023, 7, 25, 16, 22, tzinfo=timezone.utc)
+    print("Moon az, el, distance [km]:", moon_azimuth_elevation(dt_utc, 47.468, 9.732, 500))
+
+    n = 10000
+    start = time.perf_counter()
+    for i in range(n):
+        moon_azimuth_elevation(dt_utc, 47.468, 9.732, 500)
+    print("Meeus model: %.1f us per position" % ((time.perf_counter() - start) / n * 1e6))
+
+    try:
+        from skyfield.api import load, wgs84
+    except ImportError:
+        print("Skyfield is not installed - no comparison")
+    else:
+        start = time.perf_counter()
+        eph = load('de421.bsp')
+        ts = load.timescale()
+        earth, moon = eph['earth'], eph['moon']
+        print("Skyfield: %.3f s to load the ephemeris and timescale" % (time.perf_counter() - start))
+
+        random.seed(1)
+        max_az, max_az_cos, max_el, max_d, count = 0.0, 0.0, 0.0, 0.0, 0
+        start = time.perf_counter()
+        n = 20000
+        for i in range(n):
+            dt = datetime.fromtimestamp(random.randint(631152000, 2524608000), timezone.utc)
+            lat, lon, elev = random.uniform(-70, 70), random.uniform(-180, 180), random.uniform(0, 3000)
+            alt, az, d = (earth + wgs84.latlon(lat, lon, elev)).at(ts.from_datetime(dt)).observe(moon)\
+                .apparent().altaz()
+            if alt.degrees < -5:
+                continue
+            m_az, m_el, m_d = moon_azimuth_elevation(dt, lat, lon, elev)
+            d_az = abs((m_az - az.degrees + 180) % 360 - 180)
+            max_az = max(max_az, d_az)
+            max_az_cos = max(max_az_cos, d_az * math.cos(alt.radians))
+            max_el = max(max_el, abs(m_el - alt.degrees))
+            max_d = max(max_d, abs(m_d - d.km))
+            count += 1
+        print("Skyfield: %.1f us per position" % ((time.perf_counter() - start) / n * 1e6))
+        print("max error of %d positions: az=%.4f deg, az*cos(el)=%.4f deg, el=%.4f deg, distance=%.1f km"
+              % (count, max_az, max_az_cos, max_el, max_d))
@@ -208,6 +208,28 @@ getspindownImage = spindown.GetImage
 getspinupImage = spinup.GetImage
 getspindisabledImage = spindisabled.GetImage
 
+#Process wide cache of the decoded and scaled spinner bitmaps, shared by all MiniSpinCtrl instances
+#Key: (state, height) - state is one of 'up', 'down', 'updown', 'disabled'
+_spin_images = {'up': getspinupImage, 'down': getspindownImage, 'updown': getspinupdownImage,
+                'disabled': getspindisabledImage}
+_bitmap_cache = {}
+
+def GetSpinBitmap(state, height):
+    """
+    Return the spinner bitmap for the state, scaled to full height and half the height as width.
+    The image is decoded and scaled only once per state and height.
+    """
+    key = (state, height)
+    bitmap = _bitmap_cache.get(key)
+    if bitmap is None:
+        img = _spin_images[state]().Scale(int(height/2), int(height), quality=wx.IMAGE_QUALITY_HIGH)
+        if PY2:
+            bitmap = wx.BitmapFromImage(img)
+        else:
+            bitmap = wx.Bitmap(img)
+        _bitmap_cache[key] = bitmap
+    return bitmap
+
 mscEVT_MINISPINCTRL = wx.NewEventType()
 EVT_MINISPINCTRL = wx.PyEventBinder(mscEVT_MINISPINCTRL, 1)
 mscEVT_MINISPINUP = wx.NewEventType()
@@ -286,10 +308,7 @@ class MiniSpinCtrl(wx.Control):
 
         self.ctl = wx.TextCtrl(self, id, value=str(self._initial), \
             pos=self._pos, size=self._size, style=self._style, name=self._name)
-        if PY2:
-            self.spinner = wx.StaticBitmap(self, -1, bitmap=wx.BitmapFromImage(self._img))
-        else:
-            self.spinner = wx.StaticBitmap(self, -1, bitmap=wx.Bitmap(self._img))
+        self.spinner = wx.StaticBitmap(self, -1, bitmap=self._img)
 
         #End
 
@@ -315,10 +334,12 @@ class MiniSpinCtrl(wx.Control):
         self.spinner.SetBackgroundColour(self.GetBackgroundColour())
 
     def InitialiseBitmaps(self):
-        self._imgup = self.SetImageSize(getspinupImage())
-        self._imgdown = self.SetImageSize(getspindownImage())
-        self._imgupdown = self.SetImageSize(getspinupdownImage())
-        self._imgdisabled = self.SetImageSize(getspindisabledImage())
+        #Bitmaps from the shared cache, decoded and scaled only once per height
+        h = self.GetSize()[1]
+        self._imgup = GetSpinBitmap('up', h)
+        self._imgdown = GetSpinBitmap('down', h)
+        self._imgupdown = GetSpinBitmap('updown', h)
+        self._imgdisabled = GetSpinBitmap('disabled', h)
         if self._initial <= self._min:
             self._img = self._imgup
         elif self._initial >= self._max:
@@ -326,12 +347,6 @@ class MiniSpinCtrl(wx.Control):
         else:
             self._img = self._imgupdown
 
-    def SetImageSize(self,img):
-        #Size the image as Full height and the width is half the height
-        h = self.GetSize()[1]
-        img = img.Scale(int(h/2),int(h),quality=wx.IMAGE_QUALITY_HIGH)
-        return img
-
     def SetValue(self,value):
         self.ctl.SetValue(str(value))
         self.SetImage(value)
@@ -383,10 +398,7 @@ class MiniSpinCtrl(wx.Control):
             #Disable - Freeze the controls Value and change bitmap
             self._frozen_value = self.ctl.GetValue()
             self._img = self._imgdisabled
-            if PY2:
-                self.spinner.SetBitmap(wx.BitmapFromImage(self._img))
-            else:
-                self.spinner.SetBitmap(wx.Bitmap(self._img))
+            self.spinner.SetBitmap(self._img)
 
     def OnReset(self):
         #Reset the control to the state it was in when it was Disabled
@@ -573,15 +585,15 @@ class MiniSpinCtrl(wx.Control):
         self.SetImage(value)
 
     def SetImage(self, value):
-        #Set appropriate image
+        #Set appropriate image, the cached bitmap is only set if the state changes
         if value <= self._min:
-            self._img = self._imgup
+            img = self._imgup
         elif value >= self._max:
-            self._img = self._imgdown
-        else:
-            self._img = self._imgupdown
-        if PY2:
-            self.spinner.SetBitmap(wx.BitmapFromImage(self._img))
+            img = self._imgdown
         else:
-            self.spinner.SetBitmap(wx.Bitmap(self._img))
+            img = self._imgupdown
+        if img is self._img:
+            return
+        self._img = img
+        self.spinner.SetBitmap(self._img)
         self.Layout()
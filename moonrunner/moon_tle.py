@@ -0,0 +1,232 @@
+import argparse
+import math
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from sgp4.api import Satrec, SatrecArray, WGS72
+from skyfield.api import load
+from skyfield.sgp4lib import TEME
+
+from meeus_moon import julian_date
+from mrotorctl import load_ephemeris, EPHEMERIS_FULL
+
+# moon_tle.py generates "pseudo Kepler" TLE data for the Moon (see the README and [^1]), so tools like gPredict can
+# track the Moon with their SGP4 model instead of a full ephemeris.
+# For every validity window (default 1 day) mean elements are fitted to the apparent geocentric Moon position of the
+# Skyfield ephemeris (in the TEME frame used by SGP4):
+#   1. initial guess: osculating elements of the Moon's position and velocity at the window center (the TLE epoch)
+#   2. Levenberg-Marquardt least squares of the 6 elements (inclination, RAAN, eccentricity, argument of perigee,
+#      mean anomaly, mean motion); every evaluation propagates the whole time grid of the window with one vectorized
+#      SGP4 call (SatrecArray), the Jacobian is evaluated as one batch of 6 perturbed element sets
+# The fitted TLE is formatted, parsed again and compared with the ephemeris, so the reported error is the error of the
+# TLE as written (rounded elements). The error is the angle between the TLE and the ephemeris direction seen from the
+# Earth's center [deg] and the position difference [km].
+#
+# Usage: python moon_tle.py [--start 2026-10-19] [--days 7] [--window 1] [--output moon.tle]
+# The fitted errors are printed and written to <output>.fit.txt.
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+SATNUM = 90301  # catalog number of the pseudo satellite "MOON" (not a real catalog object)
+NAME = 'MOON'
+MU_WGS72 = 398600.8  # gravitational parameter of the Earth used by SGP4 (WGS72) [km^3/s^2]
+WINDOW_DAYS = 1.0  # validity window of one TLE [days]
+GRID_MIN = 30  # time grid of the fit [min]
+ITERATIONS = 30  # maximum number of Levenberg-Marquardt iterations
+JD_1949 = 2433281.5  # epoch origin of sgp4init (1949 December 31 00:00 UT)
+# step sizes for the numerical Jacobian: inclination, RAAN, eccentricity, argument of perigee, mean anomaly [rad, -],
+# mean motion [rad/min]
+JACOBIAN_STEPS = np.array([1e-6, 1e-6, 1e-7, 1e-6, 1e-6, 1e-10])
+
+
+# a fitted TLE with its error over the validity window
+class MoonTLE:
+    def __init__(self, epoch, line1, line2, max_error_deg, rms_error_deg, max_error_km):
+        self.epoch = epoch  # datetime UTC (center of the window)
+        self.line1 = line1
+        self.line2 = line2
+        self.max_error_deg = max_error_deg
+        self.rms_error_deg = rms_error_deg
+        self.max_error_km = max_error_km
+
+    def __repr__(self):
+        return "%s  max %.4f deg, rms %.4f deg, max %.0f km" % (self.epoch.strftime("%Y-%m-%d %H:%M"),
+                                                               self.max_error_deg, self.rms_error_deg,
+                                                               self.max_error_km)
+
+
+def tle_checksum(line):
+    return sum(int(c) if c.isdigit() else (1 if c == '-' else 0) for c in line) % 10
+
+
+# the two TLE lines for the elements (angles in rad, mean motion in rad/min) at the epoch (datetime UTC)
+def format_tle(epoch, inclination, raan, eccentricity, argp, mean_anomaly, mean_motion, satnum=SATNUM):
+    day_of_year = (epoch - datetime(epoch.year, 1, 1, tzinfo=timezone.utc)).total_seconds() / 86400.0 + 1.0
+    line1 = "1 %05dU %-8s %02d%012.8f  .00000000  00000-0  00000-0 0  999" % (satnum, '', epoch.year % 100,
+                                                                            day_of_year)
+    revs_per_day = mean_motion * 1440.0 / (2.0 * math.pi)
+    line2 = "2 %05d %8.4f %8.4f %07d %8.4f %8.4f %11.8f%5d" % (
+        satnum, math.degrees(inclination) % 360.0, math.degrees(raan) % 360.0, round(eccentricity * 1e7),
+        math.degrees(argp) % 360.0, math.degrees(mean_anomaly) % 360.0, revs_per_day, 0)
+    return line1 + str(tle_checksum(line1)), line2 + str(tle_checksum(line2))
+
+
+# osculating elements (inclination, RAAN, eccentricity, argument of perigee, mean anomaly [rad], mean motion
+# [rad/min]) of the position r [km] and velocity v [km/s]
+def osculating_elements(r, v, mu=MU_WGS72):
+    h = np.cross(r, v)
+    node = np.cross([0.0, 0.0, 1.0], h)
+    e_vector = np.cross(v, h) / mu - r / np.linalg.norm(r)
+    eccentricity = np.linalg.norm(e_vector)
+    a = 1.0 / (2.0 / np.linalg.norm(r) - np.dot(v, v) / mu)
+    inclination = math.acos(h[2] / np.linalg.norm(h))
+    raan = math.atan2(node[1], node[0]) % (2 * math.pi)
+    argp = math.acos(np.clip(np.dot(node, e_vector) / (np.linalg.norm(node) * eccentricity), -1, 1))
+    if e_vector[2] < 0:
+        argp = 2 * math.pi - argp
+    true_anomaly = math.acos(np.clip(np.dot(e_vector, r) / (eccentricity * np.linalg.norm(r)), -1, 1))
+    if np.dot(r, v) < 0:
+        true_anomaly = 2 * math.pi - true_anomaly
+    eccentric_anomaly = 2 * math.atan2(math.sqrt(1 - eccentricity) * math.sin(true_anomaly / 2),
+                                       math.sqrt(1 + eccentricity) * math.cos(true_anomaly / 2))
+    mean_anomaly = (eccentric_anomaly - eccentricity * math.sin(eccentric_anomaly)) % (2 * math.pi)
+    mean_motion = math.sqrt(mu / a ** 3) * 60.0
+    return np.array([inclination, raan, eccentricity, argp, mean_anomaly, mean_motion])
+
+
+class MoonTLEGenerator:
+    # ephemeris: the full ephemeris by default, the TLEs may be fitted for any date
+    def __init__(self, ephemeris=EPHEMERIS_FULL, grid_min=GRID_MIN):
+        self.eph = load_ephemeris(ephemeris)
+        self.ts = load.timescale()
+        self.earth, self.moon = self.eph['earth'], self.eph['moon']
+        self.grid_min = grid_min
+
+    # apparent geocentric Moon position and velocity in TEME [km, km/s] for a list of datetimes (UTC)
+    def moon_teme(self, times):
+        t = self.ts.from_datetimes(times)
+        apparent = self.earth.at(t).observe(self.moon).apparent()
+        r = apparent.frame_xyz(TEME).km
+        v = apparent.frame_xyz_and_velocity(TEME)[1].km_per_s
+        return r.T, v.T
+
+    # SGP4 positions [km] of several element sets (rows of elements) at the Julian dates jd + fr, shape (sets, times, 3)
+    @staticmethod
+    def propagate(elements, epoch_jd, jd, fr):
+        satellites = []
+        for inclination, raan, eccentricity, argp, mean_anomaly, mean_motion in elements:
+            satellite = Satrec()
+            satellite.sgp4init(WGS72, 'i', SATNUM, epoch_jd - JD_1949, 0.0, 0.0, 0.0, eccentricity, argp,
+                               inclination, mean_anomaly, mean_motion, raan)
+            satellites.append(satellite)
+        errors, r, v = SatrecArray(satellites).sgp4(jd, fr)
+        r[errors != 0] = np.nan
+        return r
+
+    # fit a TLE to the window [start, start + window_days]
+    def fit(self, start, window_days=WINDOW_DAYS):
+        epoch = start + timedelta(days=window_days / 2)
+        times = [start + timedelta(minutes=m) for m in np.arange(0, window_days * 1440 + 1, self.grid_min)]
+        target, velocity = self.moon_teme(times)
+        jd_utc = np.array([julian_date(t) for t in times])
+        jd, fr = np.floor(jd_utc), jd_utc - np.floor(jd_utc)
+        epoch_jd = julian_date(epoch)
+
+        # initial guess: osculating elements at the epoch
+        epoch_r, epoch_v = self.moon_teme([epoch])
+        elements = osculating_elements(epoch_r[0], epoch_v[0])
+
+        # Levenberg-Marquardt, the residuals are the position differences [km] on the time grid
+        damping = 1e-3
+        residual = (self.propagate([elements], epoch_jd, jd, fr)[0] - target).ravel()
+        cost = np.dot(residual, residual)
+        for iteration in range(ITERATIONS):
+            perturbed = elements + np.diag(JACOBIAN_STEPS)
+            positions = self.propagate(np.vstack([perturbed]), epoch_jd, jd, fr)
+            jacobian = ((positions - target).reshape(6, -1) - residual).T / JACOBIAN_STEPS
+            normal = jacobian.T @ jacobian
+            gradient = jacobian.T @ residual
+            improved = False
+            while damping < 1e10:
+                step = np.linalg.solve(normal + damping * np.diag(np.diag(normal)), -gradient)
+                candidate = elements + step
+                candidate[2] = min(max(candidate[2], 1e-7), 0.9)
+                candidate_residual = (self.propagate([candidate], epoch_jd, jd, fr)[0] - target).ravel()
+                candidate_cost = np.dot(candidate_residual, candidate_residual)
+                if np.isfinite(candidate_cost) and candidate_cost < cost:
+                    relative = (cost - candidate_cost) / cost
+                    elements, residual, cost = candidate, candidate_residual, candidate_cost
+                    damping = max(damping / 10.0, 1e-9)
+                    improved = True
+                    break
+                damping *= 10.0
+            if not improved or relative < 1e-10:
+                break
+
+        # the error of the TLE as written (rounded elements)
+        line1, line2 = format_tle(epoch, *elements)
+        satellite = Satrec.twoline2rv(line1, line2, WGS72)
+        errors, r, v = satellite.sgp4_array(jd, fr)
+        angle = np.degrees(np.arccos(np.clip(np.sum(r * target, axis=1) / (np.linalg.norm(r, axis=1)
+                                                                              * np.linalg.norm(target, axis=1)),
+                                             -1.0, 1.0)))
+        return MoonTLE(epoch, line1, line2, float(np.max(angle)), float(np.sqrt(np.mean(angle ** 2))),
+                       float(np.max(np.linalg.norm(r - target, axis=1))))
+
+    # TLEs for consecutive windows from start (datetime UTC) over days
+    def generate(self, start, days, window_days=WINDOW_DAYS):
+        tles = []
+        window_start = start
+        while window_start < start + timedelta(days=days):
+            tles.append(self.fit(window_start, window_days))
+            window_start += timedelta(days=window_days)
+        return tles
+
+
+# write the TLEs (name line "MOON yymmddhh" with the epoch) and the fitted errors to output_path + '.fit.txt'
+def write_tle_file(tles, output_path):
+    with open(output_path, 'w') as f:
+        for tle in tles:
+            f.write("%s %s\n%s\n%s\n" % (NAME, tle.epoch.strftime("%y%m%d%H"), tle.line1, tle.line2))
+    with open(output_path + '.fit.txt', 'w') as f:
+        f.write("epoch (UTC)       max error [deg] rms error [deg] max error [km]\n")
+        for tle in tles:
+            f.write("%s %15.4f %15.4f %14.0f\n" % (tle.epoch.strftime("%Y-%m-%d %H:%M"), tle.max_error_deg,
+                                                  tle.rms_error_deg, tle.max_error_km))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit pseudo Kepler TLEs of the Moon for SGP4 tools like gPredict")
+    parser.add_argument('--start', default=datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+                        help="start date yyyy-mm-dd (UTC, default: today)")
+    parser.add_argument('--days', type=float, default=7, help="time range [days]")
+    parser.add_argument('--window', type=float, default=WINDOW_DAYS, help="validity window of one TLE [days]")
+    parser.add_argument('--output', default='moon.tle', help="TLE file (default: %(default)s)")
+    parser.add_argument('--ephemeris', default=EPHEMERIS_FULL, help="ephemeris file (default: %(default)s)")
+    args = parser.parse_args()
+
+    generator = MoonTLEGenerator(args.ephemeris)
+    tles = generator.generate(datetime.strptime(args.start, "%Y-%m-%d").replace(tzinfo=timezone.utc), args.days,
+                              args.window)
+    for tle in tles:
+        print(tle)
+    write_tle_file(tles, args.output)
+    print("%d TLEs written to %s, errors to %s.fit.txt" % (len(tles), args.output, args.output))
@@ -0,0 +1,100 @@
+import time
+
+import wx
+
+from eventbus import EventBus, TOPIC_MOON_POSITION, TOPIC_ROTOR_STATE, TOPIC_CAMERA_FRAME
+from moonrunner_gui import GUIMainFrame, DEBUG
+from rotorctl_joystick import JoystickControlPanel
+from profiling import enable_from_argv
+
+# moonrunner_app.py is the single-application mode of MoonRunner: the tracking GUI (moonrunner_gui.py), the joystick
+# (rotorctl_joystick.py) and the camera live view (picamera_live_wx.py) are tabs of one window. Instead of three
+# processes, each with its own wx, ephemeris and rotor connection, all tabs share one MRotController (and ephemeris).
+# The views are connected by an in-process publish/subscribe bus (eventbus.py) carrying the Moon position, the rotor
+# state and the camera frames. The status bar shows the latest messages.
+# The camera tab shows the camera source of config.yaml (camerasources.py): the Pi camera (only shown, if picamera2 is
+# available), a video file or synthetic Moon frames.
+#
+# Usage: python moonrunner_app.py (in the moonrunner directory, uses config.yaml like moonrunner_gui.py)
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+FPS_INTERVAL_S = 2.0  # update interval of the camera frame rate in the status bar [s]
+
+
+class MoonRunnerAppFrame(GUIMainFrame):
+    def __init__(self, debug=False):
+        GUIMainFrame.__init__(self, debug=debug, bus=EventBus(), notebook=True)
+        self.SetMinSize((880, 560))
+
+        # joystick tab, moves the rotor with the shared MRotController
+        self.joystick = JoystickControlPanel(self.notebook, self.rotctl, debug=debug)
+        self.notebook.AddPage(self.joystick, "Joystick")
+
+        # camera tab (camera_source in config.yaml)
+        self.camera = None
+        try:
+            from picamera_live_wx import CameraPanel
+            from camerasources import create_camera_source
+            self.camera = CameraPanel(self.notebook, bus=self.bus, source=create_camera_source(self.config_data[0]))
+            self.notebook.AddPage(self.camera, "Camera")
+        except Exception as ex:
+            print("Camera not available: " + str(ex))
+
+        # status bar: Moon | rotor | camera
+        self.CreateStatusBar(3)
+        self.frame_count = 0
+        self.fps_start = time.monotonic()
+        # the Moon and rotor messages may come from the scheduler thread, the handlers run on the wx main thread
+        self.bus.subscribe(TOPIC_MOON_POSITION, lambda message: wx.CallAfter(self.on_moon_position, message),
+                           replay_last=True)
+        self.bus.subscribe(TOPIC_ROTOR_STATE, lambda message: wx.CallAfter(self.on_rotor_status, message))
+        self.bus.subscribe(TOPIC_CAMERA_FRAME, self.on_camera_frame)
+        self.Fit()
+
+    def on_moon_position(self, message):
+        self.SetStatusText("Moon az %.2f el %.2f" % (message['az'], message['el']), 0)
+
+    def on_rotor_status(self, message):
+        if 'cmd_az' in message:
+            self.SetStatusText("Rotor cmd az %.2f el %.2f" % (message['cmd_az'], message['cmd_el']), 1)
+        else:
+            self.SetStatusText("Rotor read az %.2f el %.2f" % (message['read_az'], message['read_el']), 1)
+
+    def on_camera_frame(self, message):
+        self.frame_count += 1
+        elapsed = time.monotonic() - self.fps_start
+        if elapsed >= FPS_INTERVAL_S:
+            self.SetStatusText("Camera %.1f fps" % (self.frame_count / elapsed), 2)
+            self.frame_count = 0
+            self.fps_start = time.monotonic()
+
+    def on_close(self, e):
+        if self.camera is not None:
+            self.camera.stop()
+        GUIMainFrame.on_close(self, e)
+
+
+if __name__ == '__main__':
+    enable_from_argv('moonrunner_app')  # --profile: see profiling.py
+    app = wx.App()
+    frame = MoonRunnerAppFrame(debug=DEBUG)
+    app.MainLoop()
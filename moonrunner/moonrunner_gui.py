@@ -1,12 +1,24 @@
 # coding: utf8
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 import wx
 import wx.lib.agw.hyperlink as hl
 import minispinctrl as MSC
 import yaml
-from mrotorctl import MRotController
+import numpy as np
+from mrotorctl import MRotController, MOON_TTL_S, ROTOR_TTL_S, TARGET_MOON, TARGET_SUN
+from rotorbackends import create_rotor_backend, RotorLinkError, LINK_UP
+from pathplanner import create_path_planner
+from eventbus import TOPIC_ROTOR_STATE, TOPIC_ROTOR_LINK
+from sessionlog import SessionRecorder, read_session_log, FIELDS as SESSION_LOG_FIELDS
+from emelink import EMELink, LOG_FIELDS as EME_LOG_FIELDS
+from eme_planner import parse_station
+from scheduler import SessionScheduler, EVENT_WAIT, EVENT_PRE_POSITION, EVENT_TRACK, EVENT_PARK
+from skychart import SkyChartPanel
+from webdashboard import WebDashboard
+from profiling import stage, enable_from_argv
 import os
+import time
 
 # moonrunner_gui.py contains the Python class "GUIMainFrame" to create a simple GUI to control
 # a rotor control protocol compatible (antenna-)rotor to track the Moon's position (Azimuth az, Elevation el).
@@ -24,6 +36,11 @@ import os
 #   Track: start tracking the Moon (toggle-button on/off)
 #   Park: set rotor to the defined park position (az, el)
 #   Read: read current rotor position (az, el)
+#   File/Automatic Sessions: pre-position, track and park automatically at every Moon pass (see scheduler.py)
+#   Web dashboard: live Moon/rotor position in the browser, if web_dashboard_port is set (see webdashboard.py)
+#   Sky chart: Moon track, current Moon position (yellow) and the last read rotor position (red cross)
+#   Session log: while tracking, every step (Moon, commanded and read-back position, command latency) is recorded
+#                into a binary log in the directory "logs" (see sessionlog.py), File/Replay Session shows a log again
 #
 # This code uses the class MRotController from mrotorctl.py in the same package.
 # The code was tested with the "AntRunner" antenna rotor and the hamlib w64 4.5 Software
@@ -52,6 +69,11 @@ import os
 DEBUG = True
 VERSION = 1.2
 URL_LINK = "https://github.com/bat1417/MoonRunner/"
+TRACK_HOURS = 24  # length of the Moon track in the sky chart [h]
+TRACK_PAST_HOURS = 2  # the track starts 2 hours before now
+TRACK_STEP_MIN = 5  # step of the Moon track [min]
+REPLAY_SPEED = 10  # replay speed factor of session logs
+REPLAY_INTERVAL_MS = 100  # display update interval of the replay [ms]
 
 # This default config is used, to write the config.yaml, if not present after start
 # You should modify the config.yaml to adjust to your values!
@@ -65,14 +87,43 @@ CONFIG_DATA_DEFAULT = [
         'rotctld_port': 4533,  # default port for rotor control software
         'rotctld_park_az': 0,  # default azimuth of park position [Degree]
         'rotctld_park_el': 0,  # default elevation of park position [°]
-        'rotctld_park_max_el': 90  # max elevation of park position [°]
+        'rotctld_park_max_el': 90,  # max elevation of park position [°]
+        'session_log': True,  # record the tracking sessions
+        'session_log_dir': 'logs',  # directory of the session logs
+        'rotor_backend': 'rotctld',  # rotctld (TCP), gs232 or easycomm (serial port, needs pyserial)
+        'rotor_serial_port': '/dev/ttyUSB0',  # serial port of the rotor controller (e.g. COM3 on Windows)
+        'rotor_serial_baud': 9600,  # baud rate of the serial port
+        'rotor_timeout_s': 2.0,  # timeout of each rotctld socket operation (connect, send, recv) [s]
+        'rotor_breaker_failures': 3,  # consecutive connection errors until the rotor link is down (fail fast)
+        'rotor_backoff_max_s': 30.0,  # longest wait before a down rotor link is probed again [s]
+        'cache_moon_ttl_s': 60.0,  # time to live of cached Moon positions [s]
+        'cache_rotor_ttl_s': 1.0,  # time to live of cached rotor read-backs [s]
+        'rotor_az_min': 0,  # azimuth range of the rotor, e.g. 0..450 or -180..180 for rotors with cable wrap [°]
+        'rotor_az_max': 360,
+        'rotor_az_rate_dps': 3.0,  # slew rates of the rotor [°/s]
+        'rotor_el_rate_dps': 3.0,
+        'web_dashboard_port': 0,  # port of the web dashboard (webdashboard.py), 0: off
+        'eme_frequency_mhz': 144.1,  # EME Doppler, delay and path loss on this frequency [MHz], 0: off
+        'eme_dx_station': '',  # DX station for the Doppler shift, NAME,LAT,LON[,ELEVATION_M] e.g. W1XYZ,42.36,-71.06,20
+        # camera of moonrunner_app.py: picamera2, video (needs opencv-python) or synthetic
+        'camera_source': 'picamera2',
+        'camera_width': 640,  # camera resolution [px]
+        'camera_height': 480,
+        'camera_fps': 12,  # camera frame rate [frames/s]
+        'camera_video_file': '',  # video file of the video camera source
+        'camera_still_width': 0,  # resolution of saved stills [px], 0: full sensor
+        'camera_still_height': 0,
+        'target': 'moon'  # tracked target: moon, sun, jupiter ..., casa, cyga, taua, vira, sgra or "RA,Dec" [h],[°]
     }
 ]
 
 
 class GUIMainFrame(wx.Frame):
-    def __init__(self, debug=False):
+    # bus: EventBus shared with the other views, notebook: put the panel into the first tab of a notebook
+    # (both used by the single-application mode, moonrunner_app.py)
+    def __init__(self, debug=False, bus=None, notebook=False):
         self.debug = debug
+        self.bus = bus
         # initialize/load config
         self.config_data = self.load_config()
         self.rotctld_park_az = int(self.config_data[0]['rotctld_park_az'])
@@ -91,17 +142,45 @@ class GUIMainFrame(wx.Frame):
         else:
             print(f"File not found: {image_path}")
         
-        self.SetMinSize((600, 310))
+        self.SetMinSize((880, 330))
         # Panel with Fields & Buttons
-        self.panel = wx.Panel(self)
+        self.notebook = wx.Notebook(self) if notebook else None
+        self.panel = wx.Panel(self.notebook if notebook else self)
+        if notebook:
+            self.notebook.AddPage(self.panel, "Tracking")
 
         # create a MRotController instance and initialize
         self.rotctl = MRotController(self.config_data[0]['rotctld_ip'], self.config_data[0]['rotctld_port'],
-                                     debug=self.debug)
+                                     debug=self.debug, rotor=create_rotor_backend(self.config_data[0]),
+                                     bus=self.bus, planner=create_path_planner(self.config_data[0]),
+                                     target=self.config_data[0].get('target', TARGET_MOON))
+        self.target_label = "Moon" if self.rotctl.target_name == TARGET_MOON else self.rotctl.target_name
+        self.rotctl.cache.set_ttl('moon', self.config_data[0].get('cache_moon_ttl_s', MOON_TTL_S))
+        self.rotctl.cache.set_ttl('rotor', self.config_data[0].get('cache_rotor_ttl_s', ROTOR_TTL_S))
         self.rotctl.set_observer_location(self.config_data[0]['latitude'], self.config_data[0]['longitude'],
                                           elevation_m=self.config_data[0]['elevation_m'])
 
         self.moon_pos = self.rotctl.calculate_azimuth_elevation()
+        # EME link parameters (emelink.py) of the current time, shown and written into the session log
+        self.eme_link = None
+        self.eme_values = None
+        self.eme_log_values = None  # EMELink.log_values of the last update_eme_link
+        if self.config_data[0].get('eme_frequency_mhz', 0):
+            dx_station = self.config_data[0].get('eme_dx_station', '')
+            self.eme_link = EMELink(self.rotctl, self.config_data[0]['eme_frequency_mhz'],
+                                    parse_station(dx_station) if dx_station else None)
+        self.track_start = None
+        self.sun_moon_track = None  # (timestamps, Sun-Moon separation [deg]) of the sky chart track
+        self.session_log = None
+        self.replay_log = None
+        self.scheduler = None
+
+        # optional web dashboard for remote stations
+        self.dashboard = None
+        if self.config_data[0].get('web_dashboard_port', 0):
+            self.dashboard = WebDashboard(self.rotctl, self.config_data[0]['web_dashboard_port'],
+                                          title=self.config_data[0]['QTH'], debug=self.debug)
+            self.dashboard.start()
 
         # start a timer for Moon tracking
         self.timer = wx.Timer(self)  # Create a timer object
@@ -110,6 +189,12 @@ class GUIMainFrame(wx.Frame):
 
         # initialize UI
         self.init_ui()
+        if self.bus is not None:
+            # rotor read-backs of all views (e.g. the joystick tab) update the labels and the sky chart; the scheduler
+            # publishes from its thread, so the handler runs on the wx main thread
+            self.bus.subscribe(TOPIC_ROTOR_STATE, lambda message: wx.CallAfter(self.on_rotor_state, message))
+            # link changes of commands in other views or threads (e.g. the web dashboard)
+            self.bus.subscribe(TOPIC_ROTOR_LINK, lambda message: wx.CallAfter(self.on_rotor_link, message))
 
     def initial_save_config(self):
         try:
@@ -140,6 +225,7 @@ class GUIMainFrame(wx.Frame):
         label_text += ", elevation_m: " + str(self.config_data[0]['elevation_m'])
         label_text += "\nRotor Ctrl: rotctld_ip: '" + self.config_data[0]['rotctld_ip'] + "'"
         label_text += ", rotctld_port: " + str(self.config_data[0]['rotctld_port'])
+        label_text += ", rotor_backend: " + self.rotctl.rotor.name
         label_text += "\nRotor pos: rotctld_park_az: " + str(self.rotctld_park_az)
         label_text += ", rotctld_park_el: " + str(self.rotctld_park_el)
         label_text += ", rotctld_park_max_el: " + str(self.rotctld_park_max_el)
@@ -156,6 +242,16 @@ class GUIMainFrame(wx.Frame):
         loadItem = fileMenu.Append(wx.ID_ANY, 'Load Config', 'Load Config from config.yaml')
         self.SetMenuBar(menubar)
         self.Bind(wx.EVT_MENU, self.on_file_load, loadItem)
+        replayItem = fileMenu.Append(wx.ID_ANY, 'Replay Session', 'Replay a recorded tracking session log')
+        self.Bind(wx.EVT_MENU, self.on_file_replay, replayItem)
+        autoItem = fileMenu.AppendCheckItem(wx.ID_ANY, 'Automatic Sessions',
+                                            'Pre-position, track and park automatically at every Moon pass')
+        self.Bind(wx.EVT_MENU, self.on_auto_sessions, autoItem)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+
+        # timer for the replay of session logs
+        self.replay_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_replay_timer, self.replay_timer)
 
         # GUI Layout with GridSizer
         self.wrapper = wx.BoxSizer(wx.VERTICAL)
@@ -166,7 +262,7 @@ class GUIMainFrame(wx.Frame):
         # static labels for Moon and Rotor
         bold_font = wx.Font(wx.FontInfo(10).Bold())
 
-        self.lbl_moon = wx.StaticText(self.panel, label="Moon")
+        self.lbl_moon = wx.StaticText(self.panel, label=self.target_label)
         self.lbl_moon.SetFont(bold_font)
         self.lbl_rotor = wx.StaticText(self.panel, label="Rotor")
         self.lbl_rotor.SetFont(bold_font)
@@ -200,8 +296,12 @@ class GUIMainFrame(wx.Frame):
         self.txt_ctrl_read_el = wx.StaticText(self.panel, label=str(self.rotctld_read_az))
 
         # create fields to display the Moon's position
-        self.lbl_moon_az = wx.StaticText(self.panel, label="Moon az = " + str(self.moon_pos[0]))
-        self.lbl_moon_el = wx.StaticText(self.panel, label="Moon el = " + str(self.moon_pos[1]))
+        self.lbl_moon_az = wx.StaticText(self.panel, label=self.target_label + " az = " + str(self.moon_pos[0]))
+        self.lbl_moon_el = wx.StaticText(self.panel, label=self.target_label + " el = " + str(self.moon_pos[1]))
+        # Sun-Moon separation (Sun noise on EME) and EME link parameters
+        self.lbl_sun_moon = wx.StaticText(self.panel, label="")
+        self.lbl_eme = wx.StaticText(self.panel, label="")
+        self.lbl_link = wx.StaticText(self.panel, label="Rotor link: " + LINK_UP)
         # notify negative elevation (not visible)
         if (self.moon_pos[1]) <= 0:
             self.lbl_moon_el.SetForegroundColour(wx.Colour(255, 0, 0))
@@ -220,12 +320,22 @@ class GUIMainFrame(wx.Frame):
         self.sizer2.Add(self.lbl_help, flag=wx.ALL | wx.EXPAND, border=10)
         self.sizer2.Add(self.lbl_config, flag=wx.ALL | wx.EXPAND, border=10)
         self.sizer3.Add(self.url_link, flag=wx.ALL | wx.EXPAND, border=10)
+        self.sizer3.Add(self.lbl_sun_moon, flag=wx.ALL | wx.EXPAND, border=10)
+        self.sizer3.Add(self.lbl_eme, flag=wx.ALL | wx.EXPAND, border=10)
+        self.sizer3.Add(self.lbl_link, flag=wx.ALL | wx.EXPAND, border=10)
 
         self.wrapper.Add(self.sizer1, 1, wx.EXPAND, border=10)
         self.wrapper.Add(self.sizer2, 1, wx.EXPAND, border=10)
         self.wrapper.Add(self.sizer3, 1, wx.EXPAND, border=10)
 
-        self.panel.SetSizer(self.wrapper)
+        # sky chart with the Moon track and the live Moon/rotor markers
+        self.sky_chart = SkyChartPanel(self.panel)
+        self.update_sky_chart()
+        self.main_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.main_sizer.Add(self.wrapper, 1, wx.EXPAND)
+        self.main_sizer.Add(self.sky_chart, 0, wx.ALL, border=10)
+
+        self.panel.SetSizer(self.main_sizer)
 
         self.Centre()
         self.load_config()
@@ -269,28 +379,149 @@ class GUIMainFrame(wx.Frame):
         self.lbl_config.SetLabel(self.get_label_text(self))
         self.Refresh()
 
+    # rotor command of a wx handler: a rotor link error is shown in the link label instead of raising,
+    # returns the result of the command or None
+    def rotor_command(self, command, *args, **kwargs):
+        try:
+            return command(*args, **kwargs)
+        except RotorLinkError:
+            return None
+        finally:
+            self.on_rotor_link(self.rotctl.rotor_link_status())
+
+    def on_rotor_link(self, message):
+        text = "Rotor link: " + message['state']
+        if message['state'] != LINK_UP:
+            text += " (%s), retry in %.0f s" % (message['error'], message['retry_in_s'])
+        self.lbl_link.SetLabel(text)
+        self.lbl_link.SetForegroundColour(wx.Colour(0, 0, 0) if message['state'] == LINK_UP else wx.Colour(255, 0, 0))
+
     def on_btn_park(self, e):
-        self.rotctl.park_rotor(az=self.rotctld_park_az, el=self.rotctld_park_el)
+        self.rotor_command(self.rotctl.park_rotor, az=self.rotctld_park_az, el=self.rotctld_park_el)
 
     def on_btn_track(self, e):
         current_utc_timestamp = datetime.utcnow()
         if self.btn_track.GetValue():
             self.btn_track.SetBackgroundColour(wx.Colour(255, 0, 0))
-            self.moon_pos = self.rotctl.set_rotor_to_current_moon_position(current_utc_timestamp)
+            if self.rotctl.planned_path is None:
+                # plan the cable wrap for the whole pass, the rotor parks at the park position afterwards
+                self.rotctl.plan_session(park_az=self.rotctld_park_az, park_el=self.rotctld_park_el)
+            moon_pos = self.rotor_command(self.rotctl.set_rotor_to_current_moon_position, current_utc_timestamp)
+            if moon_pos is None:
+                # rotor not reachable: keep the Moon position up to date, the next tick tries again
+                self.moon_pos = self.rotctl.calculate_azimuth_elevation_ts_utc(current_utc_timestamp)
+                return
+            self.moon_pos = moon_pos
+            self.record_tracking_step()
         else:
             self.btn_track.SetBackgroundColour(wx.Colour(225, 225, 225))
+            self.rotctl.planned_path = None
             self.moon_pos = self.rotctl.calculate_azimuth_elevation_ts_utc(current_utc_timestamp)
-
+            self.close_session_log()
+
+    def record_tracking_step(self):
+        # one session log per tracking run, the rotor position is read back for the log
+        if not self.config_data[0].get('session_log', True):
+            return
+        if self.session_log is None:
+            fields = SESSION_LOG_FIELDS + (EME_LOG_FIELDS if self.eme_link is not None else ())
+            self.session_log = SessionRecorder(self.config_data[0].get('session_log_dir', 'logs'), fields=fields)
+        latency_s = self.rotctl.last_command_latency_s
+        # no read-back (NaN in the log) while the rotor link is down
+        read_az, read_el = self.on_btn_read(self) or (None, None)
+        extra = ()
+        if self.eme_link is not None:
+            extra = self.eme_log_values or (None,) * len(EME_LOG_FIELDS)
+        # the command as sent to the rotor (with the cable wrap of the planner, e.g. -90 or 400 deg)
+        self.session_log.record_tracking(self.moon_pos[0], self.moon_pos[1], self.rotctl.rotor_az,
+                                         self.rotctl.rotor_el, read_az, read_el, latency_s, extra=extra)
+
+    def close_session_log(self):
+        if self.session_log is not None:
+            self.session_log.close()
+            self.session_log = None
+
+    # returns the rotor position (az, el) or None, if the rotor cannot be reached
     def on_btn_read(self, e):
-        pos = self.rotctl.get_rotor_position()
-        self.rotctld_read_az = pos[0]
-        self.rotctld_read_el = pos[1]
+        pos = self.rotor_command(self.rotctl.get_rotor_position)
+        if pos is not None and self.bus is None:
+            self.on_rotor_state({'read_az': pos[0], 'read_el': pos[1]})
+        return pos
+
+    def on_rotor_state(self, message):
+        if 'read_az' not in message:
+            return
+        self.rotctld_read_az = message['read_az']
+        self.rotctld_read_el = message['read_el']
         self.txt_ctrl_read_az.SetLabel(str(self.rotctld_read_az))
         self.txt_ctrl_read_el.SetLabel(str(self.rotctld_read_el))
+        self.sky_chart.set_rotor_position(self.rotctld_read_az, self.rotctld_read_el)
+
+    def update_sky_chart(self):
+        # calculate the tracks of the target and the Sun as one batch, again after half of the track time has passed
+        now = datetime.now(timezone.utc)
+        if self.track_start is None or now > self.track_start + timedelta(hours=TRACK_HOURS / 2):
+            self.track_start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=TRACK_PAST_HOURS)
+            times = [self.track_start + timedelta(minutes=m) for m in range(0, TRACK_HOURS * 60 + 1, TRACK_STEP_MIN)]
+            name = self.rotctl.target_name
+            tracks = self.rotctl.calculate_targets(tuple(dict.fromkeys((name, TARGET_MOON, TARGET_SUN))), times)
+            self.sky_chart.set_track(times, tracks.az[name], tracks.el[name],
+                                     sun_track=(tracks.az[TARGET_SUN], tracks.el[TARGET_SUN]))
+            # Sun-Moon separation along the track, interpolated per tick (changes by ~0.5°/h)
+            self.sun_moon_track = (np.array([t.timestamp() for t in times]),
+                                   tracks.separation(TARGET_SUN, TARGET_MOON))
+        # only the live marker and the separation are updated per tick
+        self.sky_chart.set_moon_position(self.moon_pos[0], self.moon_pos[1])
+        self.lbl_sun_moon.SetLabel("Sun-Moon = %.1f°" % np.interp(now.timestamp(), *self.sun_moon_track))
 
     def on_file_quit(self, e):
         self.Close()
 
+    def on_close(self, e):
+        self.stop_scheduler()
+        if self.dashboard is not None:
+            self.dashboard.stop()
+        self.close_session_log()
+        if self.debug:
+            print("Position cache: " + str(self.rotctl.cache_stats()))
+        e.Skip()
+
+    def on_file_replay(self, e):
+        with wx.FileDialog(self, "Replay Session", wildcard="Session logs (*.mrlog)|*.mrlog",
+                           defaultDir=self.config_data[0].get('session_log_dir', 'logs'),
+                           style=wx.FD_OPEN | wx.FD_FILE_MUST_EXIST | wx.FD_MULTIPLE) as file_dialog:
+            if file_dialog.ShowModal() == wx.ID_CANCEL:
+                return
+            paths = sorted(file_dialog.GetPaths())
+        try:
+            self.replay_log = read_session_log(paths)
+        except (IOError, ValueError) as ex:
+            wx.MessageBox(str(ex), "Replay Session", wx.OK | wx.ICON_ERROR)
+            return
+        if not len(self.replay_log['time']):
+            self.replay_log = None
+            return
+        self.replay_start = time.monotonic()
+        self.SetTitle('MoonRunner v' + str(VERSION) + ' by OE9BKJ - Replay')
+        self.replay_timer.Start(REPLAY_INTERVAL_MS)
+
+    def on_replay_timer(self, e):
+        # show the record at the replay time (recorded timing accelerated by REPLAY_SPEED)
+        t = self.replay_log['time']
+        i = int(np.searchsorted(t, t[0] + (time.monotonic() - self.replay_start) * REPLAY_SPEED, side='right')) - 1
+        r = {name: float(values[i]) for name, values in self.replay_log.items()}
+        self.lbl_moon_az.SetLabel(self.target_label + " az = " + str(round(r['moon_az'], 2)))
+        self.lbl_moon_el.SetLabel(self.target_label + " el = " + str(round(r['moon_el'], 2)))
+        self.sky_chart.set_moon_position(r['moon_az'], r['moon_el'])
+        if np.isfinite(r['read_az']):
+            self.txt_ctrl_read_az.SetLabel(str(r['read_az']))
+            self.txt_ctrl_read_el.SetLabel(str(r['read_el']))
+            self.sky_chart.set_rotor_position(r['read_az'], r['read_el'])
+        if i >= len(t) - 1:
+            self.replay_timer.Stop()
+            self.replay_log = None
+            self.SetTitle('MoonRunner v' + str(VERSION) + ' by OE9BKJ')
+
     def on_file_load(self, e):
         self.config_data = self.load_config()
         self.rotctld_park_az = int(self.config_data[0]['rotctld_park_az'])
@@ -303,18 +534,83 @@ class GUIMainFrame(wx.Frame):
         self.Refresh()
 
     def on_timer(self, e):
-        self.on_btn_track(self)  # start tracking as long the track botton is toggled on
+        if self.eme_link is not None:
+            with stage('eme link'):
+                self.update_eme_link()
+        with stage('tracking step'):
+            self.on_btn_track(self)  # start tracking as long the track botton is toggled on
+        if self.replay_log is not None:
+            return  # the labels show the replayed session
+        with stage('display update'):
+            self.show_moon_position()
+
+    def on_auto_sessions(self, e):
+        if e.IsChecked():
+            # the scheduler sleeps until the next pass, the 5 s timer is not needed
+            self.timer.Stop()
+            self.scheduler = SessionScheduler(self.rotctl, park_az=self.rotctld_park_az, park_el=self.rotctld_park_el,
+                                              on_event=lambda event, message: wx.CallAfter(
+                                                  self.on_scheduler_event, event, message),
+                                              debug=self.debug)
+            self.scheduler.start()
+        else:
+            self.stop_scheduler()
+            self.close_session_log()
+            self.timer.Start(5000)
+
+    def stop_scheduler(self):
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler = None
+
+    def on_scheduler_event(self, event, message):
+        if self.scheduler is None:
+            return  # queued by wx.CallAfter before the scheduler was stopped
+        if event == EVENT_WAIT:
+            self.SetTitle('MoonRunner v' + str(VERSION) + ' by OE9BKJ - next Moonrise '
+                          + message['rise'].strftime("%Y-%m-%d %H:%M:%S") + ' UTC')
+        elif event == EVENT_PRE_POSITION:
+            self.moon_pos = (message['az'], message['el'])
+            self.show_moon_position()
+        elif event == EVENT_TRACK:
+            # the same step as the tracking timer: EME link, session log and display
+            if self.eme_link is not None:
+                self.update_eme_link()
+            self.moon_pos = (message['az'], message['el'])
+            self.record_tracking_step()
+            if self.replay_log is None:
+                self.show_moon_position()
+        elif event == EVENT_PARK:
+            self.close_session_log()
+            self.SetTitle('MoonRunner v' + str(VERSION) + ' by OE9BKJ')
+
+    # EME link parameters of the current time (one vectorized calculation for the label and the session log)
+    def update_eme_link(self):
+        values = self.eme_link.calculate()
+        self.eme_values = {name: float(value[0]) for name, value in values.items() if name != 'times'}
+        self.eme_log_values = self.eme_link.log_values(values)
+        text = "EME %.1f MHz: echo %+.0f Hz, delay %.2f s, loss %.1f dB" % (
+            self.eme_link.frequency_hz / 1e6, self.eme_values['doppler_echo_hz'], self.eme_values['delay_s'],
+            self.eme_values['path_loss_db'])
+        if self.eme_link.dx_station is not None:
+            text += ", %s %+.0f Hz (el %.1f°)" % (self.eme_link.dx_station.name, self.eme_values['doppler_dx_hz'],
+                                                 self.eme_values['dx_el'])
+        self.lbl_eme.SetLabel(text)
+
+    def show_moon_position(self):
         # refresh moon position
-        self.lbl_moon_az.SetLabel("Moon az = " + str(self.moon_pos[0]))
-        self.lbl_moon_el.SetLabel("Moon el = " + str(self.moon_pos[1]))
+        self.lbl_moon_az.SetLabel(self.target_label + " az = " + str(self.moon_pos[0]))
+        self.lbl_moon_el.SetLabel(self.target_label + " el = " + str(self.moon_pos[1]))
         # notify negative elevation (not visible)
         if (self.moon_pos[1]) <= 0:
             self.lbl_moon_el.SetForegroundColour(wx.Colour(255, 0, 0))
         else:
             self.lbl_moon_el.SetForegroundColour(wx.Colour(0, 0, 0))
+        self.update_sky_chart()
 
 
 if __name__ == '__main__':
+    enable_from_argv('moonrunner_gui')  # --profile: see profiling.py
     # load config
     # start GUI
     app = wx.App()
@@ -1,9 +1,19 @@
-import socket
-from datetime import datetime, timezone
+import functools
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+import numpy as np
 from skyfield import api
-from skyfield.api import load
+from skyfield.api import load, Star
+from skyfield.errors import EphemerisRangeError
+from skyfield.earthlib import refract
+from skyfield.framelib import itrs
 from clrprint import *
 import time
+import meeus_moon
+from rotorbackends import RotctldBackend, LINK_UP
+from eventbus import TOPIC_MOON_POSITION, TOPIC_ROTOR_STATE, TOPIC_ROTOR_LINK
+from profiling import stage, enable_from_argv
 
 # mrotorctl.py contains the Python class "MRotController" to set a rotor control protocol compatible (antenna-)rotor to
 # the Moon's position (Azimuth az, Elevation el).
@@ -32,16 +42,211 @@ import time
 DEBUG = True  # set to 'False', if you want no command line output
 VERSION = 1.0
 
+# backends to calculate the Moon's position
+BACKEND_SKYFIELD = 'skyfield'  # Skyfield with the JPL ephemeris de421.bsp (accurate, slow start-up)
+BACKEND_MEEUS = 'meeus'  # analytical model from meeus_moon.py (no ephemeris file, error < 0.01 deg)
+
+# targets: ephemeris bodies (the names of the planets are those of the JPL ephemeris, the compact ephemeris contains the
+# Sun, Jupiter and Saturn) and radio sources at a fixed position (J2000 RA [h], Dec [deg], e.g. for noise calibration)
+TARGET_MOON = 'moon'
+TARGET_SUN = 'sun'
+EPHEMERIS_TARGETS = {'moon': 'moon', 'sun': 'sun', 'mercury': 'mercury', 'venus': 'venus', 'mars': 'mars barycenter',
+                     'jupiter': 'jupiter barycenter', 'saturn': 'saturn barycenter',
+                     'uranus': 'uranus barycenter', 'neptune': 'neptune barycenter'}
+RADIO_SOURCES = {'casa': (23.390, 58.815),  # Cassiopeia A
+                 'cyga': (19.991, 40.734),  # Cygnus A
+                 'taua': (5.5755, 22.0145),  # Taurus A (Crab Nebula)
+                 'vira': (12.5137, 12.3911),  # Virgo A (M87)
+                 'sgra': (17.7611, -29.0078)}  # Sagittarius A*
+
+# ephemeris files: the compact file (Earth and Moon only, written by ephem_excerpt.py) is preferred, if present
+EPHEMERIS_FULL = 'de421.bsp'
+EPHEMERIS_FULL_URL = 'https://ssd.jpl.nasa.gov/ftp/eph/planets/bsp/de421.bsp'
+EPHEMERIS_COMPACT = 'de421_moon.bsp'
+
+# time to live of the shared position cache [s]
+MOON_TTL_S = 60.0  # Moon positions are quantized to the second, the TTL only limits the cache size
+ROTOR_TTL_S = 1.0  # rotor read-backs
+CACHE_MAX_ENTRIES = 1000  # expired entries are removed when the cache gets larger
+
+# WGS84 ellipsoid for the bulk calculation of the observer positions
+WGS84_RADIUS_KM = 6378.137
+WGS84_FLATTENING = 1 / 298.257223563
+
+
+# load the ephemeris: the given file, else the compact file if present and covering the time range start..end
+# (datetimes UTC, default: now), else the full file
+def load_ephemeris(path=None, debug=False, start=None, end=None):
+    if path is None:
+        path = EPHEMERIS_FULL
+        if os.path.exists(EPHEMERIS_COMPACT):
+            with stage('ephemeris load'):
+                eph = load(EPHEMERIS_COMPACT)
+            ts = load.timescale()
+            jd_start = ts.now().tt if start is None else ts.from_datetime(start).tt
+            jd_end = jd_start if end is None else ts.from_datetime(end).tt
+            if all(segment.spk_segment.start_jd <= jd_start and jd_end <= segment.spk_segment.end_jd
+                   for segment in eph.segments):
+                clrprint('INFO:', load_ephemeris.__name__ + " " + EPHEMERIS_COMPACT, clr=['r', 'y'], debug=debug)
+                return eph
+            clrprint('WARNING:', load_ephemeris.__name__ + " " + EPHEMERIS_COMPACT + " does not cover the time range,"
+                     + " using " + EPHEMERIS_FULL, clr=['r', 'y'], debug=debug)
+    clrprint('INFO:', load_ephemeris.__name__ + " " + path, clr=['r', 'y'], debug=debug)
+    with stage('ephemeris load'):
+        return load(path)
+
+
+# decorator of the Skyfield calculations of MRotController: a time outside the compact ephemeris switches the
+# controller to the full ephemeris and the calculation is repeated
+def full_ephemeris_fallback(method):
+    @functools.wraps(method)
+    def call(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        except EphemerisRangeError:
+            if not self.use_full_ephemeris():
+                raise
+            return method(self, *args, **kwargs)
+    return call
+
+
+# cache of Moon positions and rotor read-backs with a time to live (TTL), shared by all MRotController instances of a
+# process (e.g. GUI, joystick and tools), so repeated calls within the TTL need neither a new calculation nor a socket
+# round trip. Thread safe, counts hits and misses per kind ('moon', 'rotor').
+class PositionCache:
+    def __init__(self, moon_ttl_s=MOON_TTL_S, rotor_ttl_s=ROTOR_TTL_S, max_entries=CACHE_MAX_ENTRIES):
+        self.ttl_s = {'moon': moon_ttl_s, 'rotor': rotor_ttl_s}
+        self.max_entries = max_entries
+        self.entries = {}  # (kind, key) -> (expiry time, value)
+        self.hits = {'moon': 0, 'rotor': 0}
+        self.misses = {'moon': 0, 'rotor': 0}
+        self.lock = threading.Lock()
+
+    # returns the cached value of (kind, key), or calls compute() and caches its result
+    def get(self, kind, key, compute):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get((kind, key))
+            if entry is not None and entry[0] > now:
+                self.hits[kind] += 1
+                return entry[1]
+            self.misses[kind] += 1
+        value = compute()
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                self.entries = {k: e for k, e in self.entries.items() if e[0] > now}
+            self.entries[(kind, key)] = (time.monotonic() + self.ttl_s[kind], value)
+        return value
+
+    def set_ttl(self, kind, ttl_s):
+        with self.lock:
+            self.ttl_s[kind] = ttl_s
+
+    def invalidate(self, kind, key):
+        with self.lock:
+            self.entries.pop((kind, key), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    # hit/miss statistics per kind, e.g. {'moon': {'hits': 10, 'misses': 2, 'hit_rate': 0.83}, ...}
+    def stats(self):
+        with self.lock:
+            result = {}
+            for kind in self.hits:
+                total = self.hits[kind] + self.misses[kind]
+                result[kind] = {'hits': self.hits[kind], 'misses': self.misses[kind],
+                                'hit_rate': self.hits[kind] / total if total else 0.0}
+            return result
+
+
+# the cache shared by all MRotController instances, unless one is given
+shared_position_cache = PositionCache()
+
+
+# positions of several targets on a common time grid (MRotController.calculate_targets)
+class TargetPositions:
+    def __init__(self, times, az, el, distance_km, range_rate_km_s, ra_hours, dec_degrees, directions):
+        self.times = times  # datetimes (UTC)
+        self.az = az  # target name -> array az [deg]
+        self.el = el  # target name -> array el [deg]
+        self.distance_km = distance_km  # target name -> array of the distance from the observer [km]
+        self.range_rate_km_s = range_rate_km_s  # target name -> array of the range rate [km/s], positive: receding
+        self.ra_hours = ra_hours  # target name -> array of the astrometric (J2000) right ascension [h]
+        self.dec_degrees = dec_degrees  # target name -> array of the astrometric (J2000) declination [deg]
+        self.directions = directions  # target name -> unit vectors of the apparent directions, shape (3, times)
+
+    # angular separation [deg] of two targets seen by the observer, e.g. separation('sun', 'moon')
+    def separation(self, target1, target2):
+        cos_angle = np.sum(self.directions[target1] * self.directions[target2], axis=0)
+        return np.degrees(np.arccos(np.clip(cos_angle, -1.0, 1.0)))
+
 
 class MRotController:
     # init with the IP and Port of the Rotor-Ctrl software running (e.g. hamlib)
-    def __init__(self, rotctld_ip, rotctld_port, debug=False):
+    # backend: BACKEND_SKYFIELD or BACKEND_MEEUS, refraction: add the atmospheric refraction to the elevation
+    # ephemeris: file name of the ephemeris (default: EPHEMERIS_COMPACT if present, else EPHEMERIS_FULL)
+    # rotor: rotor backend from rotorbackends.py (e.g. GS232Backend for a serial rotor), default: rotctld at IP/Port
+    # cache: PositionCache for Moon positions and rotor read-backs, default: shared_position_cache, None: no cache
+    # bus: EventBus (eventbus.py), the Moon positions, rotor states and rotor link changes are published to it
+    # planner: AzimuthPathPlanner (pathplanner.py) for rotors with cable wrap, default: azimuth 0..360 is sent as is
+    # target: tracked target, a key of EPHEMERIS_TARGETS or RADIO_SOURCES or "RA,Dec" (J2000, [h],[deg]), the MEEUS
+    # backend only calculates the Moon
+    def __init__(self, rotctld_ip, rotctld_port, debug=False, backend=BACKEND_SKYFIELD, refraction=False,
+                 ephemeris=None, rotor=None, cache=shared_position_cache, bus=None, planner=None, target=TARGET_MOON):
         self.rotctld_ip = rotctld_ip
         self.rotctld_port = rotctld_port
-        self.eph = load('de421.bsp')
-        self.ts = load.timescale()
-        self.earth, self.moon = self.eph['earth'], self.eph['moon']
+        self.rotor = rotor if rotor is not None else RotctldBackend(rotctld_ip, rotctld_port)
+        self.backend = backend
+        self.refraction = refraction
+        if self.backend == BACKEND_SKYFIELD:
+            self.eph = load_ephemeris(ephemeris, debug=debug)
+            self.ts = load.timescale()
+            self.earth, self.moon = self.eph['earth'], self.eph['moon']
+            self.targets = {TARGET_MOON: self.moon}
+        elif self.backend != BACKEND_MEEUS:
+            raise ValueError("unknown backend: " + str(backend))
+        elif target != TARGET_MOON:
+            raise ValueError("the meeus backend only calculates the Moon, target: " + str(target))
+        self.target_name = target
+        self.target = self.resolve_target(target) if self.backend == BACKEND_SKYFIELD else None
         self.debug = debug
+        self.cache = cache
+        self.bus = bus
+        self.planner = planner
+        self.planned_path = None
+        self.rotor_az = None  # last commanded rotor azimuth (with wrap)
+        self.rotor_el = None  # last commanded rotor elevation
+        self.last_command_latency_s = None
+        self.link_state = LINK_UP  # last reported state of the rotor link
+
+    # switch from the compact to the full ephemeris (e.g. for a date outside the compact file), returns False if the
+    # full ephemeris is already used
+    def use_full_ephemeris(self):
+        if self.backend != BACKEND_SKYFIELD or os.path.basename(self.eph.path) == EPHEMERIS_FULL:
+            return False
+        clrprint('WARNING:', self.use_full_ephemeris.__name__ + " time outside " + self.eph.filename + ", using "
+                 + EPHEMERIS_FULL, clr=['r', 'y'], debug=self.debug)
+        self.eph = load_ephemeris(EPHEMERIS_FULL, debug=self.debug)
+        self.earth, self.moon = self.eph['earth'], self.eph['moon']
+        self.targets = {TARGET_MOON: self.moon}
+        self.target = self.resolve_target(self.target_name)
+        return True
+
+    # Skyfield object of a target name (see __init__), ephemeris bodies and radio sources are resolved once
+    def resolve_target(self, name):
+        if name not in self.targets:
+            key = name.lower().replace(' ', '')
+            if key in RADIO_SOURCES:
+                ra_hours, dec_degrees = RADIO_SOURCES[key]
+                self.targets[name] = Star(ra_hours=ra_hours, dec_degrees=dec_degrees)
+            elif ',' in name:
+                ra_hours, dec_degrees = (float(value) for value in name.split(','))
+                self.targets[name] = Star(ra_hours=ra_hours, dec_degrees=dec_degrees)
+            else:
+                self.targets[name] = self.eph[EPHEMERIS_TARGETS.get(key, name)]
+        return self.targets[name]
 
     # set the observer's location
     def set_observer_location(self, latitude, longitude, elevation_m):
@@ -58,45 +263,253 @@ class MRotController:
                  self.calculate_azimuth_elevation.__name__ + " t=" + str(year) + " " + str(month) + " " + str(day)
                  + " " + str(hour) + " " + str(minute) + " " + str(second), clr=['r', 'y'], debug=self.debug)
 
-        t = self.ts.utc(year, month, day, hour, minute, second)
-        astrometric = (self.earth + self.location).at(t).observe(self.moon)
-        alt, az, d = astrometric.apparent().altaz()
-        self.azimuth_degrees = round(az.degrees, 2)
-        self.elevation_degrees = round(alt.degrees, 2)
+        self.azimuth_degrees, self.elevation_degrees = self.lookup_azimuth_elevation(year, month, day, hour, minute,
+                                                                                     second)
         clrprint('INFO:', self.calculate_azimuth_elevation.__name__ + " az=" + str(self.azimuth_degrees)
                  + ", el=" + str(self.elevation_degrees), clr=['r', 'y'], debug=self.debug)
+        if self.bus is not None:
+            self.bus.publish(TOPIC_MOON_POSITION, {
+                'az': self.azimuth_degrees, 'el': self.elevation_degrees,
+                'time': datetime(year, month, day, hour, minute, int(second), tzinfo=timezone.utc)})
         return (self.azimuth_degrees, self.elevation_degrees)
 
+    # position of the target rounded to 2 decimals, through the position cache, but without changing the state of the
+    # controller (azimuth_degrees, elevation_degrees) or publishing it: safe to call from other threads
+    def lookup_azimuth_elevation(self, year, month, day, hour, minute, second):
+        if self.cache is None:
+            az_degrees, el_degrees = self.compute_azimuth_elevation(year, month, day, hour, minute, second)
+        else:
+            # key: calculation settings, observer and time quantized to the second
+            key = (self.backend, self.refraction, self.target_name, self.location.latitude.degrees,
+                   self.location.longitude.degrees, self.location.elevation.m, year, month, day, hour, minute,
+                   int(second))
+            az_degrees, el_degrees = self.cache.get('moon', key, lambda: self.compute_azimuth_elevation(
+                year, month, day, hour, minute, second))
+        return round(az_degrees, 2), round(el_degrees, 2)
+
+    # calculate the Moon's position without the cache
+    @full_ephemeris_fallback
+    def compute_azimuth_elevation(self, year, month, day, hour, minute, second):
+        if self.backend == BACKEND_MEEUS:
+            with stage('meeus'):
+                az_degrees, el_degrees, d_km = meeus_moon.moon_azimuth_elevation(
+                    datetime(year, month, day, hour, minute, second, tzinfo=timezone.utc),
+                    self.location.latitude.degrees, self.location.longitude.degrees, self.location.elevation.m,
+                    refraction=self.refraction)
+            return az_degrees, el_degrees
+        t = self.ts.utc(year, month, day, hour, minute, second)
+        with stage('observe'):
+            astrometric = (self.earth + self.location).at(t).observe(self.target)
+        with stage('apparent'):
+            apparent = astrometric.apparent()
+        with stage('altaz'):
+            alt, az, d = apparent.altaz('standard' if self.refraction else None)
+        return az.degrees, alt.degrees
+
     def calculate_azimuth_elevation_ts_utc(self, current_utc_timestamp=datetime.utcnow()):
         return self.calculate_azimuth_elevation(year=current_utc_timestamp.year, month=current_utc_timestamp.month,
                                                 day=current_utc_timestamp.day,
                                                 hour=current_utc_timestamp.hour, minute=current_utc_timestamp.minute,
                                                 second=current_utc_timestamp.second)
 
+    # calculate the track of the target (default: the Moon) for the observer's location in one vectorized calculation
+    # start_utc: datetime (UTC), default: now, hours: length of the track, step_min: step between the positions
+    # returns a list of datetimes (UTC) and arrays az, el [deg]
+    @full_ephemeris_fallback
+    def calculate_moon_track(self, start_utc=None, hours=24, step_min=5):
+        if start_utc is None:
+            start_utc = datetime.now(timezone.utc)
+        if start_utc.tzinfo is None:
+            start_utc = start_utc.replace(tzinfo=timezone.utc)
+        seconds = np.arange(0, hours * 3600 + 1, step_min * 60.0)
+        times = [start_utc + timedelta(seconds=float(s)) for s in seconds]
+        clrprint('INFO:', self.calculate_moon_track.__name__ + " start=" + str(start_utc) + " hours=" + str(hours),
+                 clr=['r', 'y'], debug=self.debug)
+        with stage('moon track'):
+            if self.backend == BACKEND_MEEUS:
+                az, el, d = meeus_moon.topocentric_azimuth_elevation_array(
+                    meeus_moon.moon_equatorial_positions(times), [self.location.latitude.degrees],
+                    [self.location.longitude.degrees], self.location.elevation.m, refraction=self.refraction)
+                az, el = az[0], el[0]
+            else:
+                t = self.ts.utc(start_utc.year, start_utc.month, start_utc.day, start_utc.hour, start_utc.minute,
+                                start_utc.second + start_utc.microsecond / 1e6 + seconds)
+                astrometric = (self.earth + self.location).at(t).observe(self.target)
+                alt, az, d = astrometric.apparent().altaz('standard' if self.refraction else None)
+                az, el = az.degrees, alt.degrees
+        return times, az, el
+
+    # calculate the Moon's position for many observers at once (e.g. the station list of an EME net)
+    # latitudes, longitudes: arrays of degrees (North/East positive), elevations_m: array or a single value [m]
+    # times: datetime (UTC) or a list of datetimes, default: now
+    # returns arrays az, el [deg] with the shape (stations,) for a single time, else (stations, times)
+    # The geocentric Moon position is calculated once per time, the observers' parallax with vectorized numpy code.
+    @full_ephemeris_fallback
+    def calculate_azimuth_elevation_bulk(self, latitudes, longitudes, elevations_m=0.0, times=None):
+        if times is None:
+            times = datetime.now(timezone.utc)
+        single_time = isinstance(times, datetime)
+        times = [times] if single_time else list(times)
+        times = [t if t.tzinfo is not None else t.replace(tzinfo=timezone.utc) for t in times]
+        lat = np.radians(np.asarray(latitudes, dtype=float))
+        lon = np.radians(np.asarray(longitudes, dtype=float))
+        elevation_km = np.broadcast_to(np.asarray(elevations_m, dtype=float), lat.shape) / 1000.0
+        clrprint('INFO:', self.calculate_azimuth_elevation_bulk.__name__ + " stations=" + str(lat.size)
+                 + " times=" + str(len(times)), clr=['r', 'y'], debug=self.debug)
+
+        if self.backend == BACKEND_MEEUS:
+            # geocentric Moon positions for all times, then the parallax of all stations, shape (stations, times)
+            az, el, d = meeus_moon.topocentric_azimuth_elevation_array(
+                meeus_moon.moon_equatorial_positions(times), np.degrees(lat), np.degrees(lon), elevation_km * 1000.0,
+                refraction=self.refraction)
+        else:
+            # apparent geocentric position of the Moon in the Earth-fixed frame, shape (3, times)
+            t = self.ts.from_datetimes(times)
+            moon_xyz = self.earth.at(t).observe(self.target).apparent().frame_xyz(itrs).km
+
+            # observer positions (WGS84), shape (3, stations)
+            sin_lat, cos_lat, sin_lon, cos_lon = np.sin(lat), np.cos(lat), np.sin(lon), np.cos(lon)
+            e2 = WGS84_FLATTENING * (2 - WGS84_FLATTENING)
+            n = WGS84_RADIUS_KM / np.sqrt(1 - e2 * sin_lat * sin_lat)
+            observer_xyz = np.array([(n + elevation_km) * cos_lat * cos_lon, (n + elevation_km) * cos_lat * sin_lon,
+                                     (n * (1 - e2) + elevation_km) * sin_lat])
+
+            # topocentric vectors, shape (3, stations, times), rotated to the local East, North, Up directions
+            x, y, z = moon_xyz[:, np.newaxis, :] - observer_xyz[:, :, np.newaxis]
+            sin_lat, cos_lat = sin_lat[:, np.newaxis], cos_lat[:, np.newaxis]
+            sin_lon, cos_lon = sin_lon[:, np.newaxis], cos_lon[:, np.newaxis]
+            east = -sin_lon * x + cos_lon * y
+            north = -sin_lat * cos_lon * x - sin_lat * sin_lon * y + cos_lat * z
+            up = cos_lat * cos_lon * x + cos_lat * sin_lon * y + sin_lat * z
+            az = np.degrees(np.arctan2(east, north)) % 360.0
+            el = np.degrees(np.arctan2(up, np.hypot(east, north)))
+            if self.refraction:
+                # standard atmosphere like Skyfield's altaz('standard'): 10 deg C, pressure from the elevation
+                el = refract(el, 10.0, 1010.0 * np.exp(-elevation_km[:, np.newaxis] / 9.1))
+
+        az, el = np.round(az, 2), np.round(el, 2)
+        if single_time:
+            return az[:, 0], el[:, 0]
+        return az, el
+
+    # calculate several targets (names, see __init__, default: the Moon and the Sun) for the observer's location on a
+    # common time grid in one batch: the observer's position is calculated once for all targets
+    # times: datetime (UTC) or a list of datetimes, default: now; returns TargetPositions (Skyfield backend only)
+    # location: observer (Skyfield Topos or wgs84.latlon), default: the observer's location
+    @full_ephemeris_fallback
+    def calculate_targets(self, targets=(TARGET_MOON, TARGET_SUN), times=None, location=None):
+        if self.backend != BACKEND_SKYFIELD:
+            raise ValueError("calculate_targets needs the skyfield backend")
+        if times is None:
+            times = datetime.now(timezone.utc)
+        times = [times] if isinstance(times, datetime) else list(times)
+        times = [t if t.tzinfo is not None else t.replace(tzinfo=timezone.utc) for t in times]
+        clrprint('INFO:', self.calculate_targets.__name__ + " targets=" + ",".join(targets) + " times="
+                 + str(len(times)), clr=['r', 'y'], debug=self.debug)
+        az, el, distance_km, range_rate_km_s, ra_hours, dec_degrees, directions = {}, {}, {}, {}, {}, {}, {}
+        with stage('targets'):
+            location = self.location if location is None else location
+            observer = (self.earth + location).at(self.ts.from_datetimes(times))
+            for name in targets:
+                astrometric = observer.observe(self.resolve_target(name))
+                ra, dec, d = astrometric.radec()
+                # range rate: relative velocity along the line of sight (including the Earth's rotation)
+                range_rate_km_s[name] = (np.sum(astrometric.position.km * astrometric.velocity.km_per_s, axis=0)
+                                         / d.km)
+                apparent = astrometric.apparent()
+                alt, target_az, d = apparent.altaz('standard' if self.refraction else None)
+                position = apparent.position.km
+                az[name], el[name], distance_km[name] = target_az.degrees, alt.degrees, d.km
+                ra_hours[name], dec_degrees[name] = ra.hours, dec.degrees
+                directions[name] = position / np.linalg.norm(position, axis=0)
+        return TargetPositions(times, az, el, distance_km, range_rate_km_s, ra_hours, dec_degrees, directions)
+
+    # angular separation of the Sun and the Moon [deg] seen by the observer (Sun noise on EME, below ~10-15 deg)
+    # times: datetime (UTC) or a list of datetimes, default: now; returns an array
+    def sun_moon_separation(self, times=None):
+        return self.calculate_targets((TARGET_MOON, TARGET_SUN), times).separation(TARGET_SUN, TARGET_MOON)
+
+    # plan the rotor path (cable wrap) for the next Moon pass with the planner, start_utc: datetime (UTC), default: now
+    # The pass is the visible part of the track (el >= 0) from start_utc, or from the next Moonrise, until Moonset.
+    # returns the PlannedPath or None, if the Moon does not rise within hours
+    def plan_session(self, start_utc=None, hours=24, step_min=1, park_az=0, park_el=0):
+        times, track_az, track_el = self.calculate_moon_track(start_utc, hours, step_min)
+        visible = np.nonzero(track_el >= 0)[0]
+        self.planned_path = None
+        if self.planner is None or not len(visible):
+            return None
+        first = visible[0]
+        setting = np.nonzero(track_el[first:] < 0)[0]
+        last = first + setting[0] if len(setting) else len(track_el)
+        self.planned_path = self.planner.plan(track_az[first:last], track_el[first:last], start_az=self.rotor_az,
+                                              park_az=park_az, park_el=park_el, times=times[first:last])
+        clrprint('INFO:', self.plan_session.__name__ + " start=" + str(times[first]) + " end="
+                 + str(times[last - 1]) + " slew=%.1f s" % self.planned_path.slew_s, clr=['r', 'y'], debug=self.debug)
+        return self.planned_path
+
+    # rotor azimuth (with cable wrap) for the azimuth az (0..360): the planned path at the time t (datetime UTC), else
+    # the position with the shortest slew from the last commanded position
+    def rotor_azimuth(self, az, t=None):
+        if self.planner is None:
+            return az
+        planned_az = None
+        if self.planned_path is not None and t is not None:
+            planned_az = self.planned_path.azimuth_at(t if t.tzinfo is not None else t.replace(tzinfo=timezone.utc))
+        return round(self.planner.nearest(az, planned_az if planned_az is not None else self.rotor_az), 2)
+
+    # state of the rotor link (see LinkHealth in rotorbackends.py): {'state', 'failures', 'retry_in_s', 'error'}
+    def rotor_link_status(self):
+        return self.rotor.link.status()
+
+    # report a change of the link state (log and bus), called after every rotor command
+    def report_rotor_link(self):
+        status = self.rotor_link_status()
+        if status['state'] != self.link_state:
+            self.link_state = status['state']
+            clrprint('WARNING:', self.report_rotor_link.__name__ + " " + self.rotor.name + " link " + status['state']
+                     + ("" if status['error'] is None else " (" + status['error'] + ")"), clr=['r', 'y'],
+                     debug=self.debug)
+            if self.bus is not None:
+                self.bus.publish(TOPIC_ROTOR_LINK, status)
+
+    # raises RotorLinkError (rotorbackends.py) if the rotor cannot be reached or the link is down
     def set_rotor_to_position(self, az, el):
-        rotctld_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        rotctld_socket.connect((self.rotctld_ip, self.rotctld_port))
-        command = "P " + str(az) + " " + str(el)
-        rotctld_socket.sendall(command.encode())
-        rotctld_socket.close()
+        try:
+            command = self.rotor.set_position(az, el)
+        finally:
+            self.report_rotor_link()
+        self.rotor_az = float(az)
+        self.rotor_el = float(el)
+        if self.cache is not None:
+            self.cache.invalidate('rotor', (self.rotor.name, self.rotor.address))  # the rotor starts to move
+        # command latency [s] of the rotor backend, e.g. for the session log
+        self.last_command_latency_s = self.rotor.last_latency_s
+        if self.bus is not None:
+            self.bus.publish(TOPIC_ROTOR_STATE, {'cmd_az': az, 'cmd_el': el,
+                                                 'latency_s': self.last_command_latency_s})
         clrprint('INFO:', self.set_rotor_to_position.__name__ + " cmd=" + command, clr=['r', 'y'], debug=self.debug)
 
-    def get_rotor_position(self):
-        rotctld_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        rotctld_socket.connect((self.rotctld_ip, self.rotctld_port))
-        command = "p"
-        rotctld_socket.sendall(command.encode())
-        response = rotctld_socket.recv(1024).decode()
-        rotctld_socket.close()
-        # parse the 2 numbers for az, el from the String with a newline
-        lines = response.split('\n')
-        az = float(lines[0])
-        el = float(lines[1])
+    # publish: publish the read-back to the bus (if any)
+    def get_rotor_position(self, publish=True):
+        try:
+            if self.cache is None:
+                az, el = self.rotor.get_position()
+            else:
+                az, el = self.cache.get('rotor', (self.rotor.name, self.rotor.address), self.rotor.get_position)
+        finally:
+            self.report_rotor_link()
+        if self.bus is not None and publish:
+            self.bus.publish(TOPIC_ROTOR_STATE, {'read_az': az, 'read_el': el})
         clrprint('INFO:', self.get_rotor_position.__name__ + " az=" + str(az) + " el=" + str(el), clr=['r', 'y'],
                  debug=self.debug)
         return az, el
 
+    # hit/miss statistics of the position cache
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else {}
+
     def park_rotor(self, az=0, el=0):
+        az = self.rotor_azimuth(az)
         self.set_rotor_to_position(az=az, el=el)
         clrprint('INFO:', self.park_rotor.__name__ + " az=" + str(az) + " el=" + str(el), clr=['r', 'y'],
                  debug=self.debug)
@@ -105,13 +518,16 @@ class MRotController:
         self.calculate_azimuth_elevation(current_utc_timestamp.year, current_utc_timestamp.month,
                                          current_utc_timestamp.day, current_utc_timestamp.hour,
                                          current_utc_timestamp.minute, current_utc_timestamp.second)
-        self.set_rotor_to_position(self.azimuth_degrees, self.elevation_degrees)
+        self.set_rotor_to_position(self.rotor_azimuth(self.azimuth_degrees, current_utc_timestamp),
+                                   self.elevation_degrees)
         clrprint('INFO:', self.set_rotor_to_current_moon_position.__name__ + " az=" + str(self.azimuth_degrees)
                  + " el=" + str(self.elevation_degrees), clr=['r', 'y'], debug=self.debug)
         return (self.azimuth_degrees, self.elevation_degrees)
 
 
 if __name__ == "__main__":
+    # --profile: cProfile and stage times, written to a file on exit (see profiling.py)
+    enable_from_argv('mrotorctl')
     #######################################################
     # The main method is used for test purpose only.
     # It shows you how to use this class.
@@ -153,3 +569,9 @@ if __name__ == "__main__":
     rotctl2 = MRotController("localhost", 4533)
     rotctl2.set_observer_location('47.468 N', '9.732 E', elevation_m=500)
     rotctl2.set_rotor_to_current_moon_position()
+
+    # Alternative without the ephemeris file de421.bsp: fast analytical Moon model (error < 0.01 deg)
+    rotctl3 = MRotController("localhost", 4533, debug=DEBUG, backend=BACKEND_MEEUS)
+    rotctl3.set_observer_location('47.468 N', '9.732 E', elevation_m=500)
+    rotctl3.calculate_azimuth_elevation(dt_utc.year, dt_utc.month, dt_utc.day, dt_utc.hour, dt_utc.minute,
+                                        dt_utc.second)
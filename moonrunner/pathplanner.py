@@ -0,0 +1,181 @@
+import argparse
+from datetime import datetime, timezone
+
+import numpy as np
+
+# pathplanner.py contains the class "AzimuthPathPlanner", which plans the azimuth path of a rotor with cable wrap.
+# Rotors often turn more than 360 deg (e.g. 0..450 deg) or use -180..180 deg. An azimuth of the Moon (0..360 deg) can
+# then be reached at more than one rotor position, e.g. 10 deg also as 370 deg. Sending 0..360 always makes the rotor
+# sweep all the way around when the Moon crosses North, and many seconds of tracking are lost.
+#
+# plan() chooses, for the precomputed Moon track of a session, the rotor position of every track point and the park
+# position at the end, so that the total slew time (start -> track -> park) is minimal. This is a shortest path over
+# the track points with up to 3 rotor positions each (dynamic programming, vectorized per track point).
+# nearest() chooses the rotor position with the shortest slew from the current position, e.g. for the joystick.
+# MRotController uses the planner for set_rotor_to_current_moon_position and park_rotor (see plan_session).
+#
+# Usage: python pathplanner.py [--az-min 0] [--az-max 450] [--hours 12] (compares the plan with a 0..360 rotor)
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+AZ_MIN = 0.0  # azimuth range of the rotor [deg]
+AZ_MAX = 360.0
+EL_MIN = 0.0  # elevation range of the rotor [deg]
+EL_MAX = 90.0
+AZ_RATE_DPS = 3.0  # slew rates [deg/s]
+EL_RATE_DPS = 3.0
+WRAPS = np.array([-360.0, 0.0, 360.0, 720.0])  # offsets of the candidate rotor positions
+
+
+# the planned rotor positions of a session
+class PlannedPath:
+    def __init__(self, times, track_az, az, el, park_az, park_el, slew_s):
+        self.times = times  # datetimes (UTC) of the track points
+        self.track_az = track_az  # Moon azimuth 0..360 [deg]
+        self.az = az  # rotor azimuth (with wrap) [deg]
+        self.el = el  # rotor elevation [deg]
+        self.park_az = park_az
+        self.park_el = park_el
+        self.slew_s = slew_s  # total slew time [s]
+
+    # planned rotor azimuth at the time t (datetime UTC), None after the end of the plan
+    def azimuth_at(self, t):
+        if not self.times or t > self.times[-1] + (self.times[-1] - self.times[0]) / max(len(self.times) - 1, 1):
+            return None
+        i = min(max(int(np.searchsorted(np.array(self.times), t)), 0), len(self.times) - 1)
+        return float(self.az[i])
+
+
+class AzimuthPathPlanner:
+    def __init__(self, az_min=AZ_MIN, az_max=AZ_MAX, el_min=EL_MIN, el_max=EL_MAX, az_rate_dps=AZ_RATE_DPS,
+                 el_rate_dps=EL_RATE_DPS):
+        if az_max - az_min < 360.0:
+            raise ValueError("the azimuth range must cover 360 deg")
+        self.az_min = az_min
+        self.az_max = az_max
+        self.el_min = el_min
+        self.el_max = el_max
+        self.az_rate_dps = az_rate_dps
+        self.el_rate_dps = el_rate_dps
+
+    # rotor positions reaching the azimuths az (array, 0..360 deg), shape (points, len(WRAPS)), NaN: out of range
+    def candidates(self, az):
+        az = np.asarray(az, dtype=float) % 360.0
+        positions = az[..., np.newaxis] + WRAPS
+        return np.where((positions >= self.az_min - 1e-9) & (positions <= self.az_max + 1e-9), positions, np.nan)
+
+    # slew time [s] between rotor positions, az/el move at the same time
+    def slew_time(self, az0, el0, az1, el1):
+        return np.maximum(np.abs(np.asarray(az1) - az0) / self.az_rate_dps,
+                          np.abs(np.asarray(el1) - el0) / self.el_rate_dps)
+
+    def clip_el(self, el):
+        return np.clip(el, self.el_min, self.el_max)
+
+    # rotor position for az with the shortest slew from the rotor position current_az
+    def nearest(self, az, current_az=None):
+        positions = self.candidates(az)
+        if current_az is None:
+            return float(np.nanmin(positions))
+        return float(positions[np.nanargmin(np.abs(positions - current_az))])
+
+    # plan the rotor positions for the Moon track (arrays track_az 0..360, track_el [deg])
+    # start_az/start_el: current rotor position (with wrap, default: park position), park_az/park_el: park at the end
+    # returns PlannedPath (times: optional list of datetimes of the track points)
+    def plan(self, track_az, track_el, start_az=None, start_el=None, park_az=None, park_el=None, times=None):
+        track_az = np.asarray(track_az, dtype=float) % 360.0
+        el = self.clip_el(np.asarray(track_el, dtype=float))
+        park_el = self.el_min if park_el is None else float(self.clip_el(park_el))
+        start_el = park_el if start_el is None else float(start_el)
+        positions = self.candidates(track_az)
+
+        # cost[k]: minimal slew time to reach candidate k of the current track point
+        if start_az is None:
+            cost = np.where(np.isnan(positions[0]), np.inf, 0.0)
+        else:
+            cost = np.where(np.isnan(positions[0]), np.inf, self.slew_time(start_az, start_el, positions[0], el[0]))
+        previous = np.zeros(positions.shape, dtype=int)
+        for i in range(1, len(track_az)):
+            # transition costs (candidates of i-1) x (candidates of i)
+            step = self.slew_time(positions[i - 1][:, np.newaxis], el[i - 1], positions[i][np.newaxis, :], el[i])
+            total = np.where(np.isnan(step), np.inf, cost[:, np.newaxis] + step)
+            previous[i] = np.argmin(total, axis=0)
+            cost = total[previous[i], np.arange(len(WRAPS))]
+
+        # park at the end: choose the park position (with wrap) with the shortest slew from the last track point
+        park_positions = self.candidates([0.0 if park_az is None else park_az])[0]
+        if park_az is None:
+            park_choice = np.full(len(WRAPS), np.nan)
+            final = cost
+        else:
+            park_step = self.slew_time(positions[-1][:, np.newaxis], el[-1], park_positions[np.newaxis, :], park_el)
+            park_total = np.where(np.isnan(park_step), np.inf, cost[:, np.newaxis] + park_step)
+            park_choice = park_positions[np.argmin(park_total, axis=1)]
+            final = np.min(park_total, axis=1)
+
+        # backtrack the cheapest path
+        k_last = int(np.argmin(final))
+        k = k_last
+        path = np.empty(len(track_az))
+        for i in range(len(track_az) - 1, -1, -1):
+            path[i] = positions[i, k]
+            k = previous[i, k]
+        return PlannedPath(list(times) if times is not None else [], track_az, path, el,
+                           None if park_az is None else float(park_choice[k_last]), park_el, float(final[k_last]))
+
+
+# create the planner from a config.yaml entry (see CONFIG_DATA_DEFAULT in moonrunner_gui.py)
+def create_path_planner(config):
+    return AzimuthPathPlanner(config.get('rotor_az_min', AZ_MIN), config.get('rotor_az_max', AZ_MAX),
+                              az_rate_dps=config.get('rotor_az_rate_dps', AZ_RATE_DPS),
+                              el_rate_dps=config.get('rotor_el_rate_dps', EL_RATE_DPS))
+
+
+if __name__ == "__main__":
+    from mrotorctl import MRotController, BACKEND_MEEUS
+
+    parser = argparse.ArgumentParser(description="Plan the rotor azimuth path with cable wrap for the Moon track")
+    parser.add_argument('--az-min', type=float, default=0.0, help="lowest rotor azimuth [deg]")
+    parser.add_argument('--az-max', type=float, default=450.0, help="highest rotor azimuth [deg]")
+    parser.add_argument('--rate', type=float, default=AZ_RATE_DPS, help="slew rate [deg/s]")
+    parser.add_argument('--park-az', type=float, default=0.0, help="park azimuth at the start and end [deg]")
+    parser.add_argument('--hours', type=float, default=12, help="length of the session [h]")
+    parser.add_argument('--latitude', default='47.468 N')
+    parser.add_argument('--longitude', default='9.732 E')
+    args = parser.parse_args()
+
+    rotctl = MRotController("localhost", 4533, backend=BACKEND_MEEUS)
+    rotctl.set_observer_location(args.latitude, args.longitude, elevation_m=500)
+    start = datetime.now(timezone.utc)
+    times, track_az, track_el = rotctl.calculate_moon_track(start, args.hours, step_min=1)
+    visible = track_el >= 0
+    if not np.any(visible):
+        print("The Moon does not rise in the next %.0f hours" % args.hours)
+    else:
+        track_az, track_el = track_az[visible], track_el[visible]
+        times = [t for t, v in zip(times, visible) if v]
+        for name, az_min, az_max in (("0..360", 0.0, 360.0), ("%g..%g" % (args.az_min, args.az_max),
+                                                              args.az_min, args.az_max)):
+            planner = AzimuthPathPlanner(az_min, az_max, az_rate_dps=args.rate, el_rate_dps=args.rate)
+            path = planner.plan(track_az, track_el, start_az=planner.nearest(args.park_az), park_az=args.park_az,
+                                times=times)
+            print("rotor %-10s total slew %6.1f s, start az %.1f, end az %.1f, park az %.1f"
+                  % (name, path.slew_s, path.az[0], path.az[-1], path.park_az))
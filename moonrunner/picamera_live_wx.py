@@ -2,19 +2,33 @@
 import wx
 import io
 import time
+import argparse
 from datetime import datetime
-from picamera2 import Picamera2, Preview
 from PIL import Image
 import numpy as np
+from eventbus import TOPIC_CAMERA_FRAME
+from camerasources import PicameraSource, VideoFileSource, SyntheticMoonSource, SOURCE_PICAMERA, SOURCE_VIDEO, \
+    SOURCE_SYNTHETIC, preview_rgb
+from luckyimaging import LuckyStacker, BEST_N
+from profiling import stage, enable_from_argv
 
 # picamera_live_wx.py is used to show a live view via Raspberry Pi Camera.
 # The code is adapted to run on a Raspberry Pi 5 with the picamera2 module.
 # Tested with a Pi HQ Camera.
 #
 # After start-up, you will see a live view from the camera.
+# The frames come from a camera source (camerasources.py): the Pi camera (default), a video file or synthetic Moon
+# frames, e.g. to run the live view on a normal Linux box:
+#   python picamera_live_wx.py --source synthetic --width 1280 --height 960 --fps 25
+# The live view shows the small preview frames (--width/--height), converted with numpy views (rotation, RGB) and one
+# copy. Save Image and the time-lapse capture a still with the full resolution (--still-width/--still-height, default:
+# the full sensor of the Pi camera).
 #
 # Functions:
-#   File/Save Image
+#   File/Save Image         saves a still with the full resolution
+#   File/Time-lapse         saves a still every TIMELAPSE_INTERVAL_S seconds
+#   File/Lucky Imaging      scores the live frames and keeps the sharpest BEST_N (luckyimaging.py)
+#   File/Save Stack         saves the aligned stack of the kept frames
 #   File/Quit
 #
 #
@@ -42,24 +56,42 @@ ROTATE_ANGLE = 180 # rotate picture 180 degrees
 IMAGE_WIDTH  = 640 # image width
 IMAGE_HEIGHT = 480 # image height
 IMAGE_SHUTTER = 12 # 1000 / IMAGE_SHUTTER
+TIMELAPSE_INTERVAL_S = 60 # interval of the time-lapse stills [s]
+
+# rotated RGB image (PIL) of a camera frame
+def frame_to_rgb_image(frame, rotate_angle=ROTATE_ANGLE):
+    if rotate_angle % 90 == 0:
+        return Image.fromarray(preview_rgb(frame, rotate_angle=rotate_angle))
+    image = Image.fromarray(frame)
+
+    # Rotate the image (degrees)
+    image = image.rotate(rotate_angle)
+    return image.convert("RGB")
+
 
 class CameraPanel(wx.Panel):
-    def __init__(self, parent):
+    # bus: EventBus of the single-application mode (moonrunner_app.py), the frames are published to it
+    # source: camera source (camerasources.py), default: the Pi camera with IMAGE_WIDTH x IMAGE_HEIGHT
+    def __init__(self, parent, bus=None, source=None):
         wx.Panel.__init__(self, parent)
         self.SetBackgroundColour('black')
+        self.bus = bus
 
         # Set up camera
-        self.camera = Picamera2()
-        self.camera.configure(self.camera.create_preview_configuration(main={"size": (IMAGE_WIDTH, IMAGE_HEIGHT)}))
+        self.camera = source if source is not None else PicameraSource(IMAGE_WIDTH, IMAGE_HEIGHT, IMAGE_SHUTTER)
         self.camera.start()
+        self.stacker = None  # LuckyStacker while lucky imaging is on
+        self.lucky_imaging = False
+        self.timelapse_timer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.on_timelapse, self.timelapse_timer)
 
         # Bitmap for showing the image
-        self.bitmap = wx.Bitmap(IMAGE_WIDTH, IMAGE_HEIGHT)
+        self.bitmap = wx.Bitmap(self.camera.width, self.camera.height)
 
         # Timer for updating the frame
         self.timer = wx.Timer(self)
         self.Bind(wx.EVT_TIMER, self.update_frame, self.timer)
-        self.timer.Start(1000 // IMAGE_SHUTTER)
+        self.timer.Start(int(1000 // self.camera.fps))
 
         # Set up sizer
         sizer = wx.BoxSizer(wx.VERTICAL)
@@ -70,39 +102,98 @@ class CameraPanel(wx.Panel):
         self.Bind(wx.EVT_CLOSE, self.on_close)
 
     def update_frame(self, event):
-        frame = self.camera.capture_array()
-        image = Image.fromarray(frame)
+        with stage('frame capture'):
+            frame = self.camera.capture_array()
+        if self.bus is not None:
+            self.bus.publish(TOPIC_CAMERA_FRAME, {'frame': frame, 'time': time.time()})
+        if self.lucky_imaging:
+            if self.stacker is None:
+                self.stacker = LuckyStacker(frame.shape[1], frame.shape[0], frame.shape[2] if frame.ndim == 3 else 1,
+                                            BEST_N)
+            self.stacker.submit(frame)
+        with stage('frame convert'):
+            if ROTATE_ANGLE % 90 == 0:
+                # strided views for the downscale and the rotation, one copy for wx
+                preview = preview_rgb(frame, self.camera.width, self.camera.height, ROTATE_ANGLE)
+                width, height, data = preview.shape[1], preview.shape[0], preview.tobytes()
+            else:
+                image = frame_to_rgb_image(frame)
+                width, height, data = image.size[0], image.size[1], image.tobytes()
 
-        # Rotate the image (degrees)
-        image = image.rotate(ROTATE_ANGLE)
-
-        # Convert PIL image to wx.Image
-        wx_image = wx.Image(image.size[0], image.size[1])
-        wx_image.SetData(image.convert("RGB").tobytes())
-        self.bitmap = wx_image.ConvertToBitmap()
-        self.image_ctrl.SetBitmap(self.bitmap)
-        self.Refresh()
+            # Convert RGB data to wx.Image
+            wx_image = wx.Image(width, height)
+            wx_image.SetData(data)
+            self.bitmap = wx_image.ConvertToBitmap()
+        with stage('frame blit'):
+            self.image_ctrl.SetBitmap(self.bitmap)
+            if self.image_ctrl.GetMinSize() != (width, height):
+                # the downscaled preview may be smaller than the camera resolution (see camerasources.downscale)
+                self.image_ctrl.SetMinSize((width, height))
+                self.Layout()
+            self.Refresh()
 
     def on_close(self, event):
+        self.stop()
+        self.Destroy()
+
+    def stop(self):
         self.timer.Stop()
+        self.timelapse_timer.Stop()
         self.camera.stop()
-        self.Destroy()
+        if self.stacker is not None:
+            self.stacker.stop()
+            self.stacker = None
+
+    # lucky imaging on/off, switching on starts with an empty buffer
+    def set_lucky_imaging(self, on):
+        self.lucky_imaging = on
+        if on and self.stacker is not None:
+            self.stacker.reset()
+
+    # stack the kept frames on the worker thread and save the stack
+    def save_stack(self):
+        if self.stacker is None:
+            wx.MessageBox("Switch on File/Lucky Imaging first", "Info", wx.OK | wx.ICON_INFORMATION)
+            return
+        self.stacker.request_stack(lambda image: wx.CallAfter(self.save_stack_image, image))
+
+    def save_stack_image(self, image):
+        if image is not None:
+            self.save_image(image, "stack")
+
+    # time-lapse on/off: a still every interval_s seconds
+    def set_timelapse(self, on, interval_s=TIMELAPSE_INTERVAL_S):
+        if on:
+            self.timelapse_timer.Start(int(interval_s * 1000))
+        else:
+            self.timelapse_timer.Stop()
+
+    def on_timelapse(self, event):
+        with stage('still capture'):
+            frame = self.camera.capture_still()
+        self.save_image(frame, "timelapse", notify=False)
 
+    # still with the full resolution (not the preview)
     def capture_and_save_image(self):
-        frame = self.camera.capture_array()
-        image = Image.fromarray(frame)
-        image = image.rotate(ROTATE_ANGLE).convert('RGB')  # Ensure image is in RGB mode
+        with stage('still capture'):
+            frame = self.camera.capture_still()
+        self.save_image(frame)
+
+    def save_image(self, frame, prefix="image", notify=True):
+        image = frame_to_rgb_image(frame)  # Ensure image is in RGB mode
 
         # Save image with timestamp as filename
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"image_{timestamp}.jpg"
+        filename = f"{prefix}_{timestamp}.jpg"
         image.save(filename)
-        wx.MessageBox(f"Image saved as {filename}", "Info", wx.OK | wx.ICON_INFORMATION)
+        if notify:
+            wx.MessageBox(f"Image saved as {filename}", "Info", wx.OK | wx.ICON_INFORMATION)
 
 class MainFrame(wx.Frame):
-    def __init__(self):
-        wx.Frame.__init__(self, None, title="Pi Camera Live View", size=(IMAGE_WIDTH + 20, IMAGE_HEIGHT + 60))
-        panel = CameraPanel(self)
+    def __init__(self, source=None):
+        width, height = (source.width, source.height) if source is not None else (IMAGE_WIDTH, IMAGE_HEIGHT)
+        wx.Frame.__init__(self, None, title="Pi Camera Live View", size=(width + 20, height + 60))
+        panel = CameraPanel(self, source=source)
         self.init_menu()
         self.Show()
 
@@ -114,6 +205,17 @@ class MainFrame(wx.Frame):
         # Save Image menu item
         save_item = file_menu.Append(wx.ID_ANY, 'Save Image', 'Save the current image')
         self.Bind(wx.EVT_MENU, self.on_save_image, save_item)
+
+        # Time-lapse menu item
+        timelapse_item = file_menu.AppendCheckItem(wx.ID_ANY, 'Time-lapse',
+                                                   'Save a still every %d s' % TIMELAPSE_INTERVAL_S)
+        self.Bind(wx.EVT_MENU, self.on_timelapse, timelapse_item)
+
+        # Lucky imaging menu items
+        lucky_item = file_menu.AppendCheckItem(wx.ID_ANY, 'Lucky Imaging', 'Keep the sharpest frames for a stack')
+        self.Bind(wx.EVT_MENU, self.on_lucky_imaging, lucky_item)
+        stack_item = file_menu.Append(wx.ID_ANY, 'Save Stack', 'Save the aligned stack of the sharpest frames')
+        self.Bind(wx.EVT_MENU, self.on_save_stack, stack_item)
         
         # Quit menu item
         quit_item = file_menu.Append(wx.ID_EXIT, 'Quit', 'Quit application')
@@ -126,11 +228,43 @@ class MainFrame(wx.Frame):
         panel = self.GetChildren()[0]
         if isinstance(panel, CameraPanel):
             panel.capture_and_save_image()
+
+    def on_timelapse(self, event):
+        panel = self.GetChildren()[0]
+        if isinstance(panel, CameraPanel):
+            panel.set_timelapse(event.IsChecked())
+
+    def on_lucky_imaging(self, event):
+        panel = self.GetChildren()[0]
+        if isinstance(panel, CameraPanel):
+            panel.set_lucky_imaging(event.IsChecked())
+
+    def on_save_stack(self, event):
+        panel = self.GetChildren()[0]
+        if isinstance(panel, CameraPanel):
+            panel.save_stack()
     
     def on_quit(self, event):
         self.Close()
 
 if __name__ == "__main__":
+    enable_from_argv('picamera_live_wx')  # --profile: see profiling.py
+    parser = argparse.ArgumentParser(description="Live view of the Pi camera, a video file or synthetic Moon frames")
+    parser.add_argument('--source', default=SOURCE_PICAMERA, choices=[SOURCE_PICAMERA, SOURCE_VIDEO, SOURCE_SYNTHETIC])
+    parser.add_argument('--video', default=None, help="video file of the video source")
+    parser.add_argument('--width', type=int, default=IMAGE_WIDTH)
+    parser.add_argument('--height', type=int, default=IMAGE_HEIGHT)
+    parser.add_argument('--fps', type=float, default=IMAGE_SHUTTER)
+    parser.add_argument('--still-width', type=int, default=0, help="still width (default: full sensor)")
+    parser.add_argument('--still-height', type=int, default=0, help="still height (default: full sensor)")
+    args = parser.parse_args()
+    if args.source == SOURCE_VIDEO:
+        camera_source = VideoFileSource(args.video, args.width, args.height, args.fps)
+    elif args.source == SOURCE_SYNTHETIC:
+        camera_source = SyntheticMoonSource(args.width, args.height, args.fps, still_width=args.still_width,
+                                            still_height=args.still_height)
+    else:
+        camera_source = PicameraSource(args.width, args.height, args.fps, args.still_width, args.still_height)
     app = wx.App(False)
-    frame = MainFrame()
+    frame = MainFrame(camera_source)
     app.MainLoop()
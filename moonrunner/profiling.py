@@ -0,0 +1,136 @@
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+
+# profiling.py contains the --profile mode of the MoonRunner programs (mrotorctl.py, moonrunner_gui.py,
+# rotorctl_joystick.py, picamera_live_wx.py, moonrunner_app.py).
+# Started with --profile (or --profile=FILE), a program runs with cProfile and measures the wall time of its stages,
+# e.g. the ephemeris load, observe/apparent/altaz, socket connect/send/recv and frame capture/convert/blit.
+# On exit two files are written:
+#   FILE.txt    per-stage wall times (count, total, mean, max) and the 40 functions with the highest cumulative time
+#   FILE.prof   the cProfile data, e.g. for "python -m pstats FILE.prof" or snakeviz
+# Default FILE: profile_<program>_<yyyymmdd_hhmmss> in the working directory.
+#
+# The stages are measured with "with stage('name'):" in the code. Without --profile stage() returns a shared no-op
+# object, so the hooks cost only a function call.
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+PROFILE_ARGUMENT = '--profile'
+TOP_FUNCTIONS = 40
+
+_stage_times = None  # stage name -> [count, total_s, max_s], None: profiling off
+_lock = threading.Lock()
+
+
+class _NoStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+class _Stage:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            times = _stage_times.setdefault(self.name, [0, 0.0, 0.0])
+            times[0] += 1
+            times[1] += elapsed
+            times[2] = max(times[2], elapsed)
+        return False
+
+
+# measure the wall time of a stage: "with stage('socket connect'):"
+def stage(name):
+    if _stage_times is None:
+        return _NO_STAGE
+    return _Stage(name)
+
+
+def is_enabled():
+    return _stage_times is not None
+
+
+# start profiling, the results are written to path (without extension) on exit
+def start_profiling(path):
+    global _stage_times
+    _stage_times = {}
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    atexit.register(write_results, profiler, path, start)
+    profiler.enable()
+    return profiler
+
+
+# start profiling, if --profile[=FILE] is given on the command line (the argument is removed from sys.argv)
+def enable_from_argv(program):
+    for i, argument in enumerate(sys.argv[1:], 1):
+        if argument == PROFILE_ARGUMENT or argument.startswith(PROFILE_ARGUMENT + '='):
+            del sys.argv[i]
+            path = argument.partition('=')[2] or "profile_%s_%s" % (program, datetime.now().strftime("%Y%m%d_%H%M%S"))
+            print("Profiling, results are written to %s.txt on exit" % path)
+            return start_profiling(path)
+    return None
+
+
+def stage_report(total_s):
+    lines = ["%-28s %8s %12s %12s %12s %7s" % ("stage", "count", "total [ms]", "mean [ms]", "max [ms]", "share")]
+    with _lock:
+        items = sorted(_stage_times.items(), key=lambda item: -item[1][1])
+    for name, (count, stage_total_s, max_s) in items:
+        lines.append("%-28s %8d %12.1f %12.3f %12.3f %6.1f%%" % (name, count, stage_total_s * 1000.0,
+                                                                  stage_total_s * 1000.0 / count, max_s * 1000.0,
+                                                                  100.0 * stage_total_s / total_s if total_s else 0))
+    return "\n".join(lines)
+
+
+def write_results(profiler, path, start):
+    profiler.disable()
+    total_s = time.perf_counter() - start
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(path + '.prof')
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(TOP_FUNCTIONS)
+    with open(path + '.txt', 'w') as f:
+        f.write("wall time: %.1f s\n\n" % total_s)
+        f.write(stage_report(total_s) + "\n\n")
+        f.write(stream.getvalue())
+    print("Profile written to %s.txt and %s.prof" % (path, path))
@@ -0,0 +1,433 @@
+import argparse
+import os
+import re
+import socket
+import statistics
+import threading
+import time
+
+from profiling import stage
+
+# rotorbackends.py contains the rotor backends used by MRotController to send positions to an antenna rotor.
+# All backends share the same interface:
+#   set_position(az, el)    move the rotor to az, el [deg]
+#   get_position()          read the rotor position, returns (az, el) [deg]
+#   close()                 close the connection
+#   address                 IP:port or serial port, identifies the rotor (e.g. for the position cache)
+#   last_latency_s          duration of the last command [s], to compare the backends
+#   link                    LinkHealth of the connection, link.status() e.g. for the GUI
+#
+# Backends:
+#   RotctldBackend      rotor control protocol over TCP to hamlib "rotctld" (default)
+#   GS232Backend        Yaesu GS-232 protocol directly over a serial port (e.g. AntRunner, ERC, K3NG controllers)
+#   EasyCommBackend     EasyComm II protocol directly over a serial port
+# The serial backends need the package "pyserial" and save the process hop and network round trip through rotctld.
+#
+# PtyRotorSimulator is a test double: it simulates a GS-232 or EasyComm rotor on a pseudo terminal (Linux/macOS), so
+# the serial backends can be tested and benchmarked without hardware.
+#
+# The backend is selected in config.yaml:
+#   rotor_backend: rotctld | gs232 | easycomm
+#   rotor_serial_port: /dev/ttyUSB0 (or COM3)
+#   rotor_serial_baud: 9600
+#
+# Connection health: every socket operation of rotctld has a timeout (rotor_timeout_s), the serial ports have the
+# read timeout SERIAL_TIMEOUT_S, so a dead rotctld or controller costs at most a few seconds instead of a hang.
+# LinkHealth is a circuit breaker around the commands: after rotor_breaker_failures consecutive connection errors the
+# link is "down" and the commands fail at once with RotorLinkError (no socket call) until the backoff time has
+# passed. Then one command probes the link ("probing"): on success the link is "up" again, on failure the backoff is
+# doubled (up to rotor_backoff_max_s). Invalid responses are no link errors (ValueError).
+#
+# Usage: python rotorbackends.py bench --backend gs232 --simulate     (latency with the simulated rotor)
+#        python rotorbackends.py bench --backend gs232 --serial-port /dev/ttyUSB0
+#        python rotorbackends.py bench --backend rotctld --ip 127.0.0.1 --port 4533
+#        python rotorbackends.py simulate --backend easycomm             (prints the pty device, runs until Ctrl-C)
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+BACKEND_ROTCTLD = 'rotctld'
+BACKEND_GS232 = 'gs232'
+BACKEND_EASYCOMM = 'easycomm'
+SERIAL_BAUD = 9600
+SERIAL_TIMEOUT_S = 1.0
+ROTCTLD_TIMEOUT_S = 2.0  # timeout of each socket operation (connect, send, recv) [s]
+BREAKER_FAILURES = 3  # consecutive connection errors until the link is down
+BACKOFF_MIN_S = 1.0  # first wait before a down link is probed again [s]
+BACKOFF_MAX_S = 30.0  # longest wait, the wait is doubled after every failed probe [s]
+
+# states of the rotor link
+LINK_UP = 'up'
+LINK_DOWN = 'down'  # commands fail at once until the backoff time has passed
+LINK_PROBING = 'probing'  # one command tries to reconnect
+
+NUMBER = r'[-+]?\d+(?:\.\d*)?'
+
+
+# the rotor cannot be reached (connection refused, timeout, serial error) or the link is down
+class RotorLinkError(IOError):
+    pass
+
+
+# circuit breaker with exponential backoff for the commands of a rotor backend (thread-safe)
+class LinkHealth:
+    def __init__(self, name, failures=BREAKER_FAILURES, backoff_min_s=BACKOFF_MIN_S, backoff_max_s=BACKOFF_MAX_S):
+        self.name = name
+        self.failures = failures
+        self.backoff_min_s = backoff_min_s
+        self.backoff_max_s = backoff_max_s
+        self.state = LINK_UP
+        self.failure_count = 0  # consecutive connection errors
+        self.backoff_s = 0.0
+        self.retry_time = 0.0  # time.monotonic() of the next probe
+        self.last_error = None
+        self.lock = threading.Lock()
+
+    # {'state', 'failures', 'retry_in_s', 'error'}
+    def status(self):
+        with self.lock:
+            retry_in_s = max(self.retry_time - time.monotonic(), 0.0) if self.state == LINK_DOWN else 0.0
+            return {'state': self.state, 'failures': self.failure_count, 'retry_in_s': round(retry_in_s, 1),
+                    'error': self.last_error}
+
+    # operation(*args) if the link is not down, connection errors (OSError, incl. timeouts) raise RotorLinkError
+    def call(self, operation, *args):
+        with self.lock:
+            if self.state != LINK_UP:
+                wait_s = self.retry_time - time.monotonic()
+                if self.state == LINK_PROBING or wait_s > 0:
+                    raise RotorLinkError("%s link down (%s), retry in %.1f s" % (self.name, self.last_error,
+                                                                               max(wait_s, 0.0)))
+                self.state = LINK_PROBING
+        try:
+            result = operation(*args)
+        except OSError as ex:
+            self.failed(ex)
+            raise RotorLinkError("%s: %s" % (self.name, str(ex) or type(ex).__name__)) from ex
+        except Exception:
+            self.succeeded()  # the rotor answered, e.g. with an invalid response
+            raise
+        self.succeeded()
+        return result
+
+    def failed(self, error):
+        with self.lock:
+            self.failure_count += 1
+            self.last_error = str(error) or type(error).__name__
+            if self.state == LINK_PROBING or self.failure_count >= self.failures:
+                self.backoff_s = min(2.0 * self.backoff_s, self.backoff_max_s) if self.backoff_s else self.backoff_min_s
+                self.retry_time = time.monotonic() + self.backoff_s
+                self.state = LINK_DOWN
+
+    def succeeded(self):
+        with self.lock:
+            self.state = LINK_UP
+            self.failure_count = 0
+            self.backoff_s = 0.0
+            self.last_error = None
+
+
+class RotorBackend:
+    name = None
+
+    def __init__(self, address=None):
+        self.address = address
+        self.last_latency_s = None
+        self.link = LinkHealth(self.name)
+
+    def set_position(self, az, el):
+        raise NotImplementedError
+
+    def get_position(self):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# rotor control protocol (hamlib rotctld) over TCP, one connection per command
+class RotctldBackend(RotorBackend):
+    name = BACKEND_ROTCTLD
+
+    # timeout_s: timeout of each socket operation [s]
+    def __init__(self, rotctld_ip, rotctld_port, timeout_s=ROTCTLD_TIMEOUT_S):
+        RotorBackend.__init__(self, "%s:%s" % (rotctld_ip, rotctld_port))
+        self.rotctld_ip = rotctld_ip
+        self.rotctld_port = rotctld_port
+        self.timeout_s = timeout_s
+
+    # send a command on a new connection, returns the response if response=True
+    def send_command(self, command, response=False):
+        with stage('socket connect'):
+            rotctld_socket = socket.create_connection((self.rotctld_ip, self.rotctld_port), timeout=self.timeout_s)
+        try:
+            with stage('socket send'):
+                rotctld_socket.sendall((command + "\n").encode())
+            if response:
+                with stage('socket recv'):
+                    return rotctld_socket.recv(1024).decode()
+        finally:
+            rotctld_socket.close()
+
+    def set_position(self, az, el):
+        start = time.perf_counter()
+        command = "P " + str(az) + " " + str(el)
+        self.link.call(self.send_command, command)
+        self.last_latency_s = time.perf_counter() - start
+        return command
+
+    def get_position(self):
+        start = time.perf_counter()
+        response = self.link.call(self.send_command, "p", True)
+        self.last_latency_s = time.perf_counter() - start
+        # parse the 2 numbers for az, el from the String with a newline
+        lines = response.split('\n')
+        return float(lines[0]), float(lines[1])
+
+
+# base class of the serial backends, the serial port stays open
+# The port is opened at the first command and closed after an error, the next command opens it again (e.g. after the
+# USB adapter was plugged in again). Each command/response exchange holds a lock, as the backend may be shared by
+# several threads (GUI timer, scheduler, web dashboard).
+class SerialRotorBackend(RotorBackend):
+    eol = b'\r'
+
+    def __init__(self, serial_port, baudrate=SERIAL_BAUD, timeout=SERIAL_TIMEOUT_S):
+        RotorBackend.__init__(self, serial_port)
+        try:
+            import serial
+        except ImportError:
+            raise ImportError("the serial rotor backends need pyserial: pip install pyserial")
+        self.serial_module = serial
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.serial = None
+        self.lock = threading.Lock()
+
+    # operation(*args) with the lock held and the port open, a port error closes the port
+    def exchange(self, operation, *args):
+        with self.lock:
+            try:
+                if self.serial is None:
+                    self.serial = self.serial_module.Serial(self.address, baudrate=self.baudrate, timeout=self.timeout)
+                return operation(*args)
+            except OSError:
+                self.close_port()
+                raise
+
+    def close_port(self):
+        if self.serial is not None:
+            try:
+                self.serial.close()
+            except OSError:
+                pass
+            self.serial = None
+
+    def send(self, command):
+        with stage('serial send'):
+            self.serial.write(command.encode('ascii') + self.eol)
+            self.serial.flush()
+
+    def query(self, command):
+        self.serial.reset_input_buffer()
+        self.send(command)
+        with stage('serial recv'):
+            response = self.serial.read_until(self.eol).decode('ascii', errors='replace')
+        if not response.endswith(self.eol.decode('ascii')):
+            raise TimeoutError(self.name + ": no response to " + repr(command))
+        return response.strip()
+
+    def set_position(self, az, el):
+        start = time.perf_counter()
+        command = self.position_command(az, el)
+        self.link.call(self.exchange, self.send, command)
+        self.last_latency_s = time.perf_counter() - start
+        return command
+
+    def get_position(self):
+        start = time.perf_counter()
+        az, el = self.parse_position(self.link.call(self.exchange, self.query, self.read_command))
+        self.last_latency_s = time.perf_counter() - start
+        return az, el
+
+    def close(self):
+        with self.lock:
+            self.close_port()
+
+
+# Yaesu GS-232A/B: "Waaa eee" moves to az, el (integer degrees), "C2" reads "AZ=aaa  EL=eee" (B) or "+0aaa+0eee" (A)
+class GS232Backend(SerialRotorBackend):
+    name = BACKEND_GS232
+    read_command = "C2"
+
+    # negative azimuths (-180..180 rotors) are sent as 0..360, 360..450 (overlap) is passed through,
+    # negative elevations (Moon below the horizon) are sent as 0
+    def position_command(self, az, el):
+        az = int(round(float(az)))
+        return "W%03d %03d" % (az % 360 if az < 0 else az, max(int(round(float(el))), 0))
+
+    @staticmethod
+    def parse_position(response):
+        numbers = re.findall(NUMBER, response.replace('AZ=', ' ').replace('EL=', ' '))
+        if len(numbers) < 2:
+            raise ValueError("GS-232: invalid position " + repr(response))
+        return float(numbers[0]), float(numbers[1])
+
+
+# EasyComm II: "AZaaa.a ELeee.e" moves to az, el, "AZ EL" reads "AZaaa.a ELeee.e"
+class EasyCommBackend(SerialRotorBackend):
+    name = BACKEND_EASYCOMM
+    eol = b'\n'
+    read_command = "AZ EL"
+
+    def position_command(self, az, el):
+        return "AZ%.1f EL%.1f" % (float(az), float(el))
+
+    @staticmethod
+    def parse_position(response):
+        az = re.search(r'AZ\s*(' + NUMBER + ')', response)
+        el = re.search(r'EL\s*(' + NUMBER + ')', response)
+        if az is None or el is None:
+            raise ValueError("EasyComm: invalid position " + repr(response))
+        return float(az.group(1)), float(el.group(1))
+
+
+# create the rotor backend from a config.yaml entry (see CONFIG_DATA_DEFAULT in moonrunner_gui.py)
+def create_rotor_backend(config):
+    backend = config.get('rotor_backend', BACKEND_ROTCTLD)
+    baudrate = config.get('rotor_serial_baud', SERIAL_BAUD)
+    if backend == BACKEND_ROTCTLD:
+        rotor = RotctldBackend(config['rotctld_ip'], config['rotctld_port'],
+                               config.get('rotor_timeout_s', ROTCTLD_TIMEOUT_S))
+    elif backend == BACKEND_GS232:
+        rotor = GS232Backend(config['rotor_serial_port'], baudrate)
+    elif backend == BACKEND_EASYCOMM:
+        rotor = EasyCommBackend(config['rotor_serial_port'], baudrate)
+    else:
+        raise ValueError("unknown rotor_backend: " + str(backend))
+    rotor.link = LinkHealth(rotor.name, config.get('rotor_breaker_failures', BREAKER_FAILURES),
+                            backoff_max_s=config.get('rotor_backoff_max_s', BACKOFF_MAX_S))
+    return rotor
+
+
+# simulated GS-232 or EasyComm rotor on a pseudo terminal, the backend connects to self.port
+class PtyRotorSimulator:
+    def __init__(self, protocol=BACKEND_GS232, az=0.0, el=0.0):
+        import tty
+        self.protocol = protocol
+        self.az = az
+        self.el = el
+        self.commands = []
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)
+        self.port = os.ttyname(self.slave_fd)
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        buffer = b''
+        while self.running:
+            try:
+                data = os.read(self.master_fd, 1024)
+            except OSError:
+                break
+            buffer += data
+            lines = re.split(b'[\r\n]', buffer)
+            buffer = lines.pop()
+            for line in lines:
+                if line.strip():
+                    response = self.handle(line.decode('ascii').strip())
+                    if response is not None:
+                        os.write(self.master_fd, response.encode('ascii'))
+
+    # returns the response to a command or None
+    def handle(self, command):
+        self.commands.append(command)
+        if self.protocol == BACKEND_GS232:
+            if command.upper() == 'C2':
+                return "AZ=%03d  EL=%03d\r" % (round(self.az), round(self.el))
+            match = re.match(r'W\s*(\d+)\s+(\d+)', command, re.IGNORECASE)
+            if match:
+                self.az, self.el = float(match.group(1)), float(match.group(2))
+        else:
+            if command.upper() == 'AZ EL':
+                return "AZ%.1f EL%.1f\n" % (self.az, self.el)
+            az = re.search(r'AZ\s*(' + NUMBER + ')', command)
+            el = re.search(r'EL\s*(' + NUMBER + ')', command)
+            if az:
+                self.az = float(az.group(1))
+            if el:
+                self.el = float(el.group(1))
+        return None
+
+    def close(self):
+        self.running = False
+        os.close(self.slave_fd)
+        os.close(self.master_fd)
+
+
+# median and max latency [ms] of set_position and get_position
+def benchmark(backend, count=100):
+    set_latency, get_latency = [], []
+    for i in range(count):
+        backend.set_position(round(i * 3.6 % 360, 1), round(i * 0.9 % 90, 1))
+        set_latency.append(backend.last_latency_s * 1000.0)
+        backend.get_position()
+        get_latency.append(backend.last_latency_s * 1000.0)
+    return {'set_median_ms': statistics.median(set_latency), 'set_max_ms': max(set_latency),
+            'get_median_ms': statistics.median(get_latency), 'get_max_ms': max(get_latency)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark rotor backends or simulate a serial rotor")
+    parser.add_argument('command', choices=['bench', 'simulate'])
+    parser.add_argument('--backend', default=BACKEND_ROTCTLD, choices=[BACKEND_ROTCTLD, BACKEND_GS232,
+                                                                      BACKEND_EASYCOMM])
+    parser.add_argument('--ip', default='127.0.0.1', help="IP of rotctld")
+    parser.add_argument('--port', type=int, default=4533, help="port of rotctld")
+    parser.add_argument('--serial-port', help="serial port of the rotor controller")
+    parser.add_argument('--baud', type=int, default=SERIAL_BAUD, help="baud rate")
+    parser.add_argument('--simulate', action='store_true', help="use a simulated rotor on a pseudo terminal")
+    parser.add_argument('--count', type=int, default=100, help="number of commands")
+    args = parser.parse_args()
+
+    simulator = None
+    if args.command == 'simulate' or args.simulate:
+        simulator = PtyRotorSimulator(args.backend)
+        args.serial_port = simulator.port
+        print("simulated %s rotor on %s" % (args.backend, simulator.port))
+    if args.command == 'simulate':
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            simulator.close()
+    else:
+        rotor = create_rotor_backend({'rotor_backend': args.backend, 'rotctld_ip': args.ip,
+                                      'rotctld_port': args.port, 'rotor_serial_port': args.serial_port,
+                                      'rotor_serial_baud': args.baud})
+        result = benchmark(rotor, args.count)
+        print("%s: set median %.2f ms (max %.2f ms), get median %.2f ms (max %.2f ms)"
+              % (args.backend, result['set_median_ms'], result['set_max_ms'], result['get_median_ms'],
+                 result['get_max_ms']))
+        rotor.close()
+        if simulator is not None:
+            simulator.close()
@@ -1,19 +1,28 @@
 import wx
 import math
-from mrotorctl import MRotController
+from mrotorctl import MRotController, MOON_TTL_S, ROTOR_TTL_S
+from rotorbackends import create_rotor_backend, RotorLinkError
+from pathplanner import create_path_planner
 import yaml
 import time
+from profiling import stage, enable_from_argv
 
 DEBUG=False
 ARROW_DEGREE_DELTA = 0.2
 TIMER_DELTA = 0.02 # 20ms
+JOYSTICK_RADIUS = 150
+KNOB_RADIUS = 20
+LABEL_WIDTH = 100 # room for the az/el labels next to the knob
 
 class JoystickPanel(wx.Panel):
     def __init__(self, parent, main_frame):
         wx.Panel.__init__(self, parent)
         self.main_frame = main_frame
         self.SetBackgroundColour(wx.Colour(255, 255, 255))
+        # all drawing is done in OnPaint (buffered), no background erase to avoid flicker
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
         self.Bind(wx.EVT_PAINT, self.OnPaint)
+        self.Bind(wx.EVT_SIZE, self.OnSize)
         self.Bind(wx.EVT_LEFT_DOWN, self.OnMouseDown)
         self.Bind(wx.EVT_LEFT_UP, self.OnMouseUp)
         self.Bind(wx.EVT_MOTION, self.OnMouseMove)
@@ -24,35 +33,73 @@ class JoystickPanel(wx.Panel):
         self.is_dragging = False
         self.azimuth = 0
         self.elevation = 0
-
-    def OnPaint(self, event):
-        dc = wx.PaintDC(self)
+        self.background = None
+        self.knob_pen = wx.Pen(wx.Colour(0, 0, 0), 2)
+        self.knob_brush = wx.Brush(wx.Colour(100, 100, 100))
+
+    def OnSize(self, event):
+        # the cached dial needs to be rendered again for the new size
+        self.background = None
+        self.Refresh(eraseBackground=False)
+        event.Skip()
+
+    def RenderBackground(self):
+        # render the static dial (base circle, compass directions) once into a bitmap
+        width, height = self.GetClientSize()
+        self.background = wx.Bitmap(max(width, 1), max(height, 1))
+        dc = wx.MemoryDC(self.background)
+        dc.SetBackground(wx.Brush(self.GetBackgroundColour()))
         dc.Clear()
         dc.SetPen(wx.Pen(wx.Colour(0, 0, 0), 2))
         dc.SetBrush(wx.Brush(wx.Colour(200, 200, 200)))
+        dc.DrawCircle(self.joystick_center.x, self.joystick_center.y, JOYSTICK_RADIUS)
+
+        # Draw compass directions
+        font = self.GetFont()
+        font.SetPointSize(10)  # Increase the font size for better visibility
+        dc.SetFont(font)
+        dc.DrawText("N", self.joystick_center.x - 5, self.joystick_center.y - 150)  # North
+        dc.DrawText("S", self.joystick_center.x - 5, self.joystick_center.y + 135)   # South
+        dc.DrawText("E", self.joystick_center.x + 140, self.joystick_center.y - 5)  # East
+        dc.DrawText("W", self.joystick_center.x - 150, self.joystick_center.y - 5) # West
+        dc.SelectObject(wx.NullBitmap)
+
+    def OnPaint(self, event):
+        if self.background is None:
+            self.RenderBackground()
+        # BufferedPaintDC only blits the update region (dirty rectangle) to the screen
+        with stage('joystick paint'):
+            self.PaintKnob(wx.BufferedPaintDC(self))
+
+    def PaintKnob(self, dc):
+        dc.DrawBitmap(self.background, 0, 0)
+        dc.SetFont(self.GetFont())
+        dc.SetPen(self.knob_pen)
+        dc.SetBrush(self.knob_brush)
+        dc.DrawCircle(self.joystick_position.x, self.joystick_position.y, KNOB_RADIUS)
 
-        dc.DrawCircle(self.joystick_center.x, self.joystick_center.y, 150)
-        dc.SetBrush(wx.Brush(wx.Colour(100, 100, 100)))
-        dc.DrawCircle(self.joystick_position.x, self.joystick_position.y, 20)
-        
         # Draw the line from the center to the joystick position
         dc.DrawLine(self.joystick_center.x, self.joystick_center.y, self.joystick_position.x, self.joystick_position.y)
-        
+
         # Draw azimuth and elevation labels
         azimuth_label = f"Az: {self.azimuth:.2f}°"
         elevation_label = f"El: {self.elevation:.2f}°"
-        
+
         dc.DrawText(azimuth_label, self.joystick_position.x, self.joystick_position.y - 30)
         dc.DrawText(elevation_label, self.joystick_position.x, self.joystick_position.y - 15)
 
-        # Draw compass directions
-        font = dc.GetFont()
-        font.SetPointSize(10)  # Increase the font size for better visibility
-        dc.SetFont(font)
-        dc.DrawText("N", self.joystick_center.x - 5, self.joystick_center.y - 150)  # North
-        dc.DrawText("S", self.joystick_center.x - 5, self.joystick_center.y + 135)   # South
-        dc.DrawText("E", self.joystick_center.x + 140, self.joystick_center.y - 5)  # East
-        dc.DrawText("W", self.joystick_center.x - 150, self.joystick_center.y - 5) # West
+    def GetKnobRect(self, position):
+        # rectangle around the knob, the line to the center and the labels
+        rect = wx.Rect(wx.Point(min(position.x, self.joystick_center.x), min(position.y, self.joystick_center.y)),
+                       wx.Point(max(position.x, self.joystick_center.x), max(position.y, self.joystick_center.y)))
+        rect = rect.Union(wx.Rect(position.x, position.y - 30, LABEL_WIDTH, 30))
+        return rect.Inflate(KNOB_RADIUS + 2, KNOB_RADIUS + 2)
+
+    def MoveKnob(self, position):
+        # refresh only the dirty rectangle around the old and new knob position
+        dirty = self.GetKnobRect(self.joystick_position).Union(self.GetKnobRect(position))
+        self.joystick_position = position
+        self.RefreshRect(dirty, eraseBackground=False)
 
     def OnMouseDown(self, event):
         self.is_dragging = True
@@ -60,7 +107,7 @@ class JoystickPanel(wx.Panel):
 
     def OnMouseUp(self, event):
         self.is_dragging = False
-        self.Refresh()
+        self.MoveKnob(self.joystick_position)
 
     def OnMouseMove(self, event):
         if self.is_dragging:
@@ -68,7 +115,7 @@ class JoystickPanel(wx.Panel):
             dx = x - self.joystick_center.x
             dy = y - self.joystick_center.y
             distance = (dx**2 + dy**2)**0.5
-            max_distance = 150
+            max_distance = JOYSTICK_RADIUS
 
             if distance > max_distance:
                 angle = math.atan2(dy, dx)
@@ -85,20 +132,17 @@ class JoystickPanel(wx.Panel):
                 if y < self.joystick_center.y:
                     y = self.joystick_center.y
 
-            self.joystick_position = wx.Point(int(x), int(y))
-            self.Refresh()
-
             # Calculate azimuth and elevation
             angle = math.degrees(math.atan2(dy, dx))
             self.azimuth = (angle + 90) % 360  # Adjusting so 0� is up
             self.elevation = min((distance / max_distance) * 90, 90)
+            self.MoveKnob(wx.Point(int(x), int(y)))
             self.main_frame.UpdateValues(self.azimuth, self.elevation)
 
     def ResetToCenter(self):
-        self.joystick_position = self.joystick_center
         self.azimuth = 0
         self.elevation = 0
-        self.Refresh()
+        self.MoveKnob(self.joystick_center)
         self.main_frame.UpdateValues(0, 0)
 
     def OnKeyDown(self, event):
@@ -119,7 +163,6 @@ class JoystickPanel(wx.Panel):
             return
 
         self.update_joystick_position()
-        self.Refresh()
         self.main_frame.UpdateValues(self.azimuth, self.elevation)   
 
     def update_joystick_position(self):
@@ -127,38 +170,28 @@ class JoystickPanel(wx.Panel):
         angle_rad = math.radians(self.azimuth - 90)  # convert azimuth to radians, adjusting for orientation
         x = self.joystick_center.x + radius * math.cos(angle_rad)
         y = self.joystick_center.y + radius * math.sin(angle_rad)
-        self.joystick_position = wx.Point(int(x), int(y))             
+        self.MoveKnob(wx.Point(int(x), int(y)))
 
-class MainFrame(wx.Frame):
-    def __init__(self, debug=False):
+# joystick with its controls, used by MainFrame and as a tab of the single-application mode (moonrunner_app.py)
+class JoystickControlPanel(wx.Panel):
+    def __init__(self, parent, rotctl, debug=False):
+        wx.Panel.__init__(self, parent)
         self.debug = debug
+        self.rotctl = rotctl
 
-        # initialize/load config
-        self.config_data = self.load_config()
-
-        wx.Frame.__init__(self, None, title="Rotor Joystick Control", size=(440, 440))
-        panel = wx.Panel(self)
         sizer = wx.BoxSizer(wx.VERTICAL)
-        self.joystick_panel = JoystickPanel(panel, self)
+        self.joystick_panel = JoystickPanel(self, self)
         sizer.Add(self.joystick_panel, 1, wx.EXPAND)
 
-        self.restrict_to_half_checkbox = wx.CheckBox(panel, label="Restrict to Upper Half (North)")
+        self.restrict_to_half_checkbox = wx.CheckBox(self, label="Restrict to Upper Half (North)")
         self.restrict_to_half_checkbox.SetValue(True)
         sizer.Add(self.restrict_to_half_checkbox, 0, wx.EXPAND | wx.ALL, 5)
 
-        self.reset_button = wx.Button(panel, label="Reset to Zero")
+        self.reset_button = wx.Button(self, label="Reset to Zero")
         sizer.Add(self.reset_button, 0, wx.EXPAND | wx.ALL, 5)
         self.reset_button.Bind(wx.EVT_BUTTON, self.OnResetButton)
 
-        # create a MRotController instance and initialize
-        self.rotctl = MRotController(self.config_data[0]['rotctld_ip'], self.config_data[0]['rotctld_port'],
-                                     debug=self.debug)
-        self.rotctl.set_observer_location(self.config_data[0]['latitude'], self.config_data[0]['longitude'],
-                                          elevation_m=self.config_data[0]['elevation_m'])
-
-
-        panel.SetSizer(sizer)
-        self.Show()
+        self.SetSizer(sizer)
 
         # Timer-related attributes for UpdateValues
         self.last_update_time = 0
@@ -170,13 +203,40 @@ class MainFrame(wx.Frame):
     def UpdateValues(self, azimuth, elevation):
         current_time = time.time()
         if current_time - self.last_update_time >= self.update_interval:
-            self.rotctl.park_rotor(az=azimuth, el=elevation)
+            with stage('rotor command'):
+                try:
+                    self.rotctl.park_rotor(az=azimuth, el=elevation)
+                except RotorLinkError as ex:
+                    # the rotor link is down, the commands fail fast until it is probed again
+                    if self.debug:
+                        print(ex)
             self.last_update_time = current_time
             if (self.debug):
                 print(f"Azimuth: {azimuth:.2f}°")
                 print(f"Elevation: {elevation:.2f}°")
 
 
+class MainFrame(wx.Frame):
+    def __init__(self, debug=False):
+        self.debug = debug
+
+        # initialize/load config
+        self.config_data = self.load_config()
+
+        wx.Frame.__init__(self, None, title="Rotor Joystick Control", size=(440, 440))
+
+        # create a MRotController instance and initialize
+        self.rotctl = MRotController(self.config_data[0]['rotctld_ip'], self.config_data[0]['rotctld_port'],
+                                     debug=self.debug, rotor=create_rotor_backend(self.config_data[0]),
+                                     planner=create_path_planner(self.config_data[0]))
+        self.rotctl.cache.set_ttl('moon', self.config_data[0].get('cache_moon_ttl_s', MOON_TTL_S))
+        self.rotctl.cache.set_ttl('rotor', self.config_data[0].get('cache_rotor_ttl_s', ROTOR_TTL_S))
+        self.rotctl.set_observer_location(self.config_data[0]['latitude'], self.config_data[0]['longitude'],
+                                          elevation_m=self.config_data[0]['elevation_m'])
+
+        self.control_panel = JoystickControlPanel(self, self.rotctl, debug=self.debug)
+        self.Show()
+
     def load_config(self):
         try:
             with open("config.yaml", "r") as yamlfile:
@@ -190,6 +250,7 @@ class MainFrame(wx.Frame):
 
 
 if __name__ == "__main__":
+    enable_from_argv('rotorctl_joystick')  # --profile: see profiling.py
     app = wx.App(False)
     frame = MainFrame(debug=DEBUG)
     app.MainLoop()
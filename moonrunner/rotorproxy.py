@@ -0,0 +1,249 @@
+import argparse
+import socket
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from clrprint import *
+
+from rotorbackends import BACKEND_ROTCTLD, SERIAL_BAUD, create_rotor_backend
+
+# rotorproxy.py contains the class "RotorProxyServer", a server speaking the rotctld protocol, which fans the commands
+# of its clients (moonrunner_gui.py, rotorctl_joystick.py, gpredict, rotctl -m 2 ...) out to several rotors:
+#   "P az el" / "\set_pos az el"   is sent concurrently to all rotors, so e.g. a phased array of dishes moves in
+#                                  lockstep
+#   "p" / "\get_pos"               is answered from the cached position of the first rotor, which is polled in the
+#                                  background every poll_interval_s, so many clients do not hammer the hardware
+#   "S" / "\stop", "q"             stop is answered with RPRT 0 (no backend supports it), q closes the connection
+#   "\dump_state", "_" / "\get_info"
+#                                  rotor limits (AZ_MIN..AZ_MAX, EL_MIN..EL_MAX) and a description of the proxy;
+#                                  hamlib's rotctl -m 2 (NET rotctl) asks for the limits when it connects
+# The rotors are driven through the backends of rotorbackends.py (rotctld, GS-232 or EasyComm).
+#
+# Usage: python rotorproxy.py --rotor rotctld:127.0.0.1:4534 --rotor gs232:/dev/ttyUSB0:9600 [--listen 127.0.0.1:4533]
+# Then point the GUI (rotctld_ip/rotctld_port in config.yaml) or gpredict to the listen address.
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+LISTEN_IP = '127.0.0.1'
+LISTEN_PORT = 4533
+POLL_INTERVAL_S = 1.0  # background polling interval of the rotor position [s]
+MAX_AGE_S = 3.0  # older cached positions are read from the rotor on request [s]
+IDLE_FLUSH_S = 0.2  # a command without newline is executed, if no more data follows within this time [s]
+AZ_MIN, AZ_MAX = 0.0, 360.0  # azimuth range reported by \dump_state [deg]
+EL_MIN, EL_MAX = 0.0, 90.0  # elevation range reported by \dump_state [deg]
+
+# hamlib \dump_state answer (rotctld protocol version 1, rotor model 2 = NET rotctl)
+ROTCTLD_PROTOCOL_VERSION = 1
+ROTCTLD_MODEL = 2
+
+# hamlib return codes
+RPRT_OK = 0
+RPRT_EINVAL = -1  # invalid parameter
+RPRT_ENIMPL = -4  # command not implemented
+RPRT_EIO = -6  # I/O error
+
+
+class RotorProxyServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    # rotors: list of rotor backends, the position is read from the first one
+    def __init__(self, rotors, listen_ip=LISTEN_IP, listen_port=LISTEN_PORT, poll_interval_s=POLL_INTERVAL_S,
+                 max_age_s=MAX_AGE_S, debug=False):
+        socketserver.TCPServer.__init__(self, (listen_ip, listen_port), RotctldHandler)
+        self.rotors = rotors
+        self.poll_interval_s = poll_interval_s
+        self.max_age_s = max_age_s
+        self.debug = debug
+        # one lock per rotor: the serial backends must not be used by two threads at once
+        self.rotor_locks = [threading.Lock() for rotor in rotors]
+        self.executor = ThreadPoolExecutor(max_workers=len(rotors))
+        self.position = None  # cached (az, el) of the first rotor
+        self.position_time = 0.0
+        self.stats = {'set': 0, 'get_cached': 0, 'get_polled': 0, 'errors': 0}
+        self.stats_lock = threading.Lock()  # the statistics are counted by the handler and polling threads
+        self.polling = True
+        self.poll_thread = threading.Thread(target=self.poll_loop, daemon=True)
+        self.poll_thread.start()
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def set_position_one(self, i, az, el):
+        with self.rotor_locks[i]:
+            self.rotors[i].set_position(az, el)
+            return self.rotors[i].last_latency_s
+
+    # send the position to all rotors concurrently, returns the number of failed rotors
+    def set_position(self, az, el):
+        self.count('set')
+        futures = [self.executor.submit(self.set_position_one, i, az, el) for i in range(len(self.rotors))]
+        failed = 0
+        for rotor, future in zip(self.rotors, futures):
+            try:
+                latency_s = future.result()
+                clrprint('INFO:', "set_position " + rotor.name + " az=" + str(az) + " el=" + str(el)
+                         + " latency=%.1f ms" % (latency_s * 1000.0), clr=['r', 'y'], debug=self.debug)
+            except Exception as ex:
+                failed += 1
+                self.count('errors')
+                clrprint('ERROR:', "set_position " + rotor.name + ": " + str(ex), clr=['r', 'y'], debug=self.debug)
+        return failed
+
+    # read the position of the first rotor into the cache
+    def poll_position(self):
+        with self.rotor_locks[0]:
+            position = self.rotors[0].get_position()
+        self.position, self.position_time = position, time.monotonic()
+        return position
+
+    # cached position of the first rotor, read from the rotor if older than max_age_s
+    def get_position(self):
+        if self.position is not None and time.monotonic() - self.position_time <= self.max_age_s:
+            self.count('get_cached')
+            return self.position
+        self.count('get_polled')
+        return self.poll_position()
+
+    def poll_loop(self):
+        while self.polling:
+            try:
+                self.poll_position()
+            except Exception as ex:
+                self.count('errors')
+                clrprint('ERROR:', "poll_position " + self.rotors[0].name + ": " + str(ex), clr=['r', 'y'],
+                         debug=self.debug)
+            time.sleep(self.poll_interval_s)
+
+    def server_close(self):
+        self.polling = False
+        socketserver.TCPServer.server_close(self)
+        self.executor.shutdown(wait=True)
+        for rotor in self.rotors:
+            rotor.close()
+
+
+# one client connection, commands are separated by newlines; a command may arrive in several TCP segments, the
+# unterminated tail is kept. Clients sending a single command without newline get it executed at the end of the
+# connection or after IDLE_FLUSH_S without further data.
+class RotctldHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        buffer = b''
+        while True:
+            self.request.settimeout(IDLE_FLUSH_S if buffer else None)
+            try:
+                data = self.request.recv(1024)
+            except socket.timeout:
+                data = b'\n'  # flush the unterminated command
+            except OSError:
+                break
+            if not data:
+                break
+            buffer += data
+            lines = buffer.split(b'\n')
+            buffer = lines.pop()
+            for line in lines:
+                if self.execute_line(line) is False:
+                    return
+        self.execute_line(buffer)
+
+    def execute_line(self, line):
+        command = line.decode('ascii', errors='replace').strip()
+        if command:
+            return self.execute(command)
+        return True
+
+    # returns False to close the connection
+    def execute(self, command):
+        server = self.server
+        parts = command.split()
+        name = parts[0]
+        if name in ('P', '\\set_pos'):
+            try:
+                az, el = float(parts[1]), float(parts[2])
+            except (IndexError, ValueError):
+                return self.reply("RPRT %d\n" % RPRT_EINVAL)
+            failed = server.set_position(az, el)
+            return self.reply("RPRT %d\n" % (RPRT_EIO if failed else RPRT_OK))
+        if name in ('p', '\\get_pos'):
+            try:
+                az, el = server.get_position()
+            except Exception as ex:
+                clrprint('ERROR:', "get_position: " + str(ex), clr=['r', 'y'], debug=server.debug)
+                return self.reply("RPRT %d\n" % RPRT_EIO)
+            return self.reply("%.6f\n%.6f\n" % (az, el))
+        if name in ('S', '\\stop'):
+            return self.reply("RPRT %d\n" % RPRT_OK)
+        if name == '\\dump_state':
+            return self.reply("%d\n%d\nmin_az=%f\nmax_az=%f\nmin_el=%f\nmax_el=%f\nsouth_zero=0\nrot_type=AzEl\ndone\n"
+                              % (ROTCTLD_PROTOCOL_VERSION, ROTCTLD_MODEL, AZ_MIN, AZ_MAX, EL_MIN, EL_MAX))
+        if name in ('_', '\\get_info'):
+            return self.reply("MoonRunner rotorproxy %s, %d rotors: %s\n"
+                              % (VERSION, len(server.rotors), ", ".join(rotor.name for rotor in server.rotors)))
+        if name in ('q', 'Q'):
+            return False
+        return self.reply("RPRT %d\n" % RPRT_ENIMPL)
+
+    def reply(self, text):
+        try:
+            self.request.sendall(text.encode('ascii'))
+        except OSError:
+            return False  # the MRotController closes the connection right after "P"
+        return True
+
+
+# "rotctld:IP:PORT", "gs232:SERIAL_PORT[:BAUD]" or "easycomm:SERIAL_PORT[:BAUD]" -> rotor backend
+def parse_rotor(text):
+    backend, address = text.split(':', 1)
+    if backend == BACKEND_ROTCTLD:
+        ip, port = address.rsplit(':', 1)
+        return create_rotor_backend({'rotor_backend': backend, 'rotctld_ip': ip, 'rotctld_port': int(port)})
+    serial_port, baud = address, SERIAL_BAUD
+    if ':' in address and address.rsplit(':', 1)[1].isdigit():
+        serial_port, baud = address.rsplit(':', 1)
+    return create_rotor_backend({'rotor_backend': backend, 'rotor_serial_port': serial_port,
+                                 'rotor_serial_baud': int(baud)})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="rotctld compatible proxy, fans the commands out to several rotors")
+    parser.add_argument('--rotor', action='append', required=True,
+                        help="rotctld:IP:PORT, gs232:SERIAL_PORT[:BAUD] or easycomm:SERIAL_PORT[:BAUD], "
+                             "the position is read from the first rotor")
+    parser.add_argument('--listen', default="%s:%d" % (LISTEN_IP, LISTEN_PORT), help="IP:PORT to listen on")
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL_S, help="rotor polling interval [s]")
+    parser.add_argument('--quiet', action='store_true', help="no command line output")
+    args = parser.parse_args()
+
+    listen_ip, listen_port = args.listen.rsplit(':', 1)
+    server = RotorProxyServer([parse_rotor(r) for r in args.rotor], listen_ip, int(listen_port),
+                              poll_interval_s=args.poll, debug=not args.quiet)
+    print("listening on %s:%s, %d rotors" % (listen_ip, listen_port, len(server.rotors)))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("statistics: " + str(server.stats))
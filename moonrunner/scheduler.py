@@ -0,0 +1,205 @@
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import yaml
+from clrprint import *
+
+from mrotorctl import MRotController
+from pathplanner import create_path_planner
+from rotorbackends import create_rotor_backend, RotorLinkError
+
+# scheduler.py contains the class "SessionScheduler", which runs Moon tracking sessions unattended and event driven:
+#   1. compute the next pass (Moonrise and Moonset, or the crossings of a minimum elevation) for the QTH
+#   2. sleep until shortly before the rise and pre-position the rotor to the rise position (planning the cable wrap)
+#   3. track the Moon every track_interval_s until the set
+#   4. park the rotor with park_rotor and sleep until the next pass
+# Between the passes the thread just waits on an event (no polling), so an unattended station uses close to zero CPU
+# while the Moon is down. The passes are found on a coarse vectorized Moon track (calculate_moon_track), the crossings
+# are refined to 1 s by bisection.
+# The GUI runs the scheduler with File/Automatic Sessions, instead of its 5 s tracking timer.
+#
+# Usage: python scheduler.py [--min-el 0] [--passes]   (uses config.yaml, --passes only lists the next passes)
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+SEARCH_HOURS = 48  # time range to search for the next pass [h]
+STEP_MIN = 10  # step of the coarse Moon track [min]
+PRE_POSITION_S = 120  # pre-position the rotor before the rise [s]
+TRACK_INTERVAL_S = 5  # tracking interval [s]
+
+# events passed to the callback on_event(event, message)
+EVENT_WAIT = 'wait'  # {'rise', 'set'} waiting for the next pass
+EVENT_PRE_POSITION = 'pre_position'  # {'az', 'el'} rotor moved to the rise position
+EVENT_TRACK = 'track'  # {'az', 'el'} Moon position sent to the rotor
+EVENT_PARK = 'park'  # {'az', 'el'} rotor parked after the set
+
+
+class SessionScheduler:
+    # rotctl: MRotController with the observer location, min_el: elevation of "rise" and "set" [deg]
+    # on_event: callback(event, message), called in the scheduler thread
+    def __init__(self, rotctl, min_el=0.0, park_az=0, park_el=0, pre_position_s=PRE_POSITION_S,
+                 track_interval_s=TRACK_INTERVAL_S, on_event=None, debug=False):
+        self.rotctl = rotctl
+        self.min_el = min_el
+        self.park_az = park_az
+        self.park_el = park_el
+        self.pre_position_s = pre_position_s
+        self.track_interval_s = track_interval_s
+        self.on_event = on_event
+        self.debug = debug
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    # Moon elevation [deg] at the datetime t (UTC), without the position cache
+    def elevation_at(self, t):
+        return self.rotctl.compute_azimuth_elevation(t.year, t.month, t.day, t.hour, t.minute, t.second)[1]
+
+    # refine the crossing of min_el between the datetimes low and high to 1 s
+    def refine_crossing(self, low, high):
+        low_above = self.elevation_at(low) >= self.min_el
+        while high - low > timedelta(seconds=1):
+            mid = low + (high - low) / 2
+            mid = mid.replace(microsecond=0)
+            if mid <= low:
+                break
+            if (self.elevation_at(mid) >= self.min_el) == low_above:
+                low = mid
+            else:
+                high = mid
+        return high
+
+    # passes in the SEARCH_HOURS after start (datetime UTC): list of (rise, set), rise = start if the Moon is up,
+    # set = None if the Moon does not set within the time range
+    def find_passes(self, start=None, hours=SEARCH_HOURS):
+        if start is None:
+            start = datetime.now(timezone.utc)
+        start = start.replace(microsecond=0)
+        times, az, el = self.rotctl.calculate_moon_track(start, hours, STEP_MIN)
+        above = el >= self.min_el
+        # the direction of a crossing is known from the coarse track: a rise, if the Moon is above min_el afterwards
+        crossings = [(self.refine_crossing(times[i], times[i + 1]), above[i + 1])
+                     for i in np.nonzero(above[:-1] != above[1:])[0]]
+        rises = [t for t, rising in crossings if rising]
+        sets = [t for t, rising in crossings if not rising]
+        if above[0]:
+            rises.insert(0, start)
+        passes = []
+        for rise in rises:
+            later_sets = [t for t in sets if t > rise]
+            passes.append((rise, later_sets[0] if later_sets else None))
+        return passes
+
+    def notify(self, event, message):
+        clrprint('INFO:', "scheduler " + event + " " + str(message), clr=['r', 'y'], debug=self.debug)
+        if self.on_event is not None:
+            self.on_event(event, message)
+
+    # rotor command on the scheduler thread: a rotor link error is logged and the next step tries again (the link
+    # fails fast while it is down), returns the result of the command or None
+    def rotor_command(self, command, *args):
+        try:
+            return command(*args)
+        except RotorLinkError as ex:
+            clrprint('ERROR:', "scheduler " + str(ex), clr=['r', 'y'], debug=self.debug)
+            return None
+
+    # sleep until the datetime t (UTC), returns False if the scheduler was stopped
+    def wait_until(self, t):
+        timeout = (t - datetime.now(timezone.utc)).total_seconds()
+        return not self.stop_event.wait(max(timeout, 0.0))
+
+    def run(self):
+        while not self.stop_event.is_set():
+            passes = self.find_passes()
+            if not passes:
+                if not self.wait_until(datetime.now(timezone.utc) + timedelta(hours=SEARCH_HOURS / 2)):
+                    break
+                continue
+            rise, moon_set = passes[0]
+            self.notify(EVENT_WAIT, {'rise': rise, 'set': moon_set})
+            if not self.wait_until(rise - timedelta(seconds=self.pre_position_s)):
+                break
+
+            # pre-position to the rise position, with the cable wrap of the whole pass
+            if self.rotctl.planner is not None:
+                self.rotctl.plan_session(rise, park_az=self.park_az, park_el=self.park_el)
+            az, el = self.rotctl.calculate_azimuth_elevation_ts_utc(rise)
+            el = max(el, 0)
+            self.rotor_command(self.rotctl.set_rotor_to_position, self.rotctl.rotor_azimuth(az, rise), el)
+            self.notify(EVENT_PRE_POSITION, {'az': az, 'el': el})
+            if not self.wait_until(rise):
+                break
+
+            # track until the set (or the end of the search range, then the next pass continues the tracking)
+            end = moon_set or rise + timedelta(hours=SEARCH_HOURS)
+            while datetime.now(timezone.utc) < end and not self.stop_event.is_set():
+                position = self.rotor_command(self.rotctl.set_rotor_to_current_moon_position,
+                                              datetime.now(timezone.utc))
+                if position is not None:
+                    self.notify(EVENT_TRACK, {'az': position[0], 'el': position[1]})
+                self.stop_event.wait(self.track_interval_s)
+            if moon_set is not None and not self.stop_event.is_set():
+                self.rotctl.planned_path = None
+                self.rotor_command(self.rotctl.park_rotor, self.park_az, self.park_el)
+                self.notify(EVENT_PARK, {'az': self.park_az, 'el': self.park_el})
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+
+# create and initialize a MRotController from a config.yaml entry (see CONFIG_DATA_DEFAULT in moonrunner_gui.py)
+def create_controller(config, debug=False):
+    rotctl = MRotController(config['rotctld_ip'], config['rotctld_port'], debug=debug,
+                            rotor=create_rotor_backend(config), planner=create_path_planner(config))
+    rotctl.set_observer_location(config['latitude'], config['longitude'], elevation_m=config['elevation_m'])
+    return rotctl
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Track the Moon unattended: pre-position, track, park")
+    parser.add_argument('--config', default='config.yaml', help="config file (default: %(default)s)")
+    parser.add_argument('--min-el', type=float, default=0.0, help="elevation of rise and set [deg]")
+    parser.add_argument('--passes', action='store_true', help="only list the passes of the next 48 h")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as yamlfile:
+        config = yaml.load(yamlfile, Loader=yaml.FullLoader)[0]
+    scheduler = SessionScheduler(create_controller(config), args.min_el, config['rotctld_park_az'],
+                                 config['rotctld_park_el'], debug=True)
+    if args.passes:
+        for rise, moon_set in scheduler.find_passes():
+            print("rise %s  set %s" % (rise.strftime("%Y-%m-%d %H:%M:%S"),
+                                       moon_set.strftime("%Y-%m-%d %H:%M:%S") if moon_set else "-"))
+    else:
+        try:
+            scheduler.run()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,202 @@
+import argparse
+import glob
+import os
+import struct
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+
+import numpy as np
+
+# sessionlog.py records tracking sessions into a compact binary log and replays them.
+#
+# SessionRecorder appends one record per tracking step (timestamp, Moon az/el, commanded az/el, read-back az/el and
+# command latency) into an array of doubles. The array is written as one chunk every CHUNK_RECORDS records (and on
+# close), so the recorder costs neither a file write per step nor text formatting. When a file gets larger than
+# max_bytes, the recorder continues with the next file (rotation: session_..._000.mrlog, session_..._001.mrlog ...).
+#
+# File format (little endian):
+#   header:  b'MRSL', uint16 version, uint16 number of fields, uint16 length + ascii field names (comma separated)
+#   chunks:  uint32 number of records, records * fields float64 values
+# Missing values (e.g. no read-back) are stored as NaN.
+#
+# read_session_log() reads one or more (rotated) files into numpy arrays with a single np.frombuffer per chunk.
+#
+# Usage:
+#   python sessionlog.py info logs/session_20261019_201500_000.mrlog
+#   python sessionlog.py replay logs/session_20261019_201500_*.mrlog [--speed 10] [--ip 127.0.0.1] [--port 4533]
+# "replay" sends the commanded positions with the recorded timing (accelerated by --speed) to a rotor control
+# software, e.g. the hamlib dummy rotor "rotctld -m 1". The GUI can replay a log with File/Replay Session.
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+MAGIC = b'MRSL'
+FORMAT_VERSION = 1
+FIELDS = ('time', 'moon_az', 'moon_el', 'cmd_az', 'cmd_el', 'read_az', 'read_el', 'latency_ms')
+CHUNK_RECORDS = 60  # records per chunk (5 min at the 5 s tracking interval)
+MAX_BYTES = 10 * 1024 * 1024  # file size for the rotation
+FILE_EXTENSION = '.mrlog'
+NAN = float('nan')
+
+
+class SessionRecorder:
+    # directory: log directory, name: file name prefix (default: session_<UTC start time>)
+    def __init__(self, directory='logs', name=None, fields=FIELDS, chunk_records=CHUNK_RECORDS, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.name = name or datetime.now(timezone.utc).strftime("session_%Y%m%d_%H%M%S")
+        self.fields = tuple(fields)
+        self.chunk_records = chunk_records
+        self.max_bytes = max_bytes
+        self.buffer = array('d')
+        self.file_index = 0
+        self.file = None
+        self.paths = []
+        os.makedirs(self.directory, exist_ok=True)
+
+    # append one record, values in the order of the fields (without time), missing values: None
+    def record(self, *values, t=None):
+        if len(values) != len(self.fields) - 1:
+            raise ValueError("expected %d values: %s" % (len(self.fields) - 1, ", ".join(self.fields[1:])))
+        self.buffer.append(time.time() if t is None else t)
+        self.buffer.extend(NAN if v is None else v for v in values)
+        if len(self.buffer) >= self.chunk_records * len(self.fields):
+            self.flush()
+
+    # record a tracking step: Moon position, commanded position, read-back position, latency [s]
+    # extra: values of additional fields after FIELDS (e.g. emelink.LOG_FIELDS)
+    def record_tracking(self, moon_az, moon_el, cmd_az, cmd_el, read_az=None, read_el=None, latency_s=None, t=None,
+                        extra=()):
+        self.record(moon_az, moon_el, cmd_az, cmd_el, read_az, read_el,
+                    None if latency_s is None else latency_s * 1000.0, *extra, t=t)
+
+    # write the buffered records as one chunk
+    def flush(self):
+        if not self.buffer:
+            return
+        if self.file is None or self.file.tell() >= self.max_bytes:
+            self.open_next_file()
+        self.file.write(struct.pack('<I', len(self.buffer) // len(self.fields)))
+        if sys.byteorder == 'big':
+            self.buffer.byteswap()
+        self.buffer.tofile(self.file)
+        self.file.flush()
+        self.buffer = array('d')
+
+    def open_next_file(self):
+        if self.file is not None:
+            self.file.close()
+            self.file_index += 1
+        path = os.path.join(self.directory, "%s_%03d%s" % (self.name, self.file_index, FILE_EXTENSION))
+        self.file = open(path, 'wb')
+        names = ",".join(self.fields).encode('ascii')
+        self.file.write(MAGIC + struct.pack('<HHH', FORMAT_VERSION, len(self.fields), len(names)) + names)
+        self.paths.append(path)
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# read one or more session log files (e.g. all rotated files of a session)
+# returns a dict field name -> numpy array
+def read_session_log(paths):
+    if isinstance(paths, str):
+        paths = sorted(glob.glob(paths)) or [paths]
+    fields = None
+    chunks = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            data = f.read()
+        if data[:4] != MAGIC:
+            raise ValueError(path + " is not a session log")
+        version, field_count, names_length = struct.unpack_from('<HHH', data, 4)
+        file_fields = tuple(data[10:10 + names_length].decode('ascii').split(','))
+        if fields is None:
+            fields = file_fields
+        elif fields != file_fields:
+            raise ValueError(path + " has different fields")
+        offset = 10 + names_length
+        while offset + 4 <= len(data):
+            count = struct.unpack_from('<I', data, offset)[0]
+            offset += 4
+            values = np.frombuffer(data, dtype='<f8', count=count * field_count, offset=offset)
+            chunks.append(values.reshape(count, field_count))
+            offset += count * field_count * 8
+    records = np.concatenate(chunks) if chunks else np.empty((0, len(fields or FIELDS)))
+    return {name: records[:, i] for i, name in enumerate(fields or FIELDS)}
+
+
+# yields the records of a log with the recorded timing, accelerated by speed
+def replay_records(log, speed=1.0):
+    t = log['time']
+    start = time.monotonic()
+    for i in range(len(t)):
+        delay = (t[i] - t[0]) / speed - (time.monotonic() - start)
+        if delay > 0:
+            time.sleep(delay)
+        yield {name: values[i] for name, values in log.items()}
+
+
+def print_info(log):
+    t = log['time']
+    print("records:  %d" % len(t))
+    if not len(t):
+        return
+    print("start:    %s UTC" % datetime.fromtimestamp(t[0], timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+    print("duration: %.0f s" % (t[-1] - t[0]))
+    d_az = np.abs((log['read_az'] - log['moon_az'] + 180.0) % 360.0 - 180.0)
+    d_el = np.abs(log['read_el'] - log['moon_el'])
+    if np.any(np.isfinite(d_az)):
+        print("tracking error (read-back - Moon): az max %.2f deg, el max %.2f deg"
+              % (np.nanmax(d_az), np.nanmax(d_el)))
+    latency = log['latency_ms'][np.isfinite(log['latency_ms'])]
+    if len(latency):
+        print("command latency: median %.1f ms, 95%% %.1f ms, max %.1f ms"
+              % (np.median(latency), np.percentile(latency, 95), np.max(latency)))
+    # EME link parameters (emelink.py), if recorded
+    if 'doppler_echo_hz' in log and np.any(np.isfinite(log['doppler_echo_hz'])):
+        print("EME echo Doppler: %+.0f .. %+.0f Hz, path loss %.1f .. %.1f dB"
+              % (np.nanmin(log['doppler_echo_hz']), np.nanmax(log['doppler_echo_hz']),
+                 np.nanmin(log['path_loss_db']), np.nanmax(log['path_loss_db'])))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or replay MoonRunner session logs")
+    parser.add_argument('command', choices=['info', 'replay'])
+    parser.add_argument('paths', nargs='+', help="session log file(s), rotated files of one session in order")
+    parser.add_argument('--speed', type=float, default=1.0, help="replay speed factor")
+    parser.add_argument('--ip', default='127.0.0.1', help="IP of the rotor control software")
+    parser.add_argument('--port', type=int, default=4533, help="port of the rotor control software")
+    args = parser.parse_args()
+
+    session_log = read_session_log(sorted(p for pattern in args.paths for p in (glob.glob(pattern) or [pattern])))
+    if args.command == 'info':
+        print_info(session_log)
+    else:
+        from mrotorctl import MRotController, BACKEND_MEEUS
+        # the Moon position is taken from the log, no ephemeris needed
+        rotctl = MRotController(args.ip, args.port, debug=True, backend=BACKEND_MEEUS)
+        for r in replay_records(session_log, args.speed):
+            if np.isfinite(r['cmd_az']):
+                rotctl.set_rotor_to_position(round(float(r['cmd_az']), 2), round(float(r['cmd_el']), 2))
@@ -0,0 +1,169 @@
+import math
+
+import wx
+
+# skychart.py contains the class "SkyChartPanel", a polar sky chart (zenith in the center, horizon at the border,
+# North up, East right) showing the Moon's track, the current Moon position and the measured rotor position.
+# The tracks of the Moon and the Sun are calculated once as a vectorized batch (MRotController.calculate_targets) and
+# rendered together with the grid into a cached bitmap. On the timer only the two live markers are drawn on top of the
+# bitmap, and only the rectangles around the old and new marker positions are refreshed.
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+CHART_MARGIN = 18  # room for the compass labels [px]
+MARKER_RADIUS = 6  # radius of the Moon and rotor marker [px]
+HOUR_TICK_STEP = 2  # label the track every n hours
+
+
+class SkyChartPanel(wx.Panel):
+    def __init__(self, parent, size=(260, 260)):
+        wx.Panel.__init__(self, parent, size=size)
+        self.SetMinSize(size)
+        self.SetBackgroundColour(wx.Colour(255, 255, 255))
+        self.SetBackgroundStyle(wx.BG_STYLE_PAINT)
+        self.Bind(wx.EVT_PAINT, self.on_paint)
+        self.Bind(wx.EVT_SIZE, self.on_size)
+
+        self.background = None
+        self.track = None  # (times, az, el)
+        self.sun_track = None  # (az, el)
+        self.moon_pos = None  # (az, el)
+        self.rotor_pos = None  # (az, el)
+        self.moon_brush = wx.Brush(wx.Colour(230, 180, 0))
+        self.rotor_pen = wx.Pen(wx.Colour(200, 0, 0), 2)
+
+    # set the Moon's track (list of datetimes UTC, arrays az, el [deg]) and optionally the Sun's track (az, el) on the
+    # same times, renders the cached bitmap again
+    def set_track(self, times, az, el, sun_track=None):
+        self.track = (times, az, el)
+        self.sun_track = sun_track
+        self.background = None
+        self.Refresh(eraseBackground=False)
+
+    def set_moon_position(self, az, el):
+        self.moon_pos = self.move_marker(self.moon_pos, (az, el))
+
+    def set_rotor_position(self, az, el):
+        self.rotor_pos = self.move_marker(self.rotor_pos, (az, el))
+
+    # refresh only the rectangles around the old and new marker position
+    def move_marker(self, old_pos, new_pos):
+        if old_pos != new_pos:
+            for pos in (old_pos, new_pos):
+                if pos is not None:
+                    x, y = self.to_xy(*pos)
+                    r = MARKER_RADIUS + 3
+                    self.RefreshRect(wx.Rect(x - r, y - r, 2 * r + 1, 2 * r + 1), eraseBackground=False)
+        return new_pos
+
+    # chart center and radius of the horizon [px]
+    def geometry(self):
+        width, height = self.GetClientSize()
+        radius = max(min(width, height) // 2 - CHART_MARGIN, 10)
+        return width // 2, height // 2, radius
+
+    # pixel position of az, el [deg] (el < 0 is drawn outside the horizon circle)
+    def to_xy(self, az, el):
+        cx, cy, radius = self.geometry()
+        r = (90.0 - el) / 90.0 * radius
+        return int(round(cx + r * math.sin(math.radians(az)))), int(round(cy - r * math.cos(math.radians(az))))
+
+    def on_size(self, event):
+        self.background = None
+        self.Refresh(eraseBackground=False)
+        event.Skip()
+
+    # render grid and track once into a bitmap
+    def render_background(self):
+        width, height = self.GetClientSize()
+        self.background = wx.Bitmap(max(width, 1), max(height, 1))
+        dc = wx.MemoryDC(self.background)
+        dc.SetBackground(wx.Brush(self.GetBackgroundColour()))
+        dc.Clear()
+        cx, cy, radius = self.geometry()
+
+        # grid: horizon, el = 30 and 60 deg, N-S and E-W lines, compass labels
+        dc.SetBrush(wx.Brush(wx.Colour(235, 240, 250)))
+        dc.SetPen(wx.Pen(wx.Colour(0, 0, 0), 1))
+        dc.DrawCircle(cx, cy, radius)
+        dc.SetBrush(wx.TRANSPARENT_BRUSH)
+        dc.SetPen(wx.Pen(wx.Colour(180, 180, 180), 1, wx.PENSTYLE_DOT))
+        for el in (30, 60):
+            dc.DrawCircle(cx, cy, int(radius * (90 - el) / 90))
+        dc.DrawLine(cx - radius, cy, cx + radius, cy)
+        dc.DrawLine(cx, cy - radius, cx, cy + radius)
+        font = self.GetFont()
+        font.SetPointSize(8)
+        dc.SetFont(font)
+        dc.SetTextForeground(wx.Colour(0, 0, 0))
+        for label, az in (("N", 0), ("E", 90), ("S", 180), ("W", 270)):
+            tw, th = dc.GetTextExtent(label)
+            x, y = self.to_xy(az, -CHART_MARGIN / 2 / radius * 90)
+            dc.DrawText(label, x - tw // 2, y - th // 2)
+
+        # Sun track above the horizon
+        if self.sun_track is not None:
+            dc.SetPen(wx.Pen(wx.Colour(230, 140, 0), 1, wx.PENSTYLE_SHORT_DASH))
+            self.draw_track(dc, *self.sun_track)
+
+        # Moon track above the horizon, labelled with the hour (UTC)
+        if self.track is not None:
+            times, track_az, track_el = self.track
+            dc.SetPen(wx.Pen(wx.Colour(0, 0, 200), 2))
+            self.draw_track(dc, track_az, track_el)
+            dc.SetTextForeground(wx.Colour(0, 0, 200))
+            for t, az, el in zip(times, track_az, track_el):
+                if el >= 0 and t.minute == 0 and t.second == 0 and t.hour % HOUR_TICK_STEP == 0:
+                    x, y = self.to_xy(az, el)
+                    dc.DrawCircle(x, y, 2)
+                    dc.DrawText("%02d" % t.hour, x + 3, y + 1)
+        dc.SelectObject(wx.NullBitmap)
+
+    # draw the parts of a track above the horizon
+    def draw_track(self, dc, track_az, track_el):
+        segment = []
+        for az, el in zip(track_az, track_el):
+            if el >= 0:
+                segment.append(wx.Point(*self.to_xy(az, el)))
+            elif segment:
+                self.draw_segment(dc, segment)
+                segment = []
+        self.draw_segment(dc, segment)
+
+    @staticmethod
+    def draw_segment(dc, segment):
+        if len(segment) > 1:
+            dc.DrawLines(segment)
+
+    def on_paint(self, event):
+        if self.background is None:
+            self.render_background()
+        dc = wx.BufferedPaintDC(self)
+        dc.DrawBitmap(self.background, 0, 0)
+        if self.moon_pos is not None:
+            x, y = self.to_xy(*self.moon_pos)
+            dc.SetPen(wx.Pen(wx.Colour(0, 0, 0), 1))
+            dc.SetBrush(self.moon_brush)
+            dc.DrawCircle(x, y, MARKER_RADIUS)
+        if self.rotor_pos is not None:
+            x, y = self.to_xy(*self.rotor_pos)
+            dc.SetPen(self.rotor_pen)
+            dc.SetBrush(wx.TRANSPARENT_BRUSH)
+            dc.DrawLine(x - MARKER_RADIUS, y, x + MARKER_RADIUS + 1, y)
+            dc.DrawLine(x, y - MARKER_RADIUS, x, y + MARKER_RADIUS + 1)
@@ -0,0 +1,162 @@
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+from skyfield.api import load
+
+from mrotorctl import TARGET_MOON, load_ephemeris
+
+# skytemp.py contains the class "SkyTemperatureMap", a precomputed all-sky map of the sky background temperature
+# (Tsky), to look up the sky noise behind the Moon. On EME the galactic background behind the Moon changes the noise
+# by several dB on 2 m, e.g. ~200 K in the cold sky and several 1000 K towards the galactic center.
+# The map is a grid in equatorial coordinates (J2000 RA/Dec, default 0.5 deg) at 408 MHz stored as a .npy file. It is
+# opened with np.load(mmap_mode='r'), i.e. memory mapped: nothing is read or calculated at the start, a lookup is
+# an index calculation (nearest grid cell) and one fancy-indexing read for a whole Moon track. The temperatures are
+# scaled to the frequency with the spectral index of the galactic synchrotron emission (-2.55) plus the CMB.
+#
+# The default map (written at the first use, if the file is missing) is an approximate analytic model of the 408 MHz
+# sky (cold sky minimum, galactic disk, galactic center bulge), good for ranking windows, not for calibration.
+# A better map (e.g. the 408 MHz all-sky survey, reprojected to the same grid) can be written with write_sky_map.
+#
+# Usage: python skytemp.py [--mhz 144] [--hours 24]   (Tsky behind the Moon for the QTH in config.yaml)
+#        python eme_planner.py ... --sky-mhz 144       (ranks the EME windows by the mean Tsky)
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+SKY_MAP_FILE = 'skytemp_408.npy'
+MAP_FREQUENCY_MHZ = 408.0  # frequency of the map temperatures [MHz]
+GRID_STEP_DEG = 0.5  # grid step of the default map [deg]
+SPECTRAL_INDEX = -2.55  # T ~ f^SPECTRAL_INDEX of the galactic background
+T_CMB_K = 2.725  # cosmic microwave background [K]
+RANK_STEP_MIN = 10  # time step of the window ranking [min]
+
+# rotation J2000 equatorial -> galactic coordinates
+EQUATORIAL_TO_GALACTIC = np.array([[-0.0548755604, -0.8734370902, -0.4838350155],
+                                   [0.4941094279, -0.4448296300, 0.7469822445],
+                                   [-0.8676661490, -0.1980763734, 0.4559837762]])
+
+
+# approximate sky temperature at 408 MHz [K] for galactic longitude l and latitude b [deg] (arrays)
+def model_temperature_408(l, b):
+    l = (np.asarray(l) + 180.0) % 360.0 - 180.0
+    b = np.asarray(b)
+    cold_sky = 10.0 + 5.0 / (np.abs(np.sin(np.radians(b))) + 0.15)
+    disk = 150.0 * np.exp(-(b / 2.5) ** 2) * (0.3 + 0.7 * np.exp(-(l / 60.0) ** 2))
+    bulge = 350.0 * np.exp(-(l ** 2 + b ** 2) / (2 * 6.0 ** 2))
+    return cold_sky + disk + bulge
+
+
+# the map grid: rows Dec -90..90, columns RA 0..360-step [deg], shape (180/step+1, 360/step)
+def grid_coordinates(step_deg=GRID_STEP_DEG):
+    dec = np.linspace(-90.0, 90.0, int(round(180.0 / step_deg)) + 1)
+    ra = np.arange(int(round(360.0 / step_deg))) * step_deg
+    return np.meshgrid(ra, dec)
+
+
+# write a map: temperatures_408 [K] on the grid of grid_coordinates (float32 .npy)
+def write_sky_map(path, temperatures_408):
+    temperatures_408 = np.asarray(temperatures_408, dtype=np.float32)
+    if temperatures_408.shape[1] != 2 * (temperatures_408.shape[0] - 1):
+        raise ValueError("the map must have the shape (180/step+1, 360/step)")
+    temporary_path = path + '.tmp.npy'
+    np.save(temporary_path, temperatures_408)
+    os.replace(temporary_path, path)
+
+
+# the default map of model_temperature_408
+def build_model_map(step_deg=GRID_STEP_DEG):
+    ra, dec = np.radians(grid_coordinates(step_deg))
+    equatorial = np.array([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)])
+    x, y, z = np.tensordot(EQUATORIAL_TO_GALACTIC, equatorial, axes=1)
+    return model_temperature_408(np.degrees(np.arctan2(y, x)), np.degrees(np.arcsin(np.clip(z, -1.0, 1.0))))
+
+
+class SkyTemperatureMap:
+    # path: map file (.npy), written with the default model if missing, frequency_mhz: frequency of the lookups
+    def __init__(self, path=SKY_MAP_FILE, frequency_mhz=144.0):
+        if not os.path.exists(path):
+            write_sky_map(path, build_model_map())
+        self.grid = np.load(path, mmap_mode='r')
+        self.step_deg = 180.0 / (self.grid.shape[0] - 1)
+        self.frequency_mhz = frequency_mhz
+        self.scale = (frequency_mhz / MAP_FREQUENCY_MHZ) ** SPECTRAL_INDEX
+
+    # sky temperature [K] at the frequency for arrays of RA [h] and Dec [deg] (J2000), nearest grid cell
+    def lookup(self, ra_hours, dec_degrees):
+        row = np.rint((np.asarray(dec_degrees) + 90.0) / self.step_deg).astype(int)
+        column = np.rint(np.asarray(ra_hours) * 15.0 / self.step_deg).astype(int) % self.grid.shape[1]
+        return (self.grid[np.clip(row, 0, self.grid.shape[0] - 1), column] - T_CMB_K) * self.scale + T_CMB_K
+
+    # sky temperature behind the Moon [K] seen from the QTH of the MRotController (Skyfield backend) for a list of
+    # datetimes (UTC), one batch calculation of the Moon positions and one lookup
+    def along_track(self, rotctl, times):
+        moon = rotctl.calculate_targets((TARGET_MOON,), times)
+        return self.lookup(moon.ra_hours[TARGET_MOON], moon.dec_degrees[TARGET_MOON])
+
+
+# rank EME windows (eme_planner.Window) by the mean sky temperature behind the Moon (geocentric Moon position)
+# returns a list of (window, mean Tsky, max Tsky [K]), the quietest window first
+def rank_windows(windows, sky_map, ephemeris=None, step_min=RANK_STEP_MIN):
+    if not windows:
+        return []
+    eph = load_ephemeris(ephemeris, start=min(window.start for window in windows),
+                         end=max(window.end for window in windows))
+    ts = load.timescale()
+
+    # time grids of all windows as one batch
+    times, first = [], []
+    for window in windows:
+        first.append(len(times))
+        seconds = np.append(np.arange(0.0, window.duration().total_seconds(), step_min * 60.0),
+                            window.duration().total_seconds())
+        times.extend(window.start + timedelta(seconds=float(s)) for s in seconds)
+    ra, dec, distance = eph['earth'].at(ts.from_datetimes(times)).observe(eph['moon']).radec()
+    tsky = sky_map.lookup(ra.hours, dec.degrees)
+    counts = np.diff(np.append(first, len(times)))
+    mean = np.add.reduceat(tsky, first) / counts
+    peak = np.maximum.reduceat(tsky, first)
+    return sorted(zip(windows, mean, peak), key=lambda ranked: ranked[1])
+
+
+if __name__ == "__main__":
+    import yaml
+    from scheduler import create_controller
+
+    parser = argparse.ArgumentParser(description="Sky temperature behind the Moon for the QTH in config.yaml")
+    parser.add_argument('--config', default='config.yaml', help="config file (default: %(default)s)")
+    parser.add_argument('--map', default=SKY_MAP_FILE, help="sky map file (default: %(default)s)")
+    parser.add_argument('--mhz', type=float, default=144.0, help="frequency [MHz]")
+    parser.add_argument('--hours', type=float, default=24, help="time range from now [h]")
+    parser.add_argument('--step', type=float, default=60, help="step [min]")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as yamlfile:
+        config = yaml.load(yamlfile, Loader=yaml.FullLoader)[0]
+    rotctl = create_controller(config)
+    sky_map = SkyTemperatureMap(args.map, args.mhz)
+    start = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    times = [start + timedelta(minutes=m) for m in np.arange(0, args.hours * 60 + 1, args.step)]
+    moon = rotctl.calculate_targets((TARGET_MOON,), times)
+    tsky = sky_map.lookup(moon.ra_hours[TARGET_MOON], moon.dec_degrees[TARGET_MOON])
+    print("time (UTC)        Moon el  Tsky %.0f MHz [K]" % args.mhz)
+    for t, el, temperature in zip(times, moon.el[TARGET_MOON], tsky):
+        print("%s %8.1f %10.0f" % (t.strftime("%Y-%m-%d %H:%M"), el, temperature))
@@ -0,0 +1,239 @@
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import yaml
+from clrprint import *
+
+from mrotorctl import TARGET_MOON
+
+# webdashboard.py contains the class "WebDashboard", a small HTTP server (Python standard library only) for headless
+# stations. It serves
+#   /              a status page, updated live in the browser
+#   /events        a Server-Sent Events (SSE) stream of the target (Moon) position, the rotor position and the
+#                  tracking error
+#   /status.json   the latest values as JSON
+# One producer thread calculates the values every interval_s and fans them out to all connected browsers, so the
+# number of clients does not change the load on the ephemeris or the rotor. The producer only runs while at least
+# one client is connected. The values are read through MRotController, i.e. with the shared position cache, but without
+# changing its state (lookup_azimuth_elevation) and not published to its event bus: the producer thread must neither
+# race the tracking of the GUI or the scheduler nor call the wx handlers of the GUI.
+#
+# Usage: python webdashboard.py [--port 8080] [--schedule]   (uses config.yaml, --schedule also runs scheduler.py)
+# The GUI starts the dashboard, if web_dashboard_port is set in config.yaml (0: off).
+#
+# OE9BKJ - https://www.qrz.com/db/oe9bkj
+# 2026-10-19 v1.0
+#
+
+# GPL 3 License Statement
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation version 3 of the License (GPL-3).
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License in the file LICENSE
+# along with this program. If not, see <https://www.gnu.org/licenses/>.
+
+VERSION = 1.0
+
+LISTEN_IP = '0.0.0.0'
+PORT = 8080
+INTERVAL_S = 2.0  # update interval of the values [s]
+KEEPALIVE_S = 15.0  # SSE comment to keep idle connections open [s]
+
+STATUS_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>MoonRunner</title>
+<style>body{font-family:sans-serif;margin:2em}td{padding:.2em 1em}.low{color:#c00}</style></head>
+<body><h2>MoonRunner %(qth)s</h2>
+<table>
+<tr><td>Time (UTC)</td><td id="time">-</td></tr>
+<tr><td>%(target)s az / el</td><td id="target">-</td></tr>
+<tr><td>Rotor az / el</td><td id="rotor">-</td></tr>
+<tr><td>Tracking error az / el</td><td id="error">-</td></tr>
+</table>
+<p id="state">connecting ...</p>
+<script>
+function f(v) { return v === null ? "-" : v.toFixed(2); }
+var source = new EventSource("events");
+source.onmessage = function(e) {
+  var d = JSON.parse(e.data);
+  document.getElementById("time").textContent = d.time;
+  var target = document.getElementById("target");
+  target.textContent = f(d.target_az) + " / " + f(d.target_el);
+  target.className = d.target_el <= 0 ? "low" : "";
+  document.getElementById("rotor").textContent = f(d.rotor_az) + " / " + f(d.rotor_el);
+  document.getElementById("error").textContent = f(d.error_az) + " / " + f(d.error_el);
+  document.getElementById("state").textContent = d.rotor_error || "";
+};
+source.onerror = function() { document.getElementById("state").textContent = "connection lost, retrying ..."; };
+</script></body></html>
+"""
+
+
+class WebDashboard:
+    def __init__(self, rotctl, port=PORT, listen_ip=LISTEN_IP, interval_s=INTERVAL_S, title='', debug=False):
+        self.rotctl = rotctl
+        self.interval_s = interval_s
+        self.title = title
+        self.target_label = "Moon" if rotctl.target_name == TARGET_MOON else rotctl.target_name
+        self.debug = debug
+        self.snapshot = None  # latest values (dict)
+        self.snapshot_id = 0
+        self.snapshot_time = 0.0
+        self.clients = 0
+        self.condition = threading.Condition()
+        self.running = False
+        self.server = ThreadingHTTPServer((listen_ip, port), DashboardHandler)
+        self.server.daemon_threads = True
+        self.server.dashboard = self
+
+    # calculate the values once, for all clients
+    def update(self):
+        now = datetime.now(timezone.utc)
+        target_az, target_el = self.rotctl.lookup_azimuth_elevation(now.year, now.month, now.day, now.hour,
+                                                                    now.minute, now.second)
+        values = {'time': now.strftime("%Y-%m-%d %H:%M:%S"), 'target': self.target_label, 'target_az': target_az,
+                  'target_el': target_el, 'rotor_az': None, 'rotor_el': None, 'error_az': None, 'error_el': None,
+                  'rotor_error': None}
+        try:
+            rotor_az, rotor_el = self.rotctl.get_rotor_position(publish=False)
+            values.update(rotor_az=rotor_az, rotor_el=rotor_el,
+                          error_az=round((rotor_az - target_az + 180.0) % 360.0 - 180.0, 2),
+                          error_el=round(rotor_el - target_el, 2))
+        except Exception as ex:
+            values['rotor_error'] = "rotor: " + str(ex)
+        with self.condition:
+            self.snapshot = values
+            self.snapshot_id += 1
+            self.snapshot_time = time.monotonic()
+            self.condition.notify_all()
+        return values
+
+    # producer: runs while clients are connected
+    def produce(self):
+        while self.running:
+            with self.condition:
+                while self.running and self.clients == 0:
+                    self.condition.wait()
+            if not self.running:
+                break
+            try:
+                self.update()
+            except Exception as ex:
+                clrprint('ERROR:', "web dashboard update: " + str(ex), clr=['r', 'y'], debug=self.debug)
+            time.sleep(self.interval_s)
+
+    # latest values, calculated now if they are older than the interval
+    def current(self):
+        with self.condition:
+            if self.snapshot is not None and time.monotonic() - self.snapshot_time < self.interval_s:
+                return self.snapshot
+        return self.update()
+
+    # wait for values newer than last_id (or the timeout), returns (id, values)
+    def wait_next(self, last_id, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.snapshot_id != last_id or not self.running, timeout)
+            return self.snapshot_id, self.snapshot
+
+    def client_connected(self, delta):
+        with self.condition:
+            self.clients += delta
+            self.condition.notify_all()
+
+    def start(self):
+        self.running = True
+        threading.Thread(target=self.produce, daemon=True).start()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        clrprint('INFO:', "web dashboard on port " + str(self.server.server_address[1]), clr=['r', 'y'],
+                 debug=self.debug)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        dashboard = self.server.dashboard
+        if self.path in ('/', '/index.html'):
+            self.send_body(STATUS_PAGE % {'qth': dashboard.title, 'target': dashboard.target_label},
+                           'text/html; charset=utf-8')
+        elif self.path == '/status.json':
+            self.send_body(json.dumps(dashboard.current()), 'application/json')
+        elif self.path == '/events':
+            self.stream_events(dashboard)
+        else:
+            self.send_error(404)
+
+    def send_body(self, text, content_type):
+        body = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def stream_events(self, dashboard):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        dashboard.client_connected(1)
+        try:
+            last_id = 0
+            while dashboard.running:
+                snapshot_id, values = dashboard.wait_next(last_id, KEEPALIVE_S)
+                if snapshot_id != last_id and values is not None:
+                    self.wfile.write(("data: " + json.dumps(values) + "\n\n").encode('utf-8'))
+                    last_id = snapshot_id
+                else:
+                    self.wfile.write(b": keepalive\n\n")
+                self.wfile.flush()
+        except OSError:
+            pass  # the browser closed the connection
+        finally:
+            dashboard.client_connected(-1)
+
+    def log_message(self, format, *args):
+        pass  # no access log on the console
+
+
+if __name__ == "__main__":
+    from scheduler import SessionScheduler, create_controller
+
+    parser = argparse.ArgumentParser(description="Web dashboard with live Moon and rotor positions")
+    parser.add_argument('--config', default='config.yaml', help="config file (default: %(default)s)")
+    parser.add_argument('--port', type=int, default=PORT, help="HTTP port (default: %(default)s)")
+    parser.add_argument('--interval', type=float, default=INTERVAL_S, help="update interval [s]")
+    parser.add_argument('--schedule', action='store_true', help="also track the Moon passes (scheduler.py)")
+    args = parser.parse_args()
+
+    with open(args.config, "r") as yamlfile:
+        config = yaml.load(yamlfile, Loader=yaml.FullLoader)[0]
+    rotctl = create_controller(config)
+    dashboard = WebDashboard(rotctl, args.port, interval_s=args.interval, title=config['QTH'], debug=True)
+    dashboard.start()
+    print("open http://localhost:%d/" % args.port)
+    try:
+        if args.schedule:
+            SessionScheduler(rotctl, park_az=config['rotctld_park_az'], park_el=config['rotctld_park_el'],
+                             debug=True).run()
+        else:
+            threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        dashboard.stop()